@@ -1,6 +1,14 @@
 from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from apps.accounts.revocation import revocation_store
+from apps.accounts.token_memo import token_memo
+from apps.accounts.user_cache import user_cache
 
 
 class CustomJWTAuthentication(JWTAuthentication):
@@ -12,17 +20,8 @@ class CustomJWTAuthentication(JWTAuthentication):
         """
         Override the authenticate method to read the token from cookies if not in the header.
         """
-        # First, try to get the token from the Authorization header (standard JWT approach)
         try:
-            header = self.get_header(request)
-
-            if header is None:
-                # If no Authorization header, try to get the token from cookies
-                raw_token = request.COOKIES.get(settings.AUTH_ACCESS_TOKEN_NAME)
-            else:
-                # If Authorization header exists, extract the token from it
-                raw_token = self.get_raw_token(header)
-
+            raw_token = self.get_request_token(request)
             if raw_token is None:
                 return None
 
@@ -34,3 +33,52 @@ class CustomJWTAuthentication(JWTAuthentication):
             return None
         except Exception:
             return None
+
+    def get_request_token(self, request):
+        """Raw access token from the Authorization header, else the cookie"""
+        # First, try to get the token from the Authorization header (standard JWT approach)
+        header = self.get_header(request)
+        if header is None:
+            # If no Authorization header, try to get the token from cookies
+            return request.COOKIES.get(settings.AUTH_ACCESS_TOKEN_NAME)
+        # If Authorization header exists, extract the token from it
+        return self.get_raw_token(header)
+
+    def get_validated_token(self, raw_token):
+        """
+        Validate the token once per worker: later requests carrying the
+        same token are served from token_memo until it expires. Revocation
+        is checked on every request, without a query for live tokens.
+        """
+        token = token_memo.get(raw_token, *api_settings.AUTH_TOKEN_CLASSES)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_memo.set(raw_token, token)
+        if revocation_store.is_revoked(token):
+            raise InvalidToken(_("Token is revoked"))
+        return token
+
+    def get_user(self, validated_token):
+        """
+        Resolve the token's user through user_cache, querying the database
+        only on a miss. Cached users get the same active and revocation
+        checks as freshly loaded ones.
+        """
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id) if user_id is not None else None
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+
+        return user
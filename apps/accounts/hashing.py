@@ -0,0 +1,181 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+SLOT_KEY_PREFIX = "accounts:hash-slot"
+
+
+class HashingOverloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many sign-ins in progress, please retry shortly."
+    default_code = "hashing_overloaded"
+
+    def __init__(self, wait=None, detail=None, code=None):
+        super().__init__(detail, code)
+        # Sent as Retry-After by the DRF exception handler
+        self.wait = wait
+
+
+class HashPool:
+    """
+    Bounded executor for password hashing.
+
+    PBKDF2 is deliberately slow, and a burst of logins or registrations
+    hashing on request threads can take every core a worker has, stalling
+    unrelated traffic. Hashes run on at most MAX_WORKERS threads with at
+    most MAX_QUEUE more waiting; anything beyond that is refused at once
+    with HashingOverloaded (503 with Retry-After) rather than piling up.
+    The caller still waits for its own hash, so this caps the CPU spent
+    on hashing per process rather than freeing the request thread.
+
+    A sync worker serves one request at a time, so the per-process limit
+    never fills there. Across processes, each hash also leases one of
+    SHARED_SLOTS slots in the SHARED_ALIAS cache (cache.add, which Redis
+    and Memcached perform atomically); with every slot taken, requests
+    are refused before they tie up their worker for a whole hash. A
+    lease lapses after SLOT_TIMEOUT seconds, so a worker killed mid-hash
+    cannot leak its slot. The alias must be shared by every worker (e.g.
+    Redis via REDIS_URL) for the limit to span them. Configure with
+    settings.ACCOUNTS_HASH_POOL.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_seconds = 0.0
+        # A forked child (gunicorn --preload, benchmark_logins --processes)
+        # inherits the executor but none of its threads
+        os.register_at_fork(after_in_child=self._forget_executor)
+
+    def _forget_executor(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def config(self):
+        return getattr(settings, "ACCOUNTS_HASH_POOL", {})
+
+    @property
+    def enabled(self):
+        return self.config.get("ENABLED", True)
+
+    @property
+    def max_workers(self):
+        return self.config.get("MAX_WORKERS", 2)
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="hash-pool"
+                )
+            return self._executor
+
+    def _admit(self):
+        limit = self.max_workers + self.config.get("MAX_QUEUE", 8)
+        with self._lock:
+            if self.pending >= limit:
+                self.rejected += 1
+                raise HashingOverloaded(wait=self.config.get("RETRY_AFTER", 1))
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+    @property
+    def shared(self):
+        alias = self.config.get("SHARED_ALIAS")
+        return caches[alias] if alias else None
+
+    def _lease_slot(self):
+        """
+        Lease a free shared slot
+
+        Returns:
+            Key of the leased slot, or None without a shared cache
+
+        Raises:
+            HashingOverloaded: Every slot is leased
+        """
+        shared = self.shared
+        if shared is None:
+            return None
+        slots = self.config.get("SHARED_SLOTS", 4)
+        timeout = self.config.get("SLOT_TIMEOUT", 30)
+        # Start at a random slot so workers do not all probe slot 0 first
+        first = random.randrange(slots)
+        for offset in range(slots):
+            key = f"{SLOT_KEY_PREFIX}:{(first + offset) % slots}"
+            if shared.add(key, 1, timeout):
+                return key
+        with self._lock:
+            self.rejected += 1
+        raise HashingOverloaded(wait=self.config.get("RETRY_AFTER", 1))
+
+    def _work(self, submitted, func, args):
+        with self._lock:
+            self.running += 1
+            self.queue_seconds += time.monotonic() - submitted
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def run(self, func, *args):
+        """
+        Run func(*args) on the pool and return its result
+
+        Raises:
+            HashingOverloaded: The pool and its queue, or every shared
+                slot, are full
+        """
+        if not self.enabled:
+            return func(*args)
+
+        self._admit()
+        try:
+            slot = self._lease_slot()
+            try:
+                return self.executor.submit(
+                    self._work, time.monotonic(), func, args
+                ).result()
+            finally:
+                if slot is not None:
+                    self.shared.delete(slot)
+                with self._lock:
+                    self.completed += 1
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def stats(self):
+        """Counters of this process"""
+        with self._lock:
+            return {
+                "running": self.running,
+                "queued": self.pending - self.running,
+                "peak_pending": self.peak_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "average_queue_ms": (
+                    round(self.queue_seconds / self.completed * 1000, 2)
+                    if self.completed
+                    else None
+                ),
+            }
+
+
+hash_pool = HashPool()
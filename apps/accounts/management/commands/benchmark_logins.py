@@ -0,0 +1,131 @@
+import multiprocessing
+import statistics
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test.utils import override_settings
+from apps.accounts.hashing import HashingOverloaded, hash_pool
+from stay.models import Listing
+
+
+class Command(BaseCommand):
+    help = 'Measure login throughput and concurrent search latency with and without the hash pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=16, help='Concurrent login threads')
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=0,
+            help=(
+                'Log in from this many processes, one login at a time each, as sync '
+                'gunicorn workers would (default: --logins threads in this process). '
+                'The shared hash slots only span processes with a shared cache (REDIS_URL).'
+            ),
+        )
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds per run')
+        parser.add_argument('--city', help='City to search for (default: unfiltered search)')
+
+    def handle(self, *args, **options):
+        password = uuid.uuid4().hex
+        user = get_user_model().objects.create_user(
+            email=f'benchmark-{uuid.uuid4().hex}@example.com',
+            password=password,
+            first_name='Benchmark',
+            last_name='User',
+        )
+        try:
+            for label, enabled in (('Direct', False), ('Hash pool', True)):
+                pool = {**getattr(settings, 'ACCOUNTS_HASH_POOL', {}), 'ENABLED': enabled}
+                with override_settings(ACCOUNTS_HASH_POOL=pool):
+                    self.report(label, self.run(user.email, password, options))
+            self.stdout.write(f'Hash pool: {hash_pool.stats()}')
+        finally:
+            user.delete()
+
+    @staticmethod
+    def login_loop(email, password, deadline):
+        """Log in back to back until deadline; returns (logins, rejected)"""
+        logins = rejected = 0
+        try:
+            while time.monotonic() < deadline:
+                try:
+                    authenticate(email=email, password=password)
+                    logins += 1
+                except HashingOverloaded as e:
+                    rejected += 1
+                    time.sleep(min(e.wait or 1, 0.05))
+        finally:
+            connection.close()
+        return logins, rejected
+
+    def login_process(self, email, password, deadline, results):
+        results.put(self.login_loop(email, password, deadline))
+
+    def run(self, email, password, options):
+        deadline = time.monotonic() + options['duration']
+        counts = {'logins': 0, 'rejected': 0}
+        latencies = []
+        lock = threading.Lock()
+
+        def login():
+            logins, rejected = self.login_loop(email, password, deadline)
+            with lock:
+                counts['logins'] += logins
+                counts['rejected'] += rejected
+
+        def search():
+            conditions = Listing.search_conditions(city=options['city'])
+            try:
+                while time.monotonic() < deadline:
+                    started = time.perf_counter()
+                    Listing.fetch_listings_page(conditions=conditions)
+                    latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+
+        processes = []
+        results = None
+        if options['processes']:
+            # Children must open their own connections
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            results = context.Queue()
+            processes = [
+                context.Process(target=self.login_process, args=(email, password, deadline, results))
+                for _ in range(options['processes'])
+            ]
+            threads = []
+        else:
+            threads = [threading.Thread(target=login) for _ in range(options['logins'])]
+        threads.append(threading.Thread(target=search))
+        for worker in processes + threads:
+            worker.start()
+        for _ in processes:
+            logins, rejected = results.get()
+            counts['logins'] += logins
+            counts['rejected'] += rejected
+        for worker in processes + threads:
+            worker.join()
+
+        return {
+            'logins_per_second': counts['logins'] / options['duration'],
+            'rejected': counts['rejected'],
+            'latencies': latencies,
+        }
+
+    def report(self, label, result):
+        latencies = result['latencies']
+        line = f'{label}: {result["logins_per_second"]:,.1f} logins/s, {result["rejected"]} refused'
+        if len(latencies) >= 2:
+            quantiles = statistics.quantiles(latencies, n=100)
+            line += (
+                f'; search p50={quantiles[49] * 1000:.1f}ms '
+                f'p95={quantiles[94] * 1000:.1f}ms over {len(latencies)} queries'
+            )
+        self.stdout.write(self.style.SUCCESS(line))
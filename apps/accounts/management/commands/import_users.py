@@ -0,0 +1,95 @@
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.accounts.models import CustomUser, Profile
+
+
+class Command(BaseCommand):
+    help = 'Bulk import users with pre-hashed passwords from a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help=(
+                'CSV (with a header row) or NDJSON file with email, first_name, '
+                'last_name and password: a Django-encoded hash such as '
+                '"pbkdf2_sha256$..." or empty for an unusable password'
+            ),
+        )
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Default: from the file extension')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Users per transaction')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv')
+
+        imported = skipped = 0
+        seen = set()
+        with open(path, newline='', encoding='utf-8') as source:
+            rows = csv.DictReader(source) if file_format == 'csv' else map(json.loads, filter(str.strip, source))
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                created, ignored = self.import_batch(batch, seen)
+                imported += created
+                skipped += ignored
+                self.stdout.write(f'{imported} imported, {skipped} skipped...')
+
+        self.stdout.write(self.style.SUCCESS(f'Imported {imported} users, skipped {skipped}.'))
+
+    def import_batch(self, rows, seen):
+        """
+        Insert one batch of users and their profiles in one transaction
+
+        Returns:
+            Tuple of (users created, rows skipped as duplicates)
+        """
+        users = {}
+        for row in rows:
+            email = CustomUser.objects.normalize_email(row.get('email') or '').lower()
+            if not email:
+                raise CommandError(f'Row without an email: {row}')
+            if email in seen or email in users:
+                continue
+            users[email] = CustomUser(
+                email=email,
+                first_name=row.get('first_name') or '',
+                last_name=row.get('last_name') or '',
+                password=self.encoded_password(email, row.get('password')),
+            )
+
+        seen.update(users)
+
+        with transaction.atomic():
+            # Emails that already exist, or are inserted concurrently, are
+            # skipped by the unique constraint rather than by a prior check
+            CustomUser.objects.bulk_create(users.values(), ignore_conflicts=True)
+            # Ids are generated here, so the rows that made it are the
+            # ones whose id is in the table now
+            created = set(
+                CustomUser.objects.filter(
+                    pk__in=[user.pk for user in users.values()]
+                ).values_list('pk', flat=True)
+            )
+            Profile.objects.bulk_create(
+                Profile(user=user) for user in users.values() if user.pk in created
+            )
+        return len(created), len(rows) - len(created)
+
+    @staticmethod
+    def encoded_password(email, password):
+        """Keep a pre-hashed password as is; hashing here would take hours for 1M users"""
+        if not password:
+            return make_password(None)
+        try:
+            identify_hasher(password)
+        except ValueError:
+            raise CommandError(
+                f'Password of {email} is not a hash from a hasher in PASSWORD_HASHERS'
+            )
+        return password
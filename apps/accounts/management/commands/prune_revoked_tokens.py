@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.accounts.revocation import revocation_store
+
+
+class Command(BaseCommand):
+    help = 'Delete revoked token records whose tokens have expired'
+
+    def handle(self, *args, **options):
+        deleted = revocation_store.prune()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired revocations.'))
@@ -1,9 +1,16 @@
+from django.apps import apps
 from django.contrib.auth.models import BaseUserManager
-from django.db import models
+from django.db import models, transaction
 
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
+        """
+        Create a user and its profile in one transaction
+
+        The password is hashed before the transaction opens, so the
+        slow part holds no database locks.
+        """
         if not email:
             raise ValueError("the email field must be set")
 
@@ -11,7 +18,13 @@ class CustomUserManager(BaseUserManager):
         email = email.lower()
         user = self.model(email=email, **extra_fields)
         user.set_password(password)
-        user.save(using=self._db)
+
+        # Built before the user is saved, which caches it as user.profile
+        # and tells the create_user_profile signal it is taken care of
+        profile = apps.get_model("accounts", "Profile")(user=user)
+        with transaction.atomic(using=self._db):
+            user.save(using=self._db)
+            profile.save(using=self._db, force_insert=True)
         return user
 
     def create_superuser(self, email, password=None, **extra_fields):
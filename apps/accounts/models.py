@@ -1,7 +1,9 @@
 from django.db import models
+from django.contrib.auth import hashers
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 
 from accounts.manager import CustomUserManager, ProfileManager
+from apps.accounts.hashing import hash_pool
 from commons.mixins import ModelMixin
 
 from cloudinary.models import CloudinaryField
@@ -29,6 +31,32 @@ class CustomUser(AbstractBaseUser, PermissionsMixin, ModelMixin):
     def __str__(self):
         return f"{self.email} - {self.first_name} {self.last_name}"
 
+    def set_password(self, raw_password):
+        """Hash on the bounded hash pool (see accounts.hashing)"""
+        if raw_password is None:
+            return super().set_password(raw_password)
+        self.password = hash_pool.run(hashers.make_password, raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Verify on the bounded hash pool (see accounts.hashing)
+
+        Only the hash comparison runs on the pool. A hash in an outdated
+        format is upgraded and saved here, on the caller's thread and
+        inside its transaction.
+        """
+        outdated = []
+        valid = hash_pool.run(
+            hashers.check_password, raw_password, self.password, outdated.append
+        )
+        if outdated:
+            self.set_password(raw_password)
+            # A hash upgrade is not a password change
+            self._password = None
+            self.save(update_fields=["password"])
+        return valid
+
 
 class Profile(ModelMixin):
     user = models.OneToOneField(
@@ -41,3 +69,23 @@ class Profile(ModelMixin):
         return f"Profile of {self.user.email}"
 
     objects = ProfileManager()
+
+
+class RevokedToken(models.Model):
+    """
+    JWT ids revoked before their expiry (logout, rotation).
+
+    Only the jti and expiry are kept; rows are useless once the token
+    would have expired anyway and are removed by `prune_revoked_tokens`.
+    Requests are checked against an in-memory Bloom filter built from
+    this table (see accounts.revocation), not the table itself.
+    """
+
+    jti = models.CharField(max_length=64, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(
+        db_index=True, help_text="Workers pick up rows revoked since their last sync"
+    )
+
+    def __str__(self):
+        return self.jti
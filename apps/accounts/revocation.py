@@ -0,0 +1,118 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.accounts.models import RevokedToken
+from commons.bloom import BloomFilter
+
+
+class RevocationStore:
+    """
+    Answers "is this jti revoked?" without a query for tokens that are not.
+
+    Each process keeps a Bloom filter of unexpired RevokedToken rows.
+    A miss proves the token is not revoked; a hit (a revoked token, or a
+    rare false positive) is confirmed against the table. Every
+    SYNC_INTERVAL seconds the filter takes in rows revoked since its last
+    sync, which bounds how long a revocation made by another worker goes
+    unseen; every REBUILD_INTERVAL it is rebuilt to forget expired rows.
+    Revocations made by this process apply at once. Configure with
+    settings.ACCOUNTS_REVOCATION.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._bloom = None
+        self._synced_at = None
+        self._built_at = 0.0
+        self._checked_at = 0.0
+
+    @property
+    def config(self):
+        return getattr(settings, "ACCOUNTS_REVOCATION", {})
+
+    def rebuild(self):
+        """Build a fresh filter from every unexpired revocation"""
+        now = timezone.now()
+        revoked = RevokedToken.objects.filter(expires_at__gt=now)
+        bloom = BloomFilter(
+            capacity=max(self.config.get("CAPACITY", 100000), 2 * revoked.count()),
+            error_rate=self.config.get("ERROR_RATE", 0.001),
+        )
+        for jti in revoked.values_list("jti", flat=True).iterator(chunk_size=5000):
+            bloom.add(jti)
+        with self._lock:
+            self._bloom = bloom
+            self._synced_at = now
+            self._built_at = self._checked_at = time.monotonic()
+
+    def sync(self):
+        """Add rows revoked by any worker since the last sync"""
+        now = timezone.now()
+        # Overlap syncs so rows committed after their revoked_at was taken
+        # are not skipped; adding a jti twice is harmless
+        since = self._synced_at - timedelta(seconds=self.config.get("SYNC_OVERLAP", 60))
+        jtis = list(
+            RevokedToken.objects.filter(revoked_at__gte=since).values_list(
+                "jti", flat=True
+            )
+        )
+        with self._lock:
+            for jti in jtis:
+                self._bloom.add(jti)
+            self._synced_at = now
+            self._checked_at = time.monotonic()
+
+    def ensure_fresh(self):
+        elapsed = time.monotonic()
+        if self._bloom is None or elapsed - self._built_at > self.config.get(
+            "REBUILD_INTERVAL", 3600
+        ):
+            self.rebuild()
+        elif elapsed - self._checked_at > self.config.get("SYNC_INTERVAL", 5):
+            self.sync()
+
+    def is_revoked(self, token):
+        jti = token.get(api_settings.JTI_CLAIM)
+        if not jti:
+            return False
+        self.ensure_fresh()
+        if jti not in self._bloom:
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def revoke(self, token):
+        """Revoke a validated token until it expires"""
+        jti = token.get(api_settings.JTI_CLAIM)
+        if not jti:
+            return
+        RevokedToken.objects.bulk_create(
+            [
+                RevokedToken(
+                    jti=jti,
+                    expires_at=datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc),
+                    revoked_at=timezone.now(),
+                )
+            ],
+            ignore_conflicts=True,
+        )
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def prune(self):
+        """
+        Delete revocations of tokens that have expired anyway
+
+        Returns:
+            Number of rows deleted
+        """
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+
+revocation_store = RevocationStore()
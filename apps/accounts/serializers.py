@@ -1,6 +1,18 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+
+from apps.accounts.revocation import revocation_store
+from apps.accounts.token_memo import token_memo
 
 
 User = (
@@ -54,3 +66,35 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         data["user"] = CustomUserSerializer(self.user).data
 
         return data
+
+
+class CustomTokenVerifySerializer(TokenVerifySerializer):
+    """Token verification that reuses tokens already validated by this worker"""
+
+    def validate(self, attrs):
+        if "rest_framework_simplejwt.token_blacklist" in settings.INSTALLED_APPS:
+            # A blacklisted token stays otherwise valid; always check it
+            return super().validate(attrs)
+        token = token_memo.validate(
+            attrs["token"], UntypedToken, *api_settings.AUTH_TOKEN_CLASSES
+        )
+        if revocation_store.is_revoked(token):
+            raise InvalidToken(_("Token is revoked"))
+        return {}
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """Token refresh that refuses revoked refresh tokens"""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if revocation_store.is_revoked(refresh):
+            raise InvalidToken(_("Token is revoked"))
+        # Rotation gives the token a new jti, so revoke a copy of the old one
+        used = dict(refresh.payload)
+
+        data = super().validate(attrs)
+
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            revocation_store.revoke(used)
+        return data
@@ -1,21 +1,28 @@
-from django.db.models.signals import post_save
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from apps.accounts.models import CustomUser, Profile
+from apps.accounts.user_cache import user_cache
 
 
 @receiver(post_save, sender=CustomUser)
-def create_user_profile(sender, instance, created, **kwargs):
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
     """
-    Automatically create a Profile when a new CustomUser is created.
+    Create a Profile for users created outside CustomUserManager.create_user
+    (e.g. the admin); the manager saves the profile itself.
     """
-    if created:
+    if created and not raw and not CustomUser.profile.is_cached(instance):
         Profile.objects.create(user=instance)
 
 
 @receiver(post_save, sender=CustomUser)
-def save_user_profile(sender, instance, **kwargs):
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
     """
-    Save the profile whenever the user is saved.
+    Evict the user from the authentication cache, so changes such as
+    deactivation apply to the next request. Runs on commit: evicting
+    earlier lets a concurrent request re-cache the old row.
     """
-    if hasattr(instance, "profile"):
-        instance.profile.save()
+    transaction.on_commit(partial(user_cache.invalidate, instance.pk))
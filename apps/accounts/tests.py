@@ -1,3 +1,329 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from apps.accounts.hashing import SLOT_KEY_PREFIX, hash_pool
+from apps.accounts.models import Profile, RevokedToken
+from apps.accounts.revocation import revocation_store
+from apps.accounts.token_memo import token_memo
+from apps.accounts.user_cache import user_cache
+
+
+class AccountsTestCase(APITestCase):
+    """Shared fixtures: one user, and per-process caches emptied per test"""
+
+    password = "pw12345!"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email="guest@example.com",
+            password=cls.password,
+            first_name="Guest",
+            last_name="Example",
+        )
+
+    def setUp(self):
+        cache.clear()
+        user_cache._local = None
+        token_memo._memo = None
+        revocation_store._bloom = None
+
+    def me(self, token):
+        return self.client.get(
+            "/api/accounts/me/", headers={"Authorization": f"Bearer {token}"}
+        )
+
+
+class UserCacheTests(AccountsTestCase):
+    def test_authenticated_users_are_cached_as_copies(self):
+        self.assertEqual(self.me(AccessToken.for_user(self.user)).status_code, 200)
+
+        cached = user_cache.get(str(self.user.pk))
+        self.assertEqual(cached, self.user)
+        cached.first_name = "Changed"
+        self.assertEqual(user_cache.get(str(self.user.pk)).first_name, "Guest")
+
+    def test_saves_evict_the_user_once_committed(self):
+        token = AccessToken.for_user(self.user)
+        self.me(token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+            self.assertIsNotNone(user_cache.get(str(self.user.pk)))
+
+        self.assertIsNone(user_cache.get(str(self.user.pk)))
+        self.assertEqual(self.me(token).status_code, 401)
+
+    def test_cached_users_still_fail_the_active_check(self):
+        token = AccessToken.for_user(self.user)
+        self.me(token)
+        cached = user_cache.get(str(self.user.pk))
+        cached.is_active = False
+        user_cache.set(str(self.user.pk), cached)
+
+        self.assertEqual(self.me(token).status_code, 401)
+
+
+class TokenMemoTests(AccountsTestCase):
+    def test_tokens_are_validated_once_per_process(self):
+        token = str(AccessToken.for_user(self.user))
+        self.assertEqual(self.me(token).status_code, 200)
+        self.assertIsNotNone(token_memo.get(token, AccessToken))
+
+        with mock.patch.object(
+            JWTAuthentication, "get_validated_token", side_effect=AssertionError
+        ):
+            self.assertEqual(self.me(token).status_code, 200)
+
+    def test_cookie_tokens_share_the_memo(self):
+        token = str(AccessToken.for_user(self.user))
+        self.client.cookies[settings.AUTH_ACCESS_TOKEN_NAME] = token
+
+        response = self.client.get("/api/accounts/me/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(token_memo.get(token, AccessToken))
+
+    def test_invalid_and_expired_tokens_are_not_memoized(self):
+        token = str(AccessToken.for_user(self.user))
+        tampered = token[:-2] + ("AA" if token[-2:] != "AA" else "BB")
+        self.assertEqual(self.me(tampered).status_code, 401)
+        self.assertIsNone(token_memo.get(tampered, AccessToken))
+
+        expired = AccessToken.for_user(self.user)
+        expired.set_exp(lifetime=timedelta(seconds=-1))
+        token_memo.set(str(expired), expired)
+        self.assertIsNone(token_memo.get(str(expired), AccessToken))
+
+    def test_memo_is_keyed_on_the_token_class(self):
+        token = str(AccessToken.for_user(self.user))
+        self.me(token)
+
+        self.assertIsNone(token_memo.get(token, RefreshToken))
+
+
+class HashPoolTests(AccountsTestCase):
+    def login(self):
+        return self.client.post(
+            "/api/accounts/token/",
+            {"email": self.user.email, "password": self.password},
+            format="json",
+        )
+
+    def test_logins_and_registrations_hash_on_the_pool(self):
+        completed = hash_pool.stats()["completed"]
+
+        self.assertEqual(self.login().status_code, 200)
+        response = self.client.post(
+            "/api/accounts/register/",
+            {
+                "email": "new@example.com",
+                "password": self.password,
+                "first_name": "New",
+                "last_name": "User",
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(hash_pool.stats()["completed"], completed + 2)
+        new = get_user_model().objects.get(email="new@example.com")
+        self.assertTrue(new.check_password(self.password))
+
+    @override_settings(
+        ACCOUNTS_HASH_POOL={"MAX_WORKERS": 1, "MAX_QUEUE": 0, "RETRY_AFTER": 3}
+    )
+    def test_a_full_pool_refuses_with_retry_after(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def hold_the_pool():
+            started.set()
+            release.wait(5)
+
+        holder = threading.Thread(target=hash_pool.run, args=(hold_the_pool,))
+        holder.start()
+        try:
+            self.assertTrue(started.wait(5))
+            response = self.login()
+        finally:
+            release.set()
+            holder.join()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "3")
+        self.assertEqual(self.login().status_code, 200)
+
+    @override_settings(
+        ACCOUNTS_HASH_POOL={"SHARED_ALIAS": "default", "SHARED_SLOTS": 2}
+    )
+    def test_slots_leased_by_other_workers_count_against_the_limit(self):
+        keys = [f"{SLOT_KEY_PREFIX}:{slot}" for slot in range(2)]
+        for key in keys:
+            cache.add(key, 1, 30)
+
+        self.assertEqual(self.login().status_code, 503)
+
+        cache.delete(keys[0])
+        self.assertEqual(self.login().status_code, 200)
+        # The login gave its slot back
+        self.assertTrue(cache.add(keys[0], 1, 30))
+
+    def test_outdated_hashes_are_upgraded_on_the_callers_thread(self):
+        hasher = PBKDF2PasswordHasher()
+        self.user.password = hasher.encode(self.password, hasher.salt(), iterations=1000)
+        self.user.save()
+        threads = []
+        save = get_user_model().save
+
+        def recording_save(user, *args, **kwargs):
+            threads.append(threading.current_thread())
+            return save(user, *args, **kwargs)
+
+        with mock.patch.object(get_user_model(), "save", recording_save):
+            self.assertTrue(self.user.check_password(self.password))
+
+        self.assertEqual(threads, [threading.current_thread()])
+        self.user.refresh_from_db()
+        self.assertFalse(hasher.must_update(self.user.password))
+        self.assertTrue(self.user.check_password(self.password))
+
+
+class RegistrationTests(AccountsTestCase):
+    def test_users_get_exactly_one_profile(self):
+        self.assertTrue(Profile.objects.filter(user=self.user).exists())
+
+        user = get_user_model()(email="admin-made@example.com")
+        user.set_unusable_password()
+        user.save()
+
+        self.assertEqual(Profile.objects.filter(user=user).count(), 1)
+        self.assertEqual(Profile.objects.count(), 2)
+
+    def test_import_skips_duplicates_and_keeps_hashes(self):
+        hashed = make_password("imported!")
+        path = self.write_import(
+            "email,first_name,last_name,password\n"
+            f"one@example.com,One,User,{hashed}\n"
+            f"ONE@example.com,One,Again,{hashed}\n"
+            f"{self.user.email},Guest,Again,{hashed}\n"
+            "two@example.com,Two,User,\n"
+        )
+
+        out = io.StringIO()
+        call_command("import_users", path, "--batch-size", "2", stdout=out)
+
+        self.assertIn("Imported 2 users, skipped 2.", out.getvalue())
+        one = get_user_model().objects.get(email="one@example.com")
+        self.assertEqual(one.password, hashed)
+        self.assertFalse(
+            get_user_model().objects.get(email="two@example.com").has_usable_password()
+        )
+        self.assertEqual(Profile.objects.count(), 3)
+        self.assertEqual(
+            get_user_model().objects.get(email=self.user.email).first_name, "Guest"
+        )
+
+    def test_import_refuses_plain_text_passwords(self):
+        path = self.write_import(
+            "email,first_name,last_name,password\none@example.com,One,User,secret\n"
+        )
+
+        with self.assertRaises(CommandError):
+            call_command("import_users", path, stdout=io.StringIO())
+        self.assertFalse(get_user_model().objects.filter(email="one@example.com").exists())
+
+    def write_import(self, content):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "users.csv")
+        with open(path, "w", encoding="utf-8") as target:
+            target.write(content)
+        return path
+
+
+class LogoutTests(AccountsTestCase):
+    def logout(self, access=None, refresh=None):
+        headers = {"Authorization": f"Bearer {access}"} if access else {}
+        body = {"refresh": str(refresh)} if refresh else {}
+        return self.client.post(
+            "/api/accounts/logout/", body, format="json", headers=headers
+        )
+
+    def refresh(self, refresh):
+        return self.client.post(
+            "/api/accounts/token/refresh/", {"refresh": str(refresh)}, format="json"
+        )
+
+    def test_logout_revokes_both_tokens(self):
+        refresh = RefreshToken.for_user(self.user)
+        access = str(refresh.access_token)
+        self.assertEqual(self.me(access).status_code, 200)
+
+        self.assertEqual(self.logout(access, refresh).status_code, 200)
+
+        # Memoized by the request above, and rejected all the same
+        self.assertEqual(self.me(access).status_code, 401)
+        self.assertEqual(self.refresh(refresh).status_code, 401)
+
+    def test_logout_with_an_expired_access_token_revokes_the_refresh_token(self):
+        refresh = RefreshToken.for_user(self.user)
+        access = refresh.access_token
+        access.set_exp(lifetime=timedelta(seconds=-1))
+
+        self.assertEqual(self.logout(str(access), refresh).status_code, 200)
+
+        self.assertEqual(self.refresh(refresh).status_code, 401)
+        self.assertEqual(self.refresh(RefreshToken.for_user(self.user)).status_code, 200)
+
+    def test_unrevoked_tokens_are_answered_without_a_query(self):
+        revoked = AccessToken.for_user(self.user)
+        revocation_store.revoke(revoked)
+        revocation_store.rebuild()
+
+        with self.assertNumQueries(0):
+            self.assertFalse(
+                revocation_store.is_revoked(AccessToken.for_user(self.user))
+            )
+        self.assertTrue(revocation_store.is_revoked(revoked))
+
+    def test_revocations_by_other_workers_are_synced(self):
+        revocation_store.rebuild()
+        token = AccessToken.for_user(self.user)
+        RevokedToken.objects.create(
+            jti=token["jti"],
+            expires_at=timezone.now() + timedelta(minutes=5),
+            revoked_at=timezone.now(),
+        )
+        revocation_store._checked_at -= 60
+
+        self.assertTrue(revocation_store.is_revoked(token))
+
+    def test_prune_drops_expired_revocations(self):
+        now = timezone.now()
+        for jti, expires_at in (
+            ("old", now - timedelta(minutes=1)),
+            ("live", now + timedelta(minutes=1)),
+        ):
+            RevokedToken.objects.create(jti=jti, expires_at=expires_at, revoked_at=now)
+
+        self.assertEqual(revocation_store.prune(), 1)
+        self.assertEqual(
+            list(RevokedToken.objects.values_list("jti", flat=True)), ["live"]
+        )
@@ -0,0 +1,84 @@
+import hashlib
+import time
+
+from django.conf import settings
+
+from commons.cache import LRUCache
+
+
+class TokenMemo:
+    """
+    Per-process memo of validated JWTs.
+
+    Parsing a token and checking its signature is repeated on every
+    request that carries it; this keeps the validated token object for
+    its remaining lifetime, so a worker verifies each token once. Entries
+    are keyed on the SHA-256 of the raw token together with the token
+    class it was validated as, and expire at the token's exp claim.
+    Configure with settings.ACCOUNTS_TOKEN_MEMO.
+    """
+
+    def __init__(self):
+        self._memo = None
+
+    @property
+    def config(self):
+        return getattr(settings, "ACCOUNTS_TOKEN_MEMO", {})
+
+    @property
+    def enabled(self):
+        return self.config.get("ENABLED", True)
+
+    @property
+    def memo(self):
+        if self._memo is None:
+            self._memo = LRUCache(max_size=self.config.get("MAX_SIZE", 10000))
+        return self._memo
+
+    @staticmethod
+    def _key(raw_token, token_class):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return (token_class.__name__, hashlib.sha256(raw_token).hexdigest())
+
+    def get(self, raw_token, *token_classes):
+        """Memoized token validated as any of token_classes, or None"""
+        if not self.enabled:
+            return None
+        for token_class in token_classes:
+            token = self.memo.get(self._key(raw_token, token_class))
+            if token is not None:
+                return token
+        return None
+
+    def set(self, raw_token, token):
+        if not self.enabled:
+            return
+        expires = token.get("exp")
+        if expires is None:
+            return
+        timeout = expires - time.time()
+        if timeout > 0:
+            self.memo.set(self._key(raw_token, type(token)), token, timeout)
+
+    def validate(self, raw_token, token_class, *also_accept):
+        """
+        Token for raw_token, validating it as token_class on a miss
+
+        Args:
+            raw_token: Encoded token
+            token_class: Class to validate with when nothing is memoized
+            also_accept: Further classes whose memoized tokens prove
+                raw_token valid
+
+        Raises:
+            TokenError: The token is invalid or expired
+        """
+        token = self.get(raw_token, token_class, *also_accept)
+        if token is None:
+            token = token_class(raw_token)
+            self.set(raw_token, token)
+        return token
+
+
+token_memo = TokenMemo()
@@ -0,0 +1,87 @@
+import copy
+
+from django.conf import settings
+from django.core.cache import caches
+
+from commons.cache import LRUCache
+
+
+KEY_PREFIX = "accounts:user"
+
+
+class UserCache:
+    """
+    Cache of authenticated users, keyed on the token's user_id claim.
+
+    Two tiers: a bounded in-process LRU answers repeat requests without
+    any I/O, and an optional shared Django cache (SHARED_ALIAS) lets a
+    worker reuse a user another worker already loaded. Saves and deletes
+    of CustomUser evict both tiers of the writing process and the shared
+    tier (see accounts.signals); other processes' LRU entries live at
+    most TIMEOUT seconds, which bounds how long a deactivation can go
+    unnoticed there. Configure with settings.ACCOUNTS_USER_CACHE.
+    """
+
+    def __init__(self):
+        self._local = None
+
+    @property
+    def config(self):
+        return getattr(settings, "ACCOUNTS_USER_CACHE", {})
+
+    @property
+    def enabled(self):
+        return self.config.get("ENABLED", True)
+
+    @property
+    def local(self):
+        if self._local is None:
+            self._local = LRUCache(
+                max_size=self.config.get("MAX_SIZE", 10000),
+                timeout=self.config.get("TIMEOUT", 30),
+            )
+        return self._local
+
+    @property
+    def shared(self):
+        alias = self.config.get("SHARED_ALIAS")
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def _key(user_id):
+        return f"{KEY_PREFIX}:{user_id}"
+
+    def get(self, user_id):
+        """
+        Cached user for a user_id claim, or None
+
+        Returns a copy, so a request mutating request.user cannot leak
+        into another request.
+        """
+        if not self.enabled:
+            return None
+        key = self._key(user_id)
+        user = self.local.get(key)
+        if user is None and self.shared is not None:
+            user = self.shared.get(key)
+            if user is not None:
+                self.local.set(key, user)
+        return copy.copy(user) if user is not None else None
+
+    def set(self, user_id, user):
+        if not self.enabled:
+            return
+        key = self._key(user_id)
+        user = copy.copy(user)
+        self.local.set(key, user)
+        if self.shared is not None:
+            self.shared.set(key, user, self.config.get("SHARED_TIMEOUT", 300))
+
+    def invalidate(self, user_id):
+        key = self._key(user_id)
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+
+user_cache = UserCache()
@@ -11,9 +11,15 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
     TokenVerifyView,
 )
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from accounts.utils import set_auth_cookies
+from apps.accounts.authentication import CustomJWTAuthentication
+from apps.accounts.revocation import revocation_store
 from apps.accounts.serializers import (
     CustomTokenObtainPairSerializer,
+    CustomTokenVerifySerializer,
+    CustomTokenRefreshSerializer,
     UserCreateSerializer,
     CustomUserSerializer,
 )
@@ -41,6 +47,7 @@ class CustomTokenObtainView(TokenObtainPairView):
 class CustomTokenRefreshView(TokenRefreshView):
     """Handles token refresh by reading the refresh token from cookies if not provided in the request body."""
     permission_classes = [AllowAny]
+    serializer_class = CustomTokenRefreshSerializer
 
     def post(self, request, *args, **kwargs):
 
@@ -84,13 +91,13 @@ class CustomTokenVerifyView(TokenVerifyView):
     Custom token verification view to handle token verification.
     """
     permission_classes = [AllowAny]
+    serializer_class = CustomTokenVerifySerializer
 
     def post(self, request, *args, **kwargs):
         """
         Handle token verification.
         """
         access_token = request.COOKIES.get(settings.AUTH_ACCESS_TOKEN_NAME)
-        print("ACCESS VERIFY", access_token)
         if access_token:
             data = request.data.copy() if hasattr(request.data, 'copy') else dict(request.data)
             # SimpleJWT expects 'token' field for verification
@@ -227,11 +234,38 @@ class RegisterView(generics.CreateAPIView):
 
 class LogoutView(APIView):
     """
-    Handles user logout by clearing authentication cookies.
+    Handles user logout by revoking the session's tokens and clearing
+    authentication cookies. Open to anonymous requests, so a client whose
+    access token has expired can still revoke its refresh token.
     """
 
+    permission_classes = [AllowAny]
+
     def post(self, request):
-        """Clear authentication cookies on logout."""
+        """Revoke the access and refresh tokens and clear authentication cookies."""
+        access = request.auth
+        if access is None:
+            # Authentication fails for a still-valid token whose user was
+            # deactivated or changed password; revoke it all the same
+            raw_access = CustomJWTAuthentication().get_request_token(request)
+            if raw_access:
+                try:
+                    access = AccessToken(raw_access)
+                except TokenError:
+                    pass
+        if access is not None:
+            revocation_store.revoke(access)
+
+        raw_refresh = request.data.get("refresh") or request.COOKIES.get(
+            settings.AUTH_REFRESH_TOKEN_NAME
+        )
+        if raw_refresh:
+            try:
+                revocation_store.revoke(RefreshToken(raw_refresh))
+            except TokenError:
+                # Already invalid or expired; nothing left to revoke
+                pass
+
         response = Response(
             {"status": True, "message": "Logged out successfully"},
             status=status.HTTP_200_OK,
@@ -1,5 +1,11 @@
 from django.contrib import admin
-from stay.models import Listing, Booking
+from stay.models import Listing, Booking, ListingRate
+from stay.search import keyword_filter, search_terms
+
+
+class ListingRateInline(admin.TabularInline):
+    model = ListingRate
+    extra = 0
 
 
 @admin.register(Listing)
@@ -8,6 +14,14 @@ class ListingAdmin(admin.ModelAdmin):
     list_filter = ['city', 'created_at']
     search_fields = ['title', 'city', 'description']
     readonly_fields = ['id', 'created_at', 'updated_at']
+    inlines = [ListingRateInline]
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the full-text index instead of icontains scans
+        if not search_terms(search_term):
+            return queryset, False
+        condition, _ = keyword_filter(search_term)
+        return queryset.filter(condition), False
 
 
 @admin.register(Booking)
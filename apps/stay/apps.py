@@ -1,6 +1,33 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def repair_fulltext(sender, using, **kwargs):
+    """Recreate full-text triggers dropped by SQLite table rebuilds."""
+    from django.db import connections
+    from django.db.migrations.recorder import MigrationRecorder
+    from stay.search import install_fulltext
+
+    connection = connections[using]
+    # Nothing to repair before the full-text migration or after it was
+    # unapplied (e.g. migrate stay zero)
+    if "stay_listing" not in connection.introspection.table_names():
+        return
+    recorder = MigrationRecorder(connection)
+    if not recorder.has_table() or not recorder.migration_qs.filter(
+        app="stay", name="0007_listing_fulltext"
+    ).exists():
+        return
+
+    install_fulltext(connection)
 
 
 class StayConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'stay'
+
+    def ready(self):
+        """Import signal handlers when the app is ready."""
+        import stay.signals  # noqa: F401
+
+        post_migrate.connect(repair_fulltext, sender=self)
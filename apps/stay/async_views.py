@@ -0,0 +1,183 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from commons.exceptions import format_validation_errors
+from stay.models import Listing, Booking
+from stay.search_cache import search_cache
+from stay.serializers import (
+    ListingDetailRequestSerializer,
+    FetchListingsSerializer,
+    CreateBookingSerializer,
+    CreatedBookingSerializer,
+)
+from stay.views import (
+    listing_list_cache_key,
+    listing_list_conditions,
+    listing_list_payload,
+)
+
+
+class AsyncAPIView(View):
+    """
+    Async counterpart of APIView for public JSON endpoints.
+
+    DRF runs handlers synchronously, so under ASGI every ORM call of an
+    APIView holds a worker thread. These views validate with the same
+    serializers and return the same payloads, but await the async ORM
+    so one process can serve many concurrent slow clients. They skip
+    DRF permissions: only AllowAny endpoints belong here. Views whose
+    serializers look at the user call authenticate() first.
+    """
+
+    http_method_names = ["post", "options"]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def respond(self, data, status_code=status.HTTP_200_OK):
+        return JsonResponse(data, status=status_code, encoder=JSONEncoder)
+
+    async def authenticate(self, request):
+        """
+        Set request.user through DRF's authentication classes, as the sync
+        views see it; anonymous when no credentials are valid
+        """
+        drf_request = Request(
+            request,
+            authenticators=[
+                authentication_class()
+                for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+            ],
+        )
+        request.user = await sync_to_async(lambda: drf_request.user)()
+
+    def validate(self, request, serializer_class):
+        """
+        Parse the JSON body and validate it, with the request in the
+        serializer context
+
+        Returns:
+            Tuple of (serializer, error response or None)
+        """
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError as e:
+            return None, self.respond(
+                {"detail": f"JSON parse error - {e}"}, status.HTTP_400_BAD_REQUEST
+            )
+        serializer = serializer_class(data=data, context={"request": request})
+        if not serializer.is_valid():
+            return None, self.respond(
+                {
+                    "status": "error",
+                    "message": format_validation_errors(serializer.errors),
+                },
+                status.HTTP_400_BAD_REQUEST,
+            )
+        return serializer, None
+
+
+class AsyncListingListAPIView(AsyncAPIView):
+    """Async variant of ListingListAPIView"""
+
+    async def post(self, request):
+        serializer, error = self.validate(request, FetchListingsSerializer)
+        if error:
+            return error
+        validated = serializer.validated_data
+
+        cache_key = await sync_to_async(listing_list_cache_key)(validated)
+        cached = await sync_to_async(search_cache.get)(cache_key)
+        if cached is not None:
+            return self.respond(cached)
+
+        # The availability engine may consult the database, which only
+        # the sync ORM can do here
+        conditions = await sync_to_async(listing_list_conditions)(
+            validated.get("filters", {})
+        )
+        listings, next_cursor = await Listing.afetch_listings_page(
+            conditions=conditions,
+            cursor=validated.get("cursor"),
+            count=validated.get("count"),
+        )
+        data = await sync_to_async(listing_list_payload)(
+            validated, listings, next_cursor, conditions
+        )
+
+        await sync_to_async(search_cache.set)(cache_key, data)
+        return self.respond(data)
+
+
+class AsyncListingDetailAPIView(AsyncAPIView):
+    """Async variant of ListingDetailAPIView"""
+
+    async def post(self, request):
+        serializer, error = self.validate(request, ListingDetailRequestSerializer)
+        if error:
+            return error
+
+        listing_data = await Listing.aget_listing_detail(
+            serializer.validated_data.get("id")
+        )
+
+        if not listing_data:
+            return self.respond(
+                dict(status=False, message="Listing not found", data=None),
+                status.HTTP_404_NOT_FOUND,
+            )
+
+        return self.respond(
+            dict(
+                status=True,
+                message="Listing details retrieved successfully",
+                data=listing_data,
+            )
+        )
+
+
+class AsyncBookingCreateAPIView(AsyncAPIView):
+    """Async variant of BookingCreateAPIView"""
+
+    async def post(self, request):
+        # Staff may create confirmed bookings
+        await self.authenticate(request)
+        serializer, error = self.validate(request, CreateBookingSerializer)
+        if error:
+            return error
+
+        validated = serializer.validated_data
+
+        # The row lock needs a transaction, which the async ORM does not
+        # offer; the locked section runs in a worker thread
+        booking_result = await sync_to_async(Booking.create_booking)(
+            listing_id=validated.get("listing_id"),
+            user_id=validated.get("user"),
+            check_in=validated.get("check_in"),
+            check_out=validated.get("check_out"),
+            number_of_guests=validated.get("number_of_guests"),
+            status=validated["status"],
+        )
+        if not booking_result["status"]:
+            return self.respond(
+                dict(status=False, message=booking_result["message"], data=None),
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        return self.respond(
+            dict(
+                status=True,
+                message=booking_result["message"],
+                data=CreatedBookingSerializer(booking_result["booking"]).data,
+            ),
+            status.HTTP_201_CREATED,
+        )
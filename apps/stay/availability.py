@@ -0,0 +1,389 @@
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+from stay.models import Listing, Booking
+
+
+GENERATION_CACHE_KEY = "stay:availability:write-generation"
+CHANGE_CACHE_KEY = "stay:availability:changes:{}"
+
+# A write's changes, as tuples replayed in generation order. Each one sets
+# a row's final state, so replaying a write twice is harmless.
+BOOKING_ACTIVE = "booking"  # (kind, booking_id, listing_id, check_in, check_out)
+BOOKING_GONE = "booking-gone"  # (kind, booking_id)
+LISTING_SAVED = "listing"  # (kind, listing_id, city_key)
+LISTING_GONE = "listing-gone"  # (kind, listing_id)
+
+
+def current_generation():
+    """Value of the shared write generation, starting it if missing"""
+    generation = cache.get(GENERATION_CACHE_KEY)
+    if generation is None:
+        cache.add(GENERATION_CACHE_KEY, time.time_ns(), None)
+        generation = cache.get(GENERATION_CACHE_KEY)
+    return generation
+
+
+def bump_generation():
+    """
+    Advance the shared write generation and return its new value
+
+    A missing counter (never set, or evicted) restarts from the clock, so
+    it still moves past any value a worker saw before.
+    """
+    try:
+        return cache.incr(GENERATION_CACHE_KEY)
+    except ValueError:
+        cache.add(GENERATION_CACHE_KEY, time.time_ns(), None)
+        return cache.incr(GENERATION_CACHE_KEY)
+
+
+class ListingIntervals:
+    """Sorted booking intervals for one listing with prefix-max end dates"""
+
+    def __init__(self):
+        self.bookings = {}
+        self.intervals = []
+        self.starts = []
+        self.max_ends = []
+
+    def _reindex(self, index=0):
+        """Recompute the prefix maxima from position index onwards"""
+        del self.max_ends[index:]
+        latest = self.max_ends[-1] if self.max_ends else None
+        for _, end, _ in self.intervals[index:]:
+            latest = end if latest is None or end > latest else latest
+            self.max_ends.append(latest)
+
+    def load(self, bookings):
+        """Add many (booking_id, check_in, check_out) at once, sorting once"""
+        for booking_id, check_in, check_out in bookings:
+            self.bookings[booking_id] = (check_in, check_out)
+        self.intervals = sorted(
+            (check_in, check_out, booking_id)
+            for booking_id, (check_in, check_out) in self.bookings.items()
+        )
+        self.starts = [start for start, _, _ in self.intervals]
+        self._reindex()
+
+    def add(self, booking_id, check_in, check_out):
+        self.remove(booking_id)
+        self.bookings[booking_id] = (check_in, check_out)
+        entry = (check_in, check_out, booking_id)
+        index = bisect_left(self.intervals, entry)
+        self.intervals.insert(index, entry)
+        self.starts.insert(index, check_in)
+        self._reindex(index)
+
+    def remove(self, booking_id):
+        interval = self.bookings.pop(booking_id, None)
+        if interval is None:
+            return
+        index = bisect_left(self.intervals, (*interval, booking_id))
+        del self.intervals[index]
+        del self.starts[index]
+        self._reindex(index)
+
+    def overlaps(self, check_in, check_out):
+        """True if any interval intersects [check_in, check_out)"""
+        # Intervals before idx start before check_out; one of them overlaps
+        # iff the latest end among them is after check_in.
+        idx = bisect_left(self.starts, check_out)
+        return idx > 0 and self.max_ends[idx - 1] > check_in
+
+
+class AvailabilityEngine:
+    """
+    In-memory availability index for the cities listed in
+    settings.STAY_AVAILABILITY_ENGINE["CITIES"].
+
+    Answers "which listings are free for [check_in, check_out)" without a
+    SQL round trip. It is updated incrementally from Booking and Listing
+    signals. Every write, in any worker, advances a shared generation
+    counter and stores its changes in the cache under the new value. A
+    rate-limited check replays the changes other workers made since the
+    engine last caught up, and rebuilds only when one of them is missing
+    (expired, too large to store, or written by rebuild_availability) or
+    the row counts disagree with the database, for writes that send no
+    signals.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._checked_at = 0.0
+        self._reset()
+
+    def _reset(self):
+        self._listings = {}
+        self._city_listings = {}
+        self._listing_city = {}
+        self._booking_listing = {}
+        self._generation = None
+
+    @property
+    def config(self):
+        return getattr(settings, "STAY_AVAILABILITY_ENGINE", {})
+
+    @property
+    def cities(self):
+        return {Listing.normalize_city(city) for city in self.config.get("CITIES", [])}
+
+    @property
+    def enabled(self):
+        return bool(self.config.get("ENABLED")) and bool(self.cities)
+
+    def covers(self, city):
+        """True if availability for this city can be answered from memory"""
+        if not self.enabled or Listing.normalize_city(city) not in self.cities:
+            return False
+        self.ensure_fresh()
+        return self._built
+
+    # ---------- building ----------
+
+    def _db_fingerprint(self):
+        active = (
+            Booking.active_bookings().filter(listing__city_key__in=self.cities).count()
+        )
+        listings = Listing.objects.filter(city_key__in=self.cities).count()
+        return {
+            "listings": listings,
+            "active_bookings": active,
+            "generation": cache.get(GENERATION_CACHE_KEY),
+        }
+
+    def fingerprint(self):
+        """Fingerprint of the in-memory state, comparable with the database"""
+        with self._lock:
+            return {
+                "listings": len(self._listing_city),
+                "active_bookings": len(self._booking_listing),
+                "generation": self._generation,
+            }
+
+    def rebuild(self):
+        """Load every listing and active booking in the engine's cities"""
+        if not self.enabled:
+            return
+        # Read before the rows: a write committing meanwhile bumps it
+        # again and the next check rebuilds
+        generation = current_generation()
+        listings = list(
+            Listing.objects.filter(city_key__in=self.cities).values_list("id", "city_key")
+        )
+        bookings = Booking.active_bookings().filter(
+            listing_id__in=[listing_id for listing_id, _ in listings],
+        ).values_list("id", "listing_id", "check_in", "check_out")
+
+        with self._lock:
+            self._reset()
+            self._generation = generation
+            for listing_id, city in listings:
+                self._add_listing(listing_id, city)
+            loaded = {}
+            for booking_id, listing_id, check_in, check_out in bookings:
+                loaded.setdefault(listing_id, []).append((booking_id, check_in, check_out))
+                self._booking_listing[booking_id] = listing_id
+            for listing_id, intervals in loaded.items():
+                self._listings[listing_id].load(intervals)
+            self._built = True
+            self._checked_at = time.monotonic()
+
+    def check(self):
+        """
+        Compare the in-memory state with the database
+
+        Returns:
+            Dict with "consistent", "engine" and "database" fingerprints
+        """
+        database = self._db_fingerprint()
+        engine = self.fingerprint()
+        return {
+            "consistent": self._built and engine == database,
+            "engine": engine,
+            "database": database,
+        }
+
+    def catch_up(self):
+        """
+        Replay the writes made since the engine's generation, in order
+
+        Returns:
+            False if one of them can no longer be replayed and the engine
+            must rebuild, True otherwise
+        """
+        latest = cache.get(GENERATION_CACHE_KEY)
+        with self._lock:
+            start = self._generation
+        if not isinstance(start, int) or not isinstance(latest, int):
+            return False
+        if latest == start:
+            return True
+        if not 0 < latest - start <= self.config.get("MAX_REPLAY", 1000):
+            return False
+
+        keys = [
+            CHANGE_CACHE_KEY.format(generation)
+            for generation in range(start + 1, latest + 1)
+        ]
+        writes = cache.get_many(keys)
+        if len(writes) != len(keys):
+            return False
+        with self._lock:
+            # Another thread caught up meanwhile; replaying again is harmless
+            # but moving the generation back is not
+            if self._generation != start:
+                return True
+            for key in keys:
+                self._apply_changes(writes[key])
+            self._generation = latest
+        return True
+
+    def ensure_fresh(self):
+        """
+        Catch up with other workers' writes, rebuilding if never built, if
+        a write cannot be replayed or if the row counts have drifted
+        """
+        interval = self.config.get("CHECK_INTERVAL", 5)
+        if self._built and time.monotonic() - self._checked_at < interval:
+            return
+        self._checked_at = time.monotonic()
+        if not self._built or not self.catch_up():
+            self.rebuild()
+            return
+        result = self.check()
+        # A write landed during the check, so the counts may not line up
+        # yet; the next check compares them again
+        if result["engine"]["generation"] != result["database"]["generation"]:
+            return
+        if not result["consistent"]:
+            self.rebuild()
+
+    # ---------- incremental updates ----------
+
+    def _record_write(self, changes):
+        """
+        Apply a write committed by this worker and share it with the others
+
+        The engine keeps up with the new generation only if nothing else
+        was written since it last caught up; otherwise the next check
+        replays the writes in between, this one included.
+        """
+        if not self.enabled:
+            return
+        generation = bump_generation()
+        if len(changes) <= self.config.get("MAX_CHANGES", 5000):
+            cache.set(
+                CHANGE_CACHE_KEY.format(generation),
+                changes,
+                self.config.get("CHANGE_TIMEOUT", 300),
+            )
+        with self._lock:
+            if not self._built:
+                return
+            self._apply_changes(changes)
+            if isinstance(self._generation, int) and generation == self._generation + 1:
+                self._generation = generation
+
+    def _apply_changes(self, changes):
+        for kind, row_id, *state in changes:
+            if kind == BOOKING_ACTIVE:
+                listing_id, check_in, check_out = state
+                self._discard_booking(row_id)
+                intervals = self._listings.get(listing_id)
+                if intervals is not None:
+                    intervals.add(row_id, check_in, check_out)
+                    self._booking_listing[row_id] = listing_id
+            elif kind == BOOKING_GONE:
+                self._discard_booking(row_id)
+            elif kind == LISTING_SAVED and state[0] in self.cities:
+                city = self._listing_city.get(row_id)
+                if city is not None:
+                    self._city_listings[city].discard(row_id)
+                self._add_listing(row_id, state[0])
+            else:
+                self._discard_listing(row_id)
+
+    def _add_listing(self, listing_id, city):
+        self._listings.setdefault(listing_id, ListingIntervals())
+        self._listing_city[listing_id] = city
+        self._city_listings.setdefault(city, set()).add(listing_id)
+
+    def _discard_listing(self, listing_id):
+        city = self._listing_city.pop(listing_id, None)
+        if city is not None:
+            self._city_listings[city].discard(listing_id)
+        intervals = self._listings.pop(listing_id, None)
+        if intervals is not None:
+            for booking_id in intervals.bookings:
+                self._booking_listing.pop(booking_id, None)
+
+    def apply_listing(self, listing):
+        self._record_write([(LISTING_SAVED, listing.pk, listing.city_key)])
+
+    def discard_listing(self, listing_id):
+        self._record_write([(LISTING_GONE, listing_id)])
+
+    def apply_booking(self, booking):
+        self.apply_bookings([booking])
+
+    def apply_bookings(self, bookings):
+        self._record_write(
+            [
+                (
+                    BOOKING_ACTIVE,
+                    booking.pk,
+                    booking.listing_id,
+                    booking.check_in,
+                    booking.check_out,
+                )
+                if booking.is_active
+                else (BOOKING_GONE, booking.pk)
+                for booking in bookings
+            ]
+        )
+
+    def discard_booking(self, booking):
+        self.discard_bookings([booking.pk])
+
+    def discard_bookings(self, booking_ids):
+        self._record_write([(BOOKING_GONE, booking_id) for booking_id in booking_ids])
+
+    def _discard_booking(self, booking_id):
+        listing_id = self._booking_listing.pop(booking_id, None)
+        if listing_id is not None and listing_id in self._listings:
+            self._listings[listing_id].remove(booking_id)
+
+    # ---------- queries ----------
+
+    def free_listings(self, city, check_in, check_out):
+        """Ids of listings in `city` with no active booking in the range"""
+        with self._lock:
+            return [
+                listing_id
+                for listing_id in self._city_listings.get(Listing.normalize_city(city), ())
+                if not self._listings[listing_id].overlaps(check_in, check_out)
+            ]
+
+    def is_available(self, listing_id, check_in, check_out):
+        """
+        Returns:
+            True/False if the listing is tracked, None if the caller
+            must ask the database
+        """
+        if not self.enabled:
+            return None
+        self.ensure_fresh()
+        with self._lock:
+            intervals = self._listings.get(listing_id)
+            if intervals is None:
+                return None
+            return not intervals.overlaps(check_in, check_out)
+
+
+availability_engine = AvailabilityEngine()
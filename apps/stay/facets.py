@@ -0,0 +1,99 @@
+from decimal import Decimal
+
+from django.db.models import CharField, Case, Value, When
+
+
+DIMENSION_CITY = "city"
+DIMENSION_PRICE = "price"
+DIMENSION_GUESTS = "guests"
+DIMENSIONS = (DIMENSION_CITY, DIMENSION_PRICE, DIMENSION_GUESTS)
+
+# Upper bounds (exclusive) of the nightly price buckets; the last bucket is open
+PRICE_BUCKETS = (Decimal("50"), Decimal("100"), Decimal("200"), Decimal("500"))
+
+
+def _price_labels():
+    labels = []
+    lower = 0
+    for upper in PRICE_BUCKETS:
+        labels.append(f"{lower}-{upper}")
+        lower = upper
+    labels.append(f"{lower}+")
+    return labels
+
+
+PRICE_LABELS = _price_labels()
+
+
+def price_bucket(price):
+    """Label of the bucket a nightly price falls into"""
+    for upper, label in zip(PRICE_BUCKETS, PRICE_LABELS):
+        if price < upper:
+            return label
+    return PRICE_LABELS[-1]
+
+
+def price_bucket_expression(field="price_per_night"):
+    """SQL equivalent of price_bucket, for grouping in the database"""
+    return Case(
+        *(
+            When(**{f"{field}__lt": upper}, then=Value(label))
+            for upper, label in zip(PRICE_BUCKETS, PRICE_LABELS)
+        ),
+        default=Value(PRICE_LABELS[-1]),
+        output_field=CharField(),
+    )
+
+
+def facet_values(city_key, price, guests):
+    """(dimension, value) pairs a single listing counts towards"""
+    return [
+        (DIMENSION_CITY, city_key),
+        (DIMENSION_PRICE, price_bucket(price)),
+        (DIMENSION_GUESTS, str(guests)),
+    ]
+
+
+def split_combinations(rows):
+    """
+    Fold (city_key, price bucket, max_guests, count) rows into per-dimension counts
+
+    One grouped query over the three columns yields every facet at once;
+    this sums it along each dimension.
+
+    Returns:
+        Dict of {(dimension, value): count}
+    """
+    counts = {}
+    for city_key, bucket, guests, total in rows:
+        for key in (
+            (DIMENSION_CITY, city_key),
+            (DIMENSION_PRICE, bucket),
+            (DIMENSION_GUESTS, str(guests)),
+        ):
+            counts[key] = counts.get(key, 0) + total
+    return counts
+
+
+def format_facets(counts):
+    """
+    Shape per-dimension counts for a response
+
+    Cities are sorted by count, price buckets in price order and guest
+    capacities numerically. Empty values are left out.
+
+    Args:
+        counts: Dict of {(dimension, value): count}
+
+    Returns:
+        Dict of dimension -> list of {"value", "count"}
+    """
+    facets = {dimension: [] for dimension in DIMENSIONS}
+    for (dimension, value), total in counts.items():
+        if total > 0:
+            facets[dimension].append({"value": value, "count": total})
+
+    facets[DIMENSION_CITY].sort(key=lambda item: (-item["count"], item["value"]))
+    facets[DIMENSION_PRICE].sort(key=lambda item: PRICE_LABELS.index(item["value"]))
+    facets[DIMENSION_GUESTS].sort(key=lambda item: int(item["value"]))
+    return facets
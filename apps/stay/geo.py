@@ -0,0 +1,165 @@
+import math
+
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+
+# Upper bound on the number of geohash ranges one viewport expands into
+MAX_COVER_CELLS = 24
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate as a geohash string"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        value, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            bounds[0] = mid
+        else:
+            bounds[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """Height and width in degrees of a geohash cell at this precision"""
+    lng_bits = math.ceil(5 * precision / 2)
+    lat_bits = math.floor(5 * precision / 2)
+    return 180.0 / 2**lat_bits, 360.0 / 2**lng_bits
+
+
+def _grid(south, west, north, east, precision):
+    height, width = cell_size(precision)
+    rows = range(
+        math.floor((south + 90) / height), math.floor((north + 90) / height) + 1
+    )
+    cols = range(
+        math.floor((west + 180) / width),
+        min(math.floor((east + 180) / width), round(360 / width) - 1) + 1,
+    )
+    return rows, cols, height, width
+
+
+def cover(south, west, north, east, max_cells=MAX_COVER_CELLS):
+    """
+    Geohash prefixes whose cells together cover a bounding box
+
+    Picks the finest precision that needs at most max_cells cells. A box
+    with west > east crosses the antimeridian and is split in two.
+    """
+    if west > east:
+        return cover(south, west, north, 180.0, max_cells // 2) + cover(
+            south, -180.0, north, east, max_cells // 2
+        )
+
+    chosen = 1
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        rows, cols, _, _ = _grid(south, west, north, east, precision)
+        if len(rows) * len(cols) > max_cells:
+            break
+        chosen = precision
+
+    rows, cols, height, width = _grid(south, west, north, east, chosen)
+    return sorted(
+        {
+            encode(-90 + (row + 0.5) * height, -180 + (col + 0.5) * width, chosen)
+            for row in rows
+            for col in cols
+        }
+    )
+
+
+def _successor(prefix):
+    """Smallest geohash prefix sorting after every string starting with prefix"""
+    while prefix:
+        position = BASE32.index(prefix[-1])
+        if position < len(BASE32) - 1:
+            return prefix[:-1] + BASE32[position + 1]
+        prefix = prefix[:-1]
+    return None
+
+
+def prefix_condition(prefix, field="geohash"):
+    """Range condition equivalent to startswith, served by a plain b-tree index"""
+    condition = Q(**{f"{field}__gte": prefix})
+    upper = _successor(prefix)
+    if upper:
+        condition &= Q(**{f"{field}__lt": upper})
+    return condition
+
+
+def radius_bounds(latitude, longitude, radius_km):
+    """Bounding box (south, west, north, east) enclosing a circle"""
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    south = max(latitude - delta_lat, -90.0)
+    north = min(latitude + delta_lat, 90.0)
+
+    if south <= -90.0 or north >= 90.0:
+        return south, -180.0, north, 180.0
+
+    delta_lng = math.degrees(
+        radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(latitude)))
+    )
+    if delta_lng >= 180.0:
+        return south, -180.0, north, 180.0
+
+    west = longitude - delta_lng
+    east = longitude + delta_lng
+    if west < -180.0:
+        west += 360.0
+    if east > 180.0:
+        east -= 360.0
+    return south, west, north, east
+
+
+def bounds_condition(south, west, north, east):
+    """
+    Listings inside a bounding box
+
+    The geohash ranges narrow the scan through the geohash index and the
+    exact latitude/longitude comparison trims the cell edges.
+    """
+    cells = Q()
+    for prefix in cover(south, west, north, east):
+        cells |= prefix_condition(prefix)
+
+    if west > east:
+        longitude = Q(longitude__gte=west) | Q(longitude__lte=east)
+    else:
+        longitude = Q(longitude__gte=west, longitude__lte=east)
+
+    return cells & Q(latitude__gte=south, latitude__lte=north) & longitude
+
+
+def distance_expression(latitude, longitude):
+    """Great-circle distance in km from a point to each listing (haversine)"""
+    lat = Value(math.radians(latitude), output_field=FloatField())
+    lng = Value(math.radians(longitude), output_field=FloatField())
+    half_dlat = (Radians("latitude") - lat) / 2
+    half_dlng = (Radians("longitude") - lng) / 2
+    a = Power(Sin(half_dlat), 2) + Cos(lat) * Cos(Radians("latitude")) * Power(
+        Sin(half_dlng), 2
+    )
+    # Clamp rounding error so ASin never sees a value above 1
+    return Value(2 * EARTH_RADIUS_KM, output_field=FloatField()) * ASin(
+        Least(Sqrt(a), Value(1.0, output_field=FloatField()))
+    )
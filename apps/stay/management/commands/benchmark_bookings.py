@@ -0,0 +1,80 @@
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from stay.models import Listing, Booking
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measure booking throughput (bookings per second) of the single and bulk paths on throwaway data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=500, help='Bookings per run')
+        parser.add_argument('--listings', type=int, default=50, help='Listings to spread them over')
+        parser.add_argument('--batch', type=int, default=500, help='Items per bulk request')
+
+    def handle(self, *args, **options):
+        single = self.run(options, bulk=False)
+        bulk = self.run(options, bulk=True)
+        self.stdout.write(f'Single: {single:,.0f} bookings/s')
+        self.stdout.write(self.style.SUCCESS(f'Bulk:   {bulk:,.0f} bookings/s'))
+
+    def run(self, options, bulk):
+        """Book inside a transaction that is rolled back, returning bookings/s"""
+        rate = 0.0
+        try:
+            with transaction.atomic():
+                items = self.make_items(options['bookings'], options['listings'])
+                started = time.perf_counter()
+                if bulk:
+                    for offset in range(0, len(items), options['batch']):
+                        Booking.create_bookings(items[offset:offset + options['batch']])
+                else:
+                    for item in items:
+                        Booking.create_booking(**item)
+                rate = len(items) / (time.perf_counter() - started)
+                raise Rollback
+        except Rollback:
+            pass
+        return rate
+
+    def make_items(self, bookings, listings):
+        host = get_user_model().objects.create_user(
+            email=f'benchmark-{uuid.uuid4().hex}@example.com',
+            password=None,
+            first_name='Benchmark',
+            last_name='Host',
+        )
+        listing_ids = [
+            listing.pk
+            for listing in Listing.objects.bulk_create(
+                Listing(
+                    title=f'Benchmark {index}',
+                    description='Benchmark listing',
+                    price_per_night=Decimal('100.00'),
+                    city='Benchmark',
+                    city_key='benchmark',
+                    host=host,
+                )
+                for index in range(listings)
+            )
+        ]
+        start = date.today() + timedelta(days=1)
+        return [
+            dict(
+                listing_id=listing_ids[index % listings],
+                user_id=host.pk,
+                check_in=start + timedelta(days=2 * (index // listings)),
+                check_out=start + timedelta(days=2 * (index // listings) + 1),
+                number_of_guests=1,
+            )
+            for index in range(bookings)
+        ]
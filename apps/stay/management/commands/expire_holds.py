@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from stay.models import Booking
+
+
+class Command(BaseCommand):
+    help = 'Cancel pending bookings whose hold has expired, releasing their dates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Bookings cancelled per UPDATE',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running, sweeping every N seconds (default: sweep once)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            cancelled = Booking.expire_holds(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Cancelled {cancelled} expired holds.'))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,47 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from stay import exports
+from stay.models import Listing, Booking
+
+
+class Command(BaseCommand):
+    help = 'Stream listings or bookings to a CSV or NDJSON file with constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=['listings', 'bookings'], help='What to export')
+        parser.add_argument('--format', choices=exports.FORMATS, default=exports.FORMAT_CSV)
+        parser.add_argument('--host', help='Only export data for the host with this email')
+        parser.add_argument('--output', help='File to write (default: stdout)')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=exports.CHUNK_SIZE,
+            help='Rows fetched per database round trip',
+        )
+
+    def handle(self, *args, **options):
+        model = Listing if options['model'] == 'listings' else Booking
+
+        conditions = Q()
+        if options['host']:
+            try:
+                host = get_user_model().objects.get(email=options['host'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f'No user with email {options["host"]}')
+            lookup = 'host' if model is Listing else 'listing__host'
+            conditions = Q(**{lookup: host})
+
+        blocks = exports.render(
+            model.export_rows(conditions=conditions, chunk_size=options['chunk_size']),
+            model.get_export_fields(),
+            options['format'],
+        )
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                output.writelines(blocks)
+            self.stderr.write(self.style.SUCCESS(f'Wrote {options["output"]}'))
+        else:
+            sys.stdout.writelines(blocks)
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from stay.availability import AvailabilityEngine, bump_generation
+from stay.models import BookedNight
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the booked-nights calendar and signal workers to rebuild their availability engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report whether a freshly built engine matches the database',
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            self.stdout.write('Rebuilding booked-nights calendar...')
+            with transaction.atomic():
+                written = BookedNight.rebuild()
+            self.stdout.write(self.style.SUCCESS(f'Wrote {written} booked nights.'))
+
+            # A generation with no changes stored under it cannot be
+            # replayed, so every worker rebuilds its in-memory engine.
+            bump_generation()
+            self.stdout.write('Bumped availability engine generation.')
+
+        engine = AvailabilityEngine()
+        if not engine.enabled:
+            self.stdout.write('Availability engine is disabled; nothing to check.')
+            return
+
+        engine.rebuild()
+        result = engine.check()
+        if result['consistent']:
+            self.stdout.write(self.style.SUCCESS(f"Engine consistent: {result['engine']}"))
+        else:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"Engine drift: engine={result['engine']} database={result['database']}"
+                )
+            )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from stay.models import ListingFacet
+
+
+class Command(BaseCommand):
+    help = 'Recompute the listing facet rollup from the listings table'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding listing facet rollup...')
+        with transaction.atomic():
+            written = ListingFacet.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} facet rows.'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from stay.models import ListingMonthlyStats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per listing monthly stats rollup from active bookings'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding listing monthly stats...')
+        with transaction.atomic():
+            written = ListingMonthlyStats.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} monthly stats rows.'))
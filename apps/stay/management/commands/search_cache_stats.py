@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from stay.search_cache import search_cache
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters of the listing search cache'
+
+    def handle(self, *args, **kwargs):
+        stats = search_cache.stats()
+        self.stdout.write(f"Hits: {stats['hits']}")
+        self.stdout.write(f"Misses: {stats['misses']}")
+        self.stdout.write(f"Hit rate: {stats['hit_rate'] if stats['hit_rate'] is not None else 'n/a'}")
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stay', '0003_remove_booking_guests_alter_booking_number_of_guests'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['-created_at', '-id'], name='stay_listin_created_67492a_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:56
+
+import django.db.models.deletion
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_booked_nights(apps, schema_editor):
+    Booking = apps.get_model("stay", "Booking")
+    BookedNight = apps.get_model("stay", "BookedNight")
+
+    bookings = (
+        Booking.objects.filter(status__in=["pending", "confirmed"])
+        .values_list("id", "listing_id", "check_in", "check_out")
+        .iterator(chunk_size=2000)
+    )
+    batch = []
+    for booking_id, listing_id, check_in, check_out in bookings:
+        for offset in range((check_out - check_in).days):
+            batch.append(
+                BookedNight(
+                    listing_id=listing_id,
+                    booking_id=booking_id,
+                    night=check_in + timedelta(days=offset),
+                )
+            )
+        if len(batch) >= 5000:
+            BookedNight.objects.bulk_create(batch)
+            batch = []
+    BookedNight.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stay', '0004_listing_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookedNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('night', models.DateField()),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booked_nights', to='stay.booking')),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booked_nights', to='stay.listing')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['listing', 'night'], name='stay_booked_listing_7c7ca0_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_booked_nights, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stay', '0005_bookednight'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['city', 'price_per_night'], name='stay_listin_city_6530f6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['city', 'max_guests'], name='stay_listin_city_00b09d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['price_per_night'], name='stay_listin_price_p_df7ed7_idx'),
+        ),
+    ]
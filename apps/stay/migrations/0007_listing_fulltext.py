@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def install_fulltext(apps, schema_editor):
+    from stay.search import install_fulltext
+
+    install_fulltext(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stay', '0006_listing_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_fulltext, migrations.RunPython.noop),
+    ]
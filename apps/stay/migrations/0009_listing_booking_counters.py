@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:02
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_booking_counters(apps, schema_editor):
+    Listing = apps.get_model("stay", "Listing")
+    Booking = apps.get_model("stay", "Booking")
+
+    def counted(condition=Q()):
+        return Coalesce(
+            Subquery(
+                Booking.objects.filter(condition, listing=OuterRef("pk"))
+                .order_by()
+                .values("listing")
+                .annotate(total=Count("id"))
+                .values("total"),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+
+    Listing.objects.update(
+        total_bookings=counted(),
+        active_bookings=counted(Q(status__in=["pending", "confirmed"])),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stay', '0008_listing_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='active_bookings',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Pending and confirmed bookings; maintained from Booking writes'),
+        ),
+        migrations.AddField(
+            model_name='listing',
+            name='total_bookings',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Maintained from Booking writes'),
+        ),
+        migrations.RunPython(backfill_booking_counters, migrations.RunPython.noop),
+    ]
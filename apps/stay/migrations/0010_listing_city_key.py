@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_city_key(apps, schema_editor):
+    Listing = apps.get_model("stay", "Listing")
+
+    # One UPDATE per distinct spelling rather than one per row
+    cities = Listing.objects.order_by().values_list("city", flat=True).distinct()
+    for city in list(cities):
+        Listing.objects.filter(city=city).update(city_key=" ".join(city.split()).lower())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stay', '0009_listing_booking_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='listing',
+            name='stay_listin_city_4ce07f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='listing',
+            name='stay_listin_city_6530f6_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='listing',
+            name='stay_listin_city_00b09d_idx',
+        ),
+        migrations.AddField(
+            model_name='listing',
+            name='city_key',
+            field=models.CharField(default='', editable=False, help_text='Normalized city used for indexed, case-insensitive lookups', max_length=100),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_city_key, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='listing',
+            name='city',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['city_key', '-created_at', '-id'], name='stay_listin_city_ke_967b93_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['city_key', 'price_per_night'], name='stay_listin_city_ke_34a0a7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['city_key', 'max_guests'], name='stay_listin_city_ke_4142c1_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:07
+
+from django.db import migrations, models
+from django.db.models import Count
+
+from stay.facets import DIMENSION_CITY, DIMENSION_GUESTS, DIMENSION_PRICE, price_bucket_expression
+
+
+def backfill_facets(apps, schema_editor):
+    Listing = apps.get_model("stay", "Listing")
+    ListingFacet = apps.get_model("stay", "ListingFacet")
+
+    rows = (
+        Listing.objects.annotate(price_bucket=price_bucket_expression())
+        .order_by()
+        .values_list("city_key", "price_bucket", "max_guests")
+        .annotate(total=Count("id"))
+    )
+    counts = {}
+    for city_key, bucket, guests, total in rows:
+        for key in (
+            (city_key, DIMENSION_CITY, city_key),
+            (city_key, DIMENSION_PRICE, bucket),
+            (city_key, DIMENSION_GUESTS, str(guests)),
+        ):
+            counts[key] = counts.get(key, 0) + total
+
+    ListingFacet.objects.bulk_create(
+        [
+            ListingFacet(city_key=city_key, dimension=dimension, value=value, count=total)
+            for (city_key, dimension, value), total in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stay', '0010_listing_city_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city_key', models.CharField(max_length=100)),
+                ('dimension', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('city_key', 'dimension', 'value'), name='stay_facet_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_facets, migrations.RunPython.noop),
+    ]
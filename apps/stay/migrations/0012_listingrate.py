@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stay', '0011_listingfacet'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('season', 'Season'), ('weekend', 'Weekend'), ('override', 'Date override')], max_length=20)),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('price_per_night', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rates', to='stay.listing')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['listing', 'start_date'], name='stay_listin_listing_745412_idx')],
+            },
+        ),
+    ]
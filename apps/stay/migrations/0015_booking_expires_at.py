@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stay', '0014_booking_active_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # Existing bookings keep expires_at NULL, which never expires: they
+    # predate holds and were made as final bookings
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, help_text='When a pending booking stops holding its dates; cleared once it leaves pending', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('expires_at__isnull', False)), fields=['expires_at'], name='stay_booking_hold_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from stay.pricing import from_cents
+from stay.stats import booking_months
+
+
+def backfill_stats(apps, schema_editor):
+    Booking = apps.get_model("stay", "Booking")
+    ListingMonthlyStats = apps.get_model("stay", "ListingMonthlyStats")
+
+    totals = {}
+    rows = (
+        Booking.objects.filter(status__in=["pending", "confirmed"])
+        .order_by()
+        .values_list("listing_id", "check_in", "check_out", "total_price", "created_at")
+        .iterator(chunk_size=2000)
+    )
+    for listing_id, check_in, check_out, total_price, created_at in rows:
+        for month, contribution in booking_months(
+            check_in, check_out, total_price, created_at
+        ).items():
+            row = totals.setdefault((listing_id, month), [0, 0, 0, 0])
+            for index, value in enumerate(contribution):
+                row[index] += value
+
+    ListingMonthlyStats.objects.bulk_create(
+        [
+            ListingMonthlyStats(
+                listing_id=listing_id,
+                month=month,
+                booked_nights=nights,
+                revenue=from_cents(cents),
+                arrivals=arrivals,
+                lead_days=lead,
+            )
+            for (listing_id, month), (nights, cents, arrivals, lead) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stay', '0015_booking_expires_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingMonthlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('booked_nights', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('arrivals', models.IntegerField(default=0)),
+                ('lead_days', models.IntegerField(default=0, help_text='Sum of days from booking to check-in over arrivals')),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_stats', to='stay.listing')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('listing', 'month'), name='stay_monthly_stats_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -1,17 +1,69 @@
-from django.db import models
+from datetime import timedelta
+from functools import partial
+
+from django.db import models, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum
+from django.db.models.expressions import RawSQL
 from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ValidationError
+from django.utils import timezone
 from commons.mixins import ModelMixin
+from commons.pagination import apaginate_keyset, paginate_keyset
+from stay import exports, facets, geo, pricing, stats
+
+
+def loaded_values(instance):
+    """Current values of an instance's loaded fields, keyed by attname"""
+    deferred = instance.get_deferred_fields()
+    return {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+        if field.attname not in deferred
+    }
 
 
 class Listing(ModelMixin):
     """Model for rental property listings"""
 
+    # Stable sort key for keyset pagination; id breaks created_at ties
+    PAGE_ORDERING = ("-created_at", "-id")
+
+    DETAIL_CACHE_KEY = "stay:listing:detail:{}"
+    DETAIL_CACHE_TIMEOUT = 60 * 60
+    # A write only evicts the writing process's copy from a per-process
+    # cache; other workers serve theirs until it expires
+    DETAIL_CACHE_LOCAL_TIMEOUT = 5
+
     title = models.CharField(max_length=200)
     description = models.TextField()
     price_per_night = models.DecimalField(max_digits=10, decimal_places=2)
-    city = models.CharField(max_length=100, db_index=True)
+    city = models.CharField(max_length=100)
+    city_key = models.CharField(
+        max_length=100,
+        editable=False,
+        help_text="Normalized city used for indexed, case-insensitive lookups",
+    )
     max_guests = models.PositiveIntegerField(default=1)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(
+        max_length=12,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="Derived from latitude/longitude; indexed for map searches",
+    )
     photos = models.JSONField(default=list, help_text="List of photo URLs")
+    total_bookings = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Maintained from Booking writes"
+    )
+    active_bookings = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Pending and confirmed bookings; maintained from Booking writes",
+    )
     host = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="listings"
     )
@@ -19,12 +71,47 @@ class Listing(ModelMixin):
     class Meta:
         ordering = ["-created_at"]
         indexes = [
-            models.Index(fields=["city", "created_at"]),
+            models.Index(fields=["city_key", "-created_at", "-id"]),
+            models.Index(fields=["-created_at", "-id"]),
+            # Search filters: city + price range, city + capacity, price range alone
+            models.Index(fields=["city_key", "price_per_night"]),
+            models.Index(fields=["city_key", "max_guests"]),
+            models.Index(fields=["price_per_night"]),
         ]
 
     def __str__(self):
         return f"{self.title} - {self.city}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember loaded values so signal handlers can see what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    @staticmethod
+    def normalize_city(city):
+        """Canonical form of a city name: trimmed, single-spaced, lowercase"""
+        return " ".join(city.split()).lower()
+
+    def save(self, *args, **kwargs):
+        self.city_key = self.normalize_city(self.city)
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geo.encode(self.latitude, self.longitude)
+        else:
+            self.geohash = ""
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if "city" in update_fields:
+                update_fields.add("city_key")
+            if {"latitude", "longitude"} & update_fields:
+                update_fields.add("geohash")
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+        # Signal handlers have seen the old values; later saves diff from here
+        self._loaded_values = loaded_values(self)
+
     @classmethod
     def get_fields(cls):
         """Define fields to be returned when fetching listings"""
@@ -41,19 +128,196 @@ class Listing(ModelMixin):
             "created_at",
             "updated_at",
             "max_guests",
+            "latitude",
+            "longitude",
         ]
 
     @classmethod
-    def fetch_listings(cls, conditions=None):
+    def get_detail_fields(cls):
+        """Fields of the listing detail payload"""
+        return [*cls.get_fields(), "total_bookings", "active_bookings"]
+
+    @classmethod
+    def get_export_fields(cls):
+        """Columns of listing exports"""
+        return [
+            "id",
+            "title",
+            "city",
+            "price_per_night",
+            "max_guests",
+            "latitude",
+            "longitude",
+            "host__email",
+            "total_bookings",
+            "active_bookings",
+            "created_at",
+            "updated_at",
+        ]
+
+    @classmethod
+    def export_rows(cls, conditions=None, chunk_size=exports.CHUNK_SIZE):
+        """
+        Stream listings as dicts of get_export_fields()
+
+        iterator() reads through a server-side cursor where the database
+        supports one, chunk_size rows at a time, and skips the queryset
+        cache, so memory stays flat however many rows match.
+        """
+        queryset = cls.objects.all()
+        if conditions:
+            queryset = queryset.filter(conditions)
+        return (
+            queryset.order_by("id")
+            .values(*cls.get_export_fields())
+            .iterator(chunk_size=chunk_size)
+        )
+
+    @classmethod
+    def fetch_listings(cls, conditions=None, annotations=None):
         queryset = cls.objects.select_related("host")
 
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+
         if conditions:
             queryset = queryset.filter(conditions)
 
-        queryset = queryset.order_by("-pk").values(*cls.get_fields())
+        queryset = queryset.order_by(*cls.PAGE_ORDERING).values(
+            *cls.get_fields(), *(annotations or {})
+        )
 
         return queryset
 
+    @classmethod
+    def fetch_listings_page(
+        cls, conditions=None, cursor=None, count=None, annotations=None, ordering=None
+    ):
+        """
+        Fetch one keyset page of listings
+
+        Args:
+            conditions: Q object for filtering
+            cursor: next_cursor returned with the previous page
+            count: Page size
+            annotations: Extra computed columns, e.g. a search rank
+            ordering: Sort key overriding PAGE_ORDERING; must end in "-id"
+
+        Returns:
+            Tuple of (list of dicts, next_cursor or None)
+        """
+        return paginate_keyset(
+            cls.fetch_listings(conditions=conditions, annotations=annotations),
+            ordering or cls.PAGE_ORDERING,
+            cursor=cursor,
+            page_size=count,
+        )
+
+    @classmethod
+    async def afetch_listings_page(
+        cls, conditions=None, cursor=None, count=None, annotations=None, ordering=None
+    ):
+        """Async variant of fetch_listings_page, for use with the async ORM"""
+        return await apaginate_keyset(
+            cls.fetch_listings(conditions=conditions, annotations=annotations),
+            ordering or cls.PAGE_ORDERING,
+            cursor=cursor,
+            page_size=count,
+        )
+
+    @classmethod
+    def fetch_facets(cls, conditions=None, annotations=None, city=None):
+        """
+        Listing counts per city, price bucket and guest capacity
+
+        Without conditions the counts come from the ListingFacet rollup,
+        optionally scoped to one city. With conditions (dates, prices,
+        keywords, map bounds...) a single grouped query over the matching
+        listings produces all three facets at once.
+
+        Returns:
+            Dict of dimension -> list of {"value", "count"}
+        """
+        if conditions is None:
+            return ListingFacet.counts(city=city)
+
+        queryset = cls.objects.all()
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        rows = (
+            queryset.filter(conditions)
+            .annotate(price_bucket=facets.price_bucket_expression())
+            .order_by()
+            .values_list("city_key", "price_bucket", "max_guests")
+            .annotate(total=Count("id"))
+        )
+        return facets.format_facets(facets.split_combinations(rows))
+
+    @classmethod
+    def search_conditions(
+        cls,
+        city=None,
+        check_in=None,
+        check_out=None,
+        min_price=None,
+        max_price=None,
+        guests=None,
+        bounds=None,
+    ):
+        """
+        Build the filter for a listing search
+
+        Each argument is optional; the filters map onto the composite
+        indexes declared in Meta. bounds is (south, west, north, east).
+
+        Returns:
+            Q object
+        """
+        from stay.availability import availability_engine
+
+        condition = Q()
+
+        if city:
+            condition &= Q(city_key=cls.normalize_city(city))
+
+        if min_price is not None:
+            condition &= Q(price_per_night__gte=min_price)
+
+        if max_price is not None:
+            condition &= Q(price_per_night__lte=max_price)
+
+        if guests:
+            condition &= Q(max_guests__gte=guests)
+
+        if bounds:
+            condition &= geo.bounds_condition(*bounds)
+
+        # Availability filter: in-memory engine for hot cities, otherwise
+        # the booked-nights calendar
+        if check_in and check_out:
+            if city and availability_engine.covers(city):
+                condition &= Q(
+                    id__in=availability_engine.free_listings(city, check_in, check_out)
+                )
+            else:
+                condition &= cls.availability_condition(check_in, check_out)
+
+        return condition
+
+    @classmethod
+    def availability_condition(cls, check_in, check_out):
+        """
+        Condition matching listings with no booked night in [check_in, check_out)
+
+        Probes the BookedNight (listing, night) index once per candidate
+        listing, so the cost does not depend on booking history.
+        """
+        return ~Exists(
+            BookedNight.objects.filter(
+                listing=OuterRef("pk"), night__gte=check_in, night__lt=check_out
+            )
+        )
+
     @classmethod
     def get_listing(cls, **kwargs):
         """
@@ -67,14 +331,116 @@ class Listing(ModelMixin):
             Listing object or dict
         """
         obj = kwargs.pop("obj", False)
+        fields = kwargs.pop("fields", None) or cls.get_fields()
         try:
             if obj:
                 return cls.objects.select_related("host").get(**kwargs)
             else:
-                return cls.objects.filter(**kwargs).values(*cls.get_fields()).first()
+                return cls.objects.filter(**kwargs).values(*fields).first()
         except cls.DoesNotExist:
             return None
 
+    @classmethod
+    def detail_cache_timeout(cls):
+        """
+        Lifetime of cached detail payloads: long in a cache every worker
+        shares, where writes evict them, and short in a per-process one
+        """
+        if isinstance(caches["default"], LocMemCache):
+            return cls.DETAIL_CACHE_LOCAL_TIMEOUT
+        return cls.DETAIL_CACHE_TIMEOUT
+
+    @classmethod
+    def get_listing_detail(cls, listing_id):
+        """
+        Get the detail payload of a listing, served from cache when possible
+
+        The payload includes the denormalized booking counters, so a miss
+        costs a single primary-key lookup and a hit costs none.
+
+        Returns:
+            dict or None
+        """
+        key = cls.DETAIL_CACHE_KEY.format(listing_id)
+        listing_data = cache.get(key)
+        if listing_data is None:
+            listing_data = cls.get_listing(
+                id=listing_id, fields=cls.get_detail_fields()
+            )
+            if listing_data is not None:
+                cache.set(key, listing_data, cls.detail_cache_timeout())
+        return listing_data
+
+    @classmethod
+    async def aget_listing_detail(cls, listing_id):
+        """Async variant of get_listing_detail, for use with the async ORM"""
+        key = cls.DETAIL_CACHE_KEY.format(listing_id)
+        listing_data = await cache.aget(key)
+        if listing_data is None:
+            listing_data = (
+                await cls.objects.filter(id=listing_id)
+                .values(*cls.get_detail_fields())
+                .afirst()
+            )
+            if listing_data is not None:
+                await cache.aset(key, listing_data, cls.detail_cache_timeout())
+        return listing_data
+
+    @classmethod
+    def invalidate_detail(cls, listing_id):
+        """
+        Drop the cached detail once the current transaction commits, so a
+        concurrent read cannot re-cache the rows being replaced
+        """
+        transaction.on_commit(
+            partial(cache.delete, cls.DETAIL_CACHE_KEY.format(listing_id))
+        )
+
+    @classmethod
+    def adjust_booking_counters(cls, listing_id, total=0, active=0):
+        """
+        Atomically shift the booking counters of a listing
+
+        Args:
+            listing_id: Listing to update
+            total: Change to total_bookings
+            active: Change to active_bookings
+        """
+        if not total and not active:
+            return
+        cls.objects.filter(pk=listing_id).update(
+            total_bookings=F("total_bookings") + total,
+            active_bookings=F("active_bookings") + active,
+        )
+        cls.invalidate_detail(listing_id)
+
+    @classmethod
+    def adjust_booking_counters_many(cls, changes):
+        """
+        Shift the booking counters of many listings
+
+        Listings sharing the same change are updated by one statement,
+        so a batch usually costs a handful of UPDATEs.
+
+        Args:
+            changes: Dict of {listing_id: (total, active)}
+        """
+        by_change = {}
+        for listing_id, change in changes.items():
+            if any(change):
+                by_change.setdefault(change, []).append(listing_id)
+        for (total, active), listing_ids in by_change.items():
+            cls.objects.filter(pk__in=listing_ids).update(
+                total_bookings=F("total_bookings") + total,
+                active_bookings=F("active_bookings") + active,
+            )
+        transaction.on_commit(
+            partial(
+                cache.delete_many,
+                [cls.DETAIL_CACHE_KEY.format(pk) for pk in changes],
+            )
+        )
+
 
 class Booking(ModelMixin):
     """Model for property bookings"""
@@ -89,6 +455,12 @@ class Booking(ModelMixin):
         (STATUS_CANCELLED, "Cancelled"),
     ]
 
+    # Statuses that hold the listing's dates
+    ACTIVE_STATUSES = [STATUS_PENDING, STATUS_CONFIRMED]
+
+    # Stable sort key for keyset pagination; id breaks created_at ties
+    PAGE_ORDERING = ("-created_at", "-id")
+
     listing = models.ForeignKey(
         Listing, on_delete=models.CASCADE, related_name="bookings"
     )
@@ -104,25 +476,166 @@ class Booking(ModelMixin):
     total_price = models.DecimalField(
         max_digits=10, decimal_places=2, null=True, blank=True
     )
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When a pending booking stops holding its dates; cleared once it leaves pending",
+    )
 
     class Meta:
         ordering = ["-created_at"]
         indexes = [
-            models.Index(fields=["listing", "check_in", "check_out"]),
+            # Availability checks only look at bookings holding their dates;
+            # cancelled rows accumulate outside this index. The condition
+            # must match ACTIVE_STATUSES, which Meta cannot reference.
+            models.Index(
+                fields=["listing", "check_in", "check_out"],
+                condition=Q(status__in=["pending", "confirmed"]),
+                name="stay_booking_active_idx",
+            ),
+            # "My bookings": one range scan per page, however long the history
+            models.Index(fields=["user", "-created_at", "-id"]),
+            # Only open holds carry expires_at, so the sweeper scans just those
+            models.Index(
+                fields=["expires_at"],
+                condition=Q(expires_at__isnull=False),
+                name="stay_booking_hold_idx",
+            ),
         ]
 
     def __str__(self):
         return f"Booking for {self.listing.title} by {self.user.email}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember loaded values so signal handlers can see what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+
+    @classmethod
+    def unreleased_bookings(cls):
+        """
+        Bookings whose status holds their dates, including holds that have
+        lapsed but were not cancelled by expire_holds yet; what the booked
+        nights, counters and monthly stats track. Served by
+        stay_booking_active_idx.
+
+        The statuses are inlined as literals rather than bound parameters:
+        a planner only picks a partial index when the query predicate
+        visibly implies the index condition, which SQLite cannot see
+        through placeholders.
+        """
+        statuses = ", ".join(f"'{status}'" for status in cls.ACTIVE_STATUSES)
+        return cls.objects.filter(
+            RawSQL(
+                f'"{cls._meta.db_table}"."status" IN ({statuses})',
+                (),
+                output_field=models.BooleanField(),
+            )
+        )
+
+    @classmethod
+    def active_bookings(cls):
+        """Bookings holding their dates right now: lapsed holds are free"""
+        return cls.unreleased_bookings().filter(
+            Q(expires_at__isnull=True) | Q(expires_at__gte=timezone.now())
+        )
+
+    def nights(self):
+        """Dates of every night covered by this booking"""
+        return [
+            self.check_in + timedelta(days=offset)
+            for offset in range((self.check_out - self.check_in).days)
+        ]
+
     def calculate_total_price(self):
-        """Calculate total price based on number of nights"""
-        nights = (self.check_out - self.check_in).days
-        return self.listing.price_per_night * nights
+        """Calculate total price from the listing's rate calendar"""
+        return ListingRate.quote(
+            [(self.listing_id, self.check_in, self.check_out)],
+            base_prices={self.listing_id: self.listing.price_per_night},
+        )[0]
+
+    @staticmethod
+    def hold_expiry():
+        """Expiry of a hold placed now (settings.STAY_BOOKING_HOLD_MINUTES)"""
+        return timezone.now() + timedelta(
+            minutes=getattr(settings, "STAY_BOOKING_HOLD_MINUTES", 15)
+        )
 
     def save(self, *args, **kwargs):
         if not self.total_price:
             self.total_price = self.calculate_total_price()
+        if self.status != self.STATUS_PENDING:
+            self.expires_at = None
+        elif self._state.adding and self.expires_at is None:
+            self.expires_at = self.hold_expiry()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "status" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "expires_at"}
         super().save(*args, **kwargs)
+        self._loaded_values = loaded_values(self)
+
+    @classmethod
+    def expire_holds(cls, batch_size=1000, listing_ids=None):
+        """
+        Cancel pending bookings whose hold has expired
+
+        Works in batches: each batch reads up to batch_size expired holds
+        through stay_booking_hold_idx and cancels them with one UPDATE,
+        then releases their nights and counters in the same transaction,
+        and their availability engine entries and cached searches once it
+        commits, since a queryset update sends no signals.
+
+        Args:
+            batch_size: Holds cancelled per transaction
+            listing_ids: Only cancel holds on these listings
+
+        Returns:
+            Number of bookings cancelled
+        """
+        from stay.signals import sync_cancelled_bookings
+
+        cancelled = 0
+        now = timezone.now()
+        holds = cls.objects.select_for_update(skip_locked=True, of=("self",)).filter(
+            status=cls.STATUS_PENDING, expires_at__lt=now
+        )
+        if listing_ids is not None:
+            holds = holds.filter(listing_id__in=listing_ids)
+        while True:
+            with transaction.atomic():
+                expired = list(
+                    holds.order_by("expires_at")
+                    .values_list(
+                        "id",
+                        "listing_id",
+                        "listing__city",
+                        "check_in",
+                        "check_out",
+                        "total_price",
+                        "created_at",
+                    )[:batch_size]
+                )
+                if not expired:
+                    break
+                cls.objects.filter(
+                    pk__in=[row[0] for row in expired],
+                    status=cls.STATUS_PENDING,
+                ).update(
+                    status=cls.STATUS_CANCELLED,
+                    expires_at=None,
+                    updated_at=timezone.now(),
+                )
+                sync_cancelled_bookings(expired)
+            cancelled += len(expired)
+            if len(expired) < batch_size:
+                break
+        return cancelled
 
     @classmethod
     def get_fields(cls):
@@ -146,36 +659,290 @@ class Booking(ModelMixin):
         """
         Create a new booking
 
+        The listing row is locked (SELECT ... FOR UPDATE) for the length of
+        the transaction, so concurrent requests for the same listing queue
+        behind each other while other listings are booked in parallel.
+        The locked row also supplies the price, so the insert needs no
+        further listing lookup. The overlap check always runs under that
+        lock: the in-memory availability engine can lag other workers'
+        writes in either direction, so it only serves searches.
+
         Args:
             **kwargs: Booking parameters
 
         Returns:
-            Booking object
+            Dict with "status", "message" and, on success, "booking"
         """
+        unavailable = {
+            "status": False,
+            "message": "Listing is not available for the given dates",
+        }
+        listing_id = kwargs.pop("listing_id", None)
         try:
-            # first check availability
-            listing = Listing.get_listing(obj=True, id=kwargs.get("listing_id"))
-            if not listing:
-                return {"status": False, "message": "Listing not found"}
-            overlapping_bookings = cls.objects.filter(
-                listing=listing,
-                check_in__lt=kwargs.get("check_out"),
-                check_out__gt=kwargs.get("check_in"),
-            )
-            if overlapping_bookings.exists():
-                return {
-                    "status": False,
-                    "message": "Listing is not available for the given dates",
-                }
-            booking = cls.objects.create(**kwargs)
+            with transaction.atomic():
+                listing = (
+                    Listing.objects.select_for_update()
+                    .only("id", "price_per_night", "city", "city_key")
+                    .filter(pk=listing_id)
+                    .first()
+                )
+                if not listing:
+                    return {"status": False, "message": "Listing not found"}
+
+                # Any competing booking for this listing committed before
+                # the lock was granted, so this check sees it
+                overlapping = cls.unreleased_bookings().filter(
+                    listing_id=listing_id,
+                    check_in__lt=kwargs.get("check_out"),
+                    check_out__gt=kwargs.get("check_in"),
+                ).values_list("expires_at", flat=True)
+                now = timezone.now()
+                if any(expires_at is None or expires_at >= now for expires_at in overlapping):
+                    return unavailable
+                if overlapping:
+                    # Only lapsed holds are in the way; release them first
+                    # so their nights do not linger next to the new booking
+                    cls.expire_holds(listing_ids=[listing_id])
+                booking = cls(listing=listing, **kwargs)
+                booking.save(force_insert=True)
             return {
                 "status": True,
-                # "booking": booking,
+                "booking": booking,
                 "message": "Booking created successfully",
             }
         except Exception as e:
             return {"status": False, "message": str(e)}
 
+    @classmethod
+    def confirm_booking(cls, booking_id, user):
+        """
+        Confirm a pending booking, ending its hold
+
+        The checkout step: a confirmed booking keeps its dates until it is
+        cancelled. Only the guest who booked, or staff, may confirm, and
+        only while the hold is open. The row lock orders this against
+        expire_holds, which skips locked rows.
+
+        Args:
+            booking_id: Booking to confirm
+            user: User confirming it
+
+        Returns:
+            Dict with "status" and "message"
+        """
+        with transaction.atomic():
+            booking = cls.objects.select_for_update().filter(pk=booking_id).first()
+            if booking is None or not (user.is_staff or booking.user_id == user.pk):
+                return {"status": False, "message": "Booking not found"}
+            if booking.status == cls.STATUS_CONFIRMED:
+                return {"status": True, "message": "Booking already confirmed"}
+            if booking.status != cls.STATUS_PENDING or (
+                booking.expires_at is not None and booking.expires_at < timezone.now()
+            ):
+                return {"status": False, "message": "Booking hold has expired"}
+            booking.status = cls.STATUS_CONFIRMED
+            booking.save(update_fields=["status", "updated_at"])
+        return {"status": True, "message": "Booking confirmed successfully"}
+
+    @classmethod
+    def create_bookings(cls, items):
+        """
+        Create many bookings with set-based availability checks
+
+        All listings in the batch are locked together (in primary-key
+        order, so concurrent batches cannot deadlock), existing bookings
+        that could collide are read with one query, and items are then
+        checked in order against those and against items accepted before
+        them. Accepted rows are written with a single bulk_create.
+
+        Args:
+            items: List of dicts with listing_id, user_id, check_in,
+                check_out, number_of_guests and optionally status
+
+        Returns:
+            List of {"status", "message", "id"} dicts, one per item in order
+        """
+        from django.contrib.auth import get_user_model
+        from stay.signals import sync_created_bookings
+
+        results = [None] * len(items)
+        listing_ids = {item["listing_id"] for item in items}
+        user_ids = {item["user_id"] for item in items}
+
+        with transaction.atomic():
+            listings = {
+                listing.pk: listing
+                for listing in Listing.objects.select_for_update()
+                .only("id", "price_per_night", "city", "city_key")
+                .filter(pk__in=listing_ids)
+                .order_by("pk")
+            }
+            known_users = set(
+                get_user_model()
+                .objects.filter(pk__in=user_ids)
+                .values_list("pk", flat=True)
+            )
+
+            # One window per listing spanning every item for it
+            windows = {}
+            for item in items:
+                start, end = windows.get(
+                    item["listing_id"], (item["check_in"], item["check_out"])
+                )
+                windows[item["listing_id"]] = (
+                    min(start, item["check_in"]),
+                    max(end, item["check_out"]),
+                )
+            condition = Q()
+            for listing_id, (start, end) in windows.items():
+                if listing_id in listings:
+                    condition |= Q(
+                        listing_id=listing_id, check_in__lt=end, check_out__gt=start
+                    )
+            taken = {}
+            lapsed = set()
+            now = timezone.now()
+            if condition:
+                for listing_id, check_in, check_out, expires_at in (
+                    cls.unreleased_bookings()
+                    .filter(condition)
+                    .values_list("listing_id", "check_in", "check_out", "expires_at")
+                ):
+                    if expires_at is not None and expires_at < now:
+                        lapsed.add(listing_id)
+                        continue
+                    taken.setdefault(listing_id, []).append((check_in, check_out))
+            if lapsed:
+                cls.expire_holds(listing_ids=lapsed)
+
+            accepted = []
+            hold_expiry = cls.hold_expiry()
+            for index, item in enumerate(items):
+                listing = listings.get(item["listing_id"])
+                if listing is None:
+                    results[index] = {"status": False, "message": "Listing not found"}
+                    continue
+                if item["user_id"] not in known_users:
+                    results[index] = {"status": False, "message": "User not found"}
+                    continue
+                intervals = taken.setdefault(listing.pk, [])
+                if any(
+                    check_in < item["check_out"] and check_out > item["check_in"]
+                    for check_in, check_out in intervals
+                ):
+                    results[index] = {
+                        "status": False,
+                        "message": "Listing is not available for the given dates",
+                    }
+                    continue
+                intervals.append((item["check_in"], item["check_out"]))
+                fields = {key: value for key, value in item.items() if key != "listing_id"}
+                booking = cls(listing=listing, **fields)
+                # bulk_create skips save(), which would set this
+                if booking.status == cls.STATUS_PENDING:
+                    booking.expires_at = hold_expiry
+                accepted.append(booking)
+                results[index] = {
+                    "status": True,
+                    "message": "Booking created successfully",
+                    "id": booking.pk,
+                }
+
+            # Price the whole batch with one rate lookup
+            totals = ListingRate.quote(
+                [
+                    (booking.listing_id, booking.check_in, booking.check_out)
+                    for booking in accepted
+                ],
+                base_prices={
+                    pk: listing.price_per_night for pk, listing in listings.items()
+                },
+            )
+            for booking, total in zip(accepted, totals):
+                booking.total_price = total
+
+            cls.objects.bulk_create(accepted)
+            # bulk_create sends no post_save signals
+            sync_created_bookings(accepted)
+
+        return results
+
+    @classmethod
+    def booked_intervals(cls, listing_ids, start, end):
+        """
+        Active booking intervals of many listings within [start, end)
+
+        One query over the (listing, check_in, check_out) index.
+
+        Returns:
+            Dict of {listing_id: [(check_in, check_out), ...]}
+        """
+        intervals = {listing_id: [] for listing_id in listing_ids}
+        rows = cls.active_bookings().filter(
+            listing_id__in=listing_ids,
+            check_in__lt=end,
+            check_out__gt=start,
+        ).values_list("listing_id", "check_in", "check_out")
+        for listing_id, check_in, check_out in rows:
+            intervals[listing_id].append((check_in, check_out))
+        return intervals
+
+    @classmethod
+    def fetch_bookings_page(cls, conditions=None, cursor=None, count=None):
+        """
+        Fetch one keyset page of bookings, newest first
+
+        Args:
+            conditions: Q object for filtering
+            cursor: next_cursor returned with the previous page
+            count: Page size
+
+        Returns:
+            Tuple of (list of dicts, next_cursor or None)
+        """
+        queryset = cls.objects.all()
+        if conditions:
+            queryset = queryset.filter(conditions)
+        queryset = queryset.values(
+            "id",
+            "listing_id",
+            "user_id",
+            "status",
+            "check_in",
+            "check_out",
+            "number_of_guests",
+            "total_price",
+            "expires_at",
+            "created_at",
+            listing_title=F("listing__title"),
+            listing_city=F("listing__city"),
+        )
+        return paginate_keyset(
+            queryset, cls.PAGE_ORDERING, cursor=cursor, page_size=count
+        )
+
+    @classmethod
+    def get_export_fields(cls):
+        """Columns of booking exports"""
+        return [
+            *cls.get_fields(),
+            "status",
+            "expires_at",
+            "updated_at",
+        ]
+
+    @classmethod
+    def export_rows(cls, conditions=None, chunk_size=exports.CHUNK_SIZE):
+        """Stream bookings as dicts of get_export_fields(); see Listing.export_rows"""
+        queryset = cls.objects.all()
+        if conditions:
+            queryset = queryset.filter(conditions)
+        return (
+            queryset.order_by("id")
+            .values(*cls.get_export_fields())
+            .iterator(chunk_size=chunk_size)
+        )
+
     @classmethod
     def fetch_bookings(cls, values=False, conditions=None, count=100):
         """
@@ -223,3 +990,543 @@ class Booking(ModelMixin):
                 return cls.objects.select_related("listing", "user").get(**kwargs)
         except cls.DoesNotExist:
             return None
+
+
+class BookedNight(models.Model):
+    """
+    Materialized occupancy calendar: one row per night held by an active booking.
+
+    Maintained from Booking saves (see stay.signals) so date-range searches
+    become an index lookup instead of an anti-join over all bookings.
+    """
+
+    listing = models.ForeignKey(
+        Listing, on_delete=models.CASCADE, related_name="booked_nights"
+    )
+    booking = models.ForeignKey(
+        Booking, on_delete=models.CASCADE, related_name="booked_nights"
+    )
+    night = models.DateField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["listing", "night"]),
+        ]
+
+    def __str__(self):
+        return f"{self.listing_id} booked on {self.night}"
+
+    @classmethod
+    def sync_bookings(cls, bookings, replace=True):
+        """
+        Rewrite the nights held by the given bookings
+
+        Args:
+            bookings: Iterable of Booking objects in their current state
+            replace: Delete previously written nights first; False for
+                bookings that were just inserted and cannot have any
+        """
+        bookings = list(bookings)
+        if not bookings:
+            return
+
+        if replace:
+            cls.objects.filter(booking__in=[booking.pk for booking in bookings]).delete()
+        cls.objects.bulk_create(
+            [
+                cls(listing_id=booking.listing_id, booking_id=booking.pk, night=night)
+                for booking in bookings
+                if booking.is_active
+                for night in booking.nights()
+            ]
+        )
+
+    @classmethod
+    def rebuild(cls, chunk_size=2000):
+        """
+        Recompute the whole calendar from active bookings
+
+        Returns:
+            Number of nights written
+        """
+        cls.objects.all().delete()
+        written = 0
+        batch = []
+        bookings = Booking.unreleased_bookings().only(
+            "id", "listing_id", "status", "check_in", "check_out"
+        )
+        for booking in bookings.iterator(chunk_size=chunk_size):
+            batch.extend(
+                cls(listing_id=booking.listing_id, booking_id=booking.pk, night=night)
+                for night in booking.nights()
+            )
+            if len(batch) >= chunk_size:
+                written += len(cls.objects.bulk_create(batch))
+                batch = []
+        written += len(cls.objects.bulk_create(batch))
+        return written
+
+
+class ListingFacet(models.Model):
+    """
+    Rollup of listing counts per city and facet value.
+
+    One row per (city_key, dimension, value), kept current from Listing
+    saves and deletes (see stay.signals) so facet counts for unfiltered
+    and city-only searches are read without scanning listings. Writes
+    that bypass signals (queryset.update, bulk_create) need a
+    `rebuild_facets` run.
+    """
+
+    city_key = models.CharField(max_length=100)
+    dimension = models.CharField(max_length=20)
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["city_key", "dimension", "value"], name="stay_facet_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.city_key} {self.dimension}={self.value}: {self.count}"
+
+    @staticmethod
+    def listing_keys(city_key, price, guests):
+        return [
+            (city_key, dimension, value)
+            for dimension, value in facets.facet_values(city_key, price, guests)
+        ]
+
+    @classmethod
+    def adjust(cls, changes):
+        """
+        Apply count deltas to rollup rows, creating missing rows
+
+        Rows sharing a delta are updated together, so a listing create
+        or delete costs two queries and a listing edit three.
+
+        Args:
+            changes: Dict of {(city_key, dimension, value): delta}
+        """
+        changes = {key: delta for key, delta in changes.items() if delta}
+        if not changes:
+            return
+
+        added = [key for key, delta in changes.items() if delta > 0]
+        if added:
+            cls.objects.bulk_create(
+                [
+                    cls(city_key=city_key, dimension=dimension, value=value)
+                    for city_key, dimension, value in added
+                ],
+                ignore_conflicts=True,
+            )
+
+        by_delta = {}
+        for key, delta in changes.items():
+            by_delta.setdefault(delta, []).append(key)
+        for delta, keys in by_delta.items():
+            condition = Q()
+            for city_key, dimension, value in keys:
+                condition |= Q(city_key=city_key, dimension=dimension, value=value)
+            cls.objects.filter(condition).update(count=F("count") + delta)
+
+    @classmethod
+    def apply_listing(cls, listing, created):
+        """Move a saved listing's counts from its loaded values to its current ones"""
+        changes = {}
+        if not created:
+            loaded = getattr(listing, "_loaded_values", None)
+            if loaded is None:
+                return
+            old = cls.listing_keys(
+                loaded.get("city_key", listing.city_key),
+                loaded.get("price_per_night", listing.price_per_night),
+                loaded.get("max_guests", listing.max_guests),
+            )
+            for key in old:
+                changes[key] = changes.get(key, 0) - 1
+        for key in cls.listing_keys(
+            listing.city_key, listing.price_per_night, listing.max_guests
+        ):
+            changes[key] = changes.get(key, 0) + 1
+        cls.adjust(changes)
+
+    @classmethod
+    def discard_listing(cls, listing):
+        cls.adjust(
+            {
+                key: -1
+                for key in cls.listing_keys(
+                    listing.city_key, listing.price_per_night, listing.max_guests
+                )
+            }
+        )
+
+    @classmethod
+    def counts(cls, city=None):
+        """
+        Facet counts from the rollup
+
+        Args:
+            city: Restrict to one city; all cities when omitted
+
+        Returns:
+            Dict of dimension -> list of {"value", "count"}
+        """
+        queryset = cls.objects.filter(count__gt=0)
+        if city:
+            queryset = queryset.filter(city_key=Listing.normalize_city(city))
+        rows = (
+            queryset.order_by()
+            .values_list("dimension", "value")
+            .annotate(total=Sum("count"))
+        )
+        return facets.format_facets(
+            {(dimension, value): total for dimension, value, total in rows}
+        )
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute the rollup from the listings table with one grouped query
+
+        Returns:
+            Number of rollup rows written
+        """
+        rows = (
+            Listing.objects.annotate(price_bucket=facets.price_bucket_expression())
+            .order_by()
+            .values_list("city_key", "price_bucket", "max_guests")
+            .annotate(total=Count("id"))
+        )
+        counts = {}
+        for city_key, bucket, guests, total in rows:
+            for key in (
+                (city_key, facets.DIMENSION_CITY, city_key),
+                (city_key, facets.DIMENSION_PRICE, bucket),
+                (city_key, facets.DIMENSION_GUESTS, str(guests)),
+            ):
+                counts[key] = counts.get(key, 0) + total
+
+        cls.objects.all().delete()
+        created = cls.objects.bulk_create(
+            [
+                cls(city_key=city_key, dimension=dimension, value=value, count=total)
+                for (city_key, dimension, value), total in counts.items()
+            ],
+            batch_size=1000,
+        )
+        return len(created)
+
+
+class ListingRate(models.Model):
+    """
+    Rate calendar entry overriding a listing's base price_per_night.
+
+    Seasonal rates cover a date range, weekend rates apply to Friday and
+    Saturday nights (optionally within a range) and overrides pin single
+    dates or short ranges. Where entries overlap, overrides beat weekend
+    rates, which beat seasonal rates. end_date is exclusive, like
+    check_out.
+    """
+
+    KIND_CHOICES = [
+        (pricing.RATE_SEASON, "Season"),
+        (pricing.RATE_WEEKEND, "Weekend"),
+        (pricing.RATE_OVERRIDE, "Date override"),
+    ]
+
+    listing = models.ForeignKey(
+        Listing, on_delete=models.CASCADE, related_name="rates"
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    start_date = models.DateField(null=True, blank=True)
+    end_date = models.DateField(null=True, blank=True)
+    price_per_night = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["listing", "start_date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.listing_id} {self.kind} {self.start_date}-{self.end_date}"
+
+    def clean(self):
+        if self.kind != pricing.RATE_WEEKEND and not (
+            self.start_date and self.end_date
+        ):
+            raise ValidationError(
+                "Seasonal rates and overrides need a start and end date"
+            )
+        if self.start_date and self.end_date and self.end_date <= self.start_date:
+            raise ValidationError("end_date must be after start_date")
+
+    @classmethod
+    def quote(cls, requests, base_prices=None):
+        """
+        Total prices for many stays, with one query for the rates
+
+        Args:
+            requests: List of (listing_id, check_in, check_out)
+            base_prices: Dict of {listing_id: price_per_night}; loaded
+                with one more query when omitted
+
+        Returns:
+            List of Decimal totals, one per request in order
+        """
+        if not requests:
+            return []
+        listing_ids = {listing_id for listing_id, _, _ in requests}
+        if base_prices is None:
+            base_prices = dict(
+                Listing.objects.filter(pk__in=listing_ids).values_list(
+                    "id", "price_per_night"
+                )
+            )
+        start = min(check_in for _, check_in, _ in requests)
+        end = max(check_out for _, _, check_out in requests)
+        rates = cls.objects.filter(
+            Q(start_date__isnull=True) | Q(start_date__lt=end),
+            Q(end_date__isnull=True) | Q(end_date__gt=start),
+            listing_id__in=listing_ids,
+        ).only("listing_id", "kind", "start_date", "end_date", "price_per_night")
+        return pricing.calendar_totals(requests, base_prices, rates)
+
+    @classmethod
+    def annotate_totals(cls, listings, check_in, check_out):
+        """Add total_price for the stay to each listing dict in place"""
+        totals = cls.quote(
+            [(listing["id"], check_in, check_out) for listing in listings],
+            base_prices={
+                listing["id"]: listing["price_per_night"] for listing in listings
+            },
+        )
+        for listing, total in zip(listings, totals):
+            listing["total_price"] = total
+
+
+class ListingMonthlyStats(models.Model):
+    """
+    Per listing, per month rollup of active bookings for host dashboards.
+
+    Holds the booked nights and revenue falling in the month, and the
+    arrivals (with their summed lead time) checking in during it. Kept
+    current incrementally from Booking writes (see stay.signals), so the
+    dashboard reads a handful of rows per listing instead of aggregating
+    bookings. Writes that bypass signals need a `rebuild_stats` run.
+    """
+
+    listing = models.ForeignKey(
+        Listing, on_delete=models.CASCADE, related_name="monthly_stats"
+    )
+    month = models.DateField(help_text="First day of the month")
+    booked_nights = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    arrivals = models.IntegerField(default=0)
+    lead_days = models.IntegerField(
+        default=0, help_text="Sum of days from booking to check-in over arrivals"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["listing", "month"], name="stay_monthly_stats_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.listing_id} {self.month:%Y-%m}"
+
+    @staticmethod
+    def booking_changes(bookings, sign=1):
+        """
+        Rollup deltas of bookings
+
+        Args:
+            bookings: Iterable of (listing_id, check_in, check_out,
+                total_price, created_at)
+            sign: 1 to add the bookings, -1 to take them away
+
+        Returns:
+            Dict of {(listing_id, month): [nights, revenue_cents, arrivals, lead_days]}
+        """
+        changes = {}
+        for listing_id, check_in, check_out, total_price, created_at in bookings:
+            months = stats.booking_months(check_in, check_out, total_price, created_at)
+            for month, contribution in months.items():
+                totals = changes.setdefault((listing_id, month), [0, 0, 0, 0])
+                for index, value in enumerate(contribution):
+                    totals[index] += sign * value
+        return changes
+
+    @classmethod
+    def adjust(cls, changes):
+        """
+        Apply booking_changes() deltas, creating rows that gain something
+
+        Rows sharing a delta are updated together. Pure removals never
+        create rows, so cascading a listing delete cannot leave new ones
+        behind.
+        """
+        changes = {key: tuple(delta) for key, delta in changes.items() if any(delta)}
+        if not changes:
+            return
+
+        added = [key for key, delta in changes.items() if max(delta) > 0]
+        if added:
+            cls.objects.bulk_create(
+                [cls(listing_id=listing_id, month=month) for listing_id, month in added],
+                ignore_conflicts=True,
+            )
+
+        by_delta = {}
+        for key, delta in changes.items():
+            by_delta.setdefault(delta, []).append(key)
+        for (nights, cents, arrivals, lead), keys in by_delta.items():
+            condition = Q()
+            for listing_id, month in keys:
+                condition |= Q(listing_id=listing_id, month=month)
+            cls.objects.filter(condition).update(
+                booked_nights=F("booked_nights") + nights,
+                revenue=F("revenue") + pricing.from_cents(cents),
+                arrivals=F("arrivals") + arrivals,
+                lead_days=F("lead_days") + lead,
+            )
+
+    @staticmethod
+    def _booking_row(booking, values=None):
+        values = values or {}
+        return (
+            booking.listing_id,
+            values.get("check_in", booking.check_in),
+            values.get("check_out", booking.check_out),
+            values.get("total_price", booking.total_price),
+            booking.created_at,
+        )
+
+    @classmethod
+    def apply_booking(cls, booking, created):
+        """Move a saved booking's contribution from its loaded values to its current ones"""
+        changes = {}
+        if not created:
+            loaded = getattr(booking, "_loaded_values", None)
+            if loaded is None:
+                return
+            if loaded.get("status", booking.status) in Booking.ACTIVE_STATUSES:
+                changes = cls.booking_changes([cls._booking_row(booking, loaded)], sign=-1)
+        if booking.is_active:
+            for key, delta in cls.booking_changes([cls._booking_row(booking)]).items():
+                totals = changes.setdefault(key, [0, 0, 0, 0])
+                for index, value in enumerate(delta):
+                    totals[index] += value
+        cls.adjust(changes)
+
+    @classmethod
+    def apply_bookings(cls, bookings):
+        """Add newly inserted active bookings"""
+        cls.adjust(
+            cls.booking_changes(
+                [cls._booking_row(booking) for booking in bookings if booking.is_active]
+            )
+        )
+
+    @classmethod
+    def discard_booking(cls, booking):
+        if booking.is_active:
+            cls.adjust(cls.booking_changes([cls._booking_row(booking)], sign=-1))
+
+    @classmethod
+    def dashboard(cls, conditions, start_month, end_month):
+        """
+        Per listing performance over whole months, read from the rollup
+
+        Args:
+            conditions: Q object selecting listings (e.g. by host)
+            start_month: First month (any day in it)
+            end_month: Last month, inclusive (any day in it)
+
+        Returns:
+            List of dicts, one per matching listing
+        """
+        start = stats.month_start(start_month)
+        end = stats.next_month(stats.month_start(end_month))
+
+        listings = list(
+            Listing.objects.filter(conditions)
+            .order_by("title", "id")
+            .values("id", "title", "city")
+        )
+        rows = (
+            cls.objects.filter(
+                listing_id__in=[listing["id"] for listing in listings],
+                month__gte=start,
+                month__lt=end,
+            )
+            .order_by()
+            .values("listing_id")
+            .annotate(
+                booked_nights=Sum("booked_nights"),
+                revenue=Sum("revenue"),
+                arrivals=Sum("arrivals"),
+                lead_days=Sum("lead_days"),
+            )
+        )
+        totals = {row["listing_id"]: row for row in rows}
+
+        for listing in listings:
+            row = totals.get(listing["id"], {})
+            booked_nights = row.get("booked_nights") or 0
+            revenue = pricing.from_cents(pricing.to_cents(row.get("revenue") or 0))
+            arrivals = row.get("arrivals") or 0
+            listing.update(
+                booked_nights=booked_nights,
+                occupancy_rate=stats.occupancy_rate(booked_nights, start, end),
+                revenue=revenue,
+                average_nightly_rate=(
+                    pricing.from_cents(pricing.to_cents(revenue) // booked_nights)
+                    if booked_nights
+                    else None
+                ),
+                arrivals=arrivals,
+                average_lead_days=(
+                    round((row.get("lead_days") or 0) / arrivals, 1) if arrivals else None
+                ),
+            )
+        return listings
+
+    @classmethod
+    def rebuild(cls, chunk_size=2000):
+        """
+        Recompute the rollup from active bookings, streamed through a
+        server-side cursor
+
+        Returns:
+            Number of rollup rows written
+        """
+        changes = cls.booking_changes(
+            Booking.unreleased_bookings()
+            .order_by()
+            .values_list("listing_id", "check_in", "check_out", "total_price", "created_at")
+            .iterator(chunk_size=chunk_size)
+        )
+        cls.objects.all().delete()
+        created = cls.objects.bulk_create(
+            [
+                cls(
+                    listing_id=listing_id,
+                    month=month,
+                    booked_nights=nights,
+                    revenue=pricing.from_cents(cents),
+                    arrivals=arrivals,
+                    lead_days=lead,
+                )
+                for (listing_id, month), (nights, cents, arrivals, lead) in changes.items()
+            ],
+            batch_size=1000,
+        )
+        return len(created)
@@ -0,0 +1,50 @@
+import base64
+
+
+ENCODING_RANGES = "ranges"
+ENCODING_BITSET = "bitset"
+ENCODINGS = (ENCODING_RANGES, ENCODING_BITSET)
+
+
+def booked_runs(intervals, start, days):
+    """
+    Merge booked intervals into sorted, non-overlapping runs of nights
+
+    Args:
+        intervals: Iterable of (check_in, check_out), check_out exclusive
+        start: First night of the calendar
+        days: Number of nights in the calendar
+
+    Returns:
+        List of [offset, length] pairs, offsets counted from start
+    """
+    runs = []
+    for check_in, check_out in sorted(intervals):
+        first = max((check_in - start).days, 0)
+        last = min((check_out - start).days, days)
+        if first >= last:
+            continue
+        if runs and first <= runs[-1][0] + runs[-1][1]:
+            runs[-1][1] = max(runs[-1][1], last - runs[-1][0])
+        else:
+            runs.append([first, last - first])
+    return runs
+
+
+def encode_bitset(runs, days):
+    """
+    Encode runs as a base64 bitset: bit i (byte i // 8, bit i % 8, least
+    significant first) is set when night start + i is booked
+    """
+    bits = bytearray((days + 7) // 8)
+    for offset, length in runs:
+        for night in range(offset, offset + length):
+            bits[night // 8] |= 1 << (night % 8)
+    return base64.b64encode(bytes(bits)).decode()
+
+
+def encode(intervals, start, days, encoding=ENCODING_RANGES):
+    runs = booked_runs(intervals, start, days)
+    if encoding == ENCODING_BITSET:
+        return encode_bitset(runs, days)
+    return runs
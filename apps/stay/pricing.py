@@ -0,0 +1,90 @@
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+
+RATE_SEASON = "season"
+RATE_WEEKEND = "weekend"
+RATE_OVERRIDE = "override"
+
+# Later kinds win where rates overlap; within a kind the later start wins
+RATE_PRECEDENCE = {RATE_SEASON: 1, RATE_WEEKEND: 2, RATE_OVERRIDE: 3}
+
+# Nights starting on Friday and Saturday (date.weekday() numbering)
+WEEKEND_NIGHTS = (4, 5)
+
+
+def to_cents(price):
+    return int((Decimal(price) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    return (Decimal(int(cents)) / 100).quantize(Decimal("0.01"))
+
+
+def calendar_totals(requests, base_prices, rates):
+    """
+    Total stay price for many (listing, date range) requests at once
+
+    Builds one nightly price matrix (listings x nights of the combined
+    window) in integer cents, lays every rate over it as a slice
+    assignment, and reads each request's total off a row-wise prefix
+    sum, so the cost grows with the number of rates rather than with
+    nights times requests.
+
+    Args:
+        requests: List of (listing_id, check_in, check_out)
+        base_prices: Dict of {listing_id: price_per_night}
+        rates: Iterable of objects with listing_id, kind, start_date,
+            end_date (exclusive, None for open-ended) and price_per_night
+
+    Returns:
+        List of Decimal totals, one per request in order
+    """
+    if not requests:
+        return []
+
+    start = min(check_in for _, check_in, _ in requests)
+    end = max(check_out for _, _, check_out in requests)
+    nights = (end - start).days
+
+    listing_ids = list(dict.fromkeys(listing_id for listing_id, _, _ in requests))
+    rows = {listing_id: row for row, listing_id in enumerate(listing_ids)}
+    base = np.array(
+        [to_cents(base_prices[listing_id]) for listing_id in listing_ids], dtype=np.int64
+    )
+    nightly = np.repeat(base[:, np.newaxis], nights, axis=1)
+
+    weekdays = (np.arange(nights) + start.weekday()) % 7
+    weekend = np.isin(weekdays, WEEKEND_NIGHTS)
+
+    ordered = sorted(
+        rates, key=lambda rate: (RATE_PRECEDENCE[rate.kind], rate.start_date or date.min)
+    )
+    for rate in ordered:
+        row = rows.get(rate.listing_id)
+        if row is None:
+            continue
+        first = 0
+        if rate.start_date is not None:
+            first = max((rate.start_date - start).days, 0)
+        last = nights
+        if rate.end_date is not None:
+            last = min((rate.end_date - start).days, nights)
+        if first >= last:
+            continue
+        span = nightly[row, first:last]
+        if rate.kind == RATE_WEEKEND:
+            span[weekend[first:last]] = to_cents(rate.price_per_night)
+        else:
+            span[:] = to_cents(rate.price_per_night)
+
+    totals = np.zeros((len(listing_ids), nights + 1), dtype=np.int64)
+    np.cumsum(nightly, axis=1, out=totals[:, 1:])
+
+    request_rows = np.array([rows[listing_id] for listing_id, _, _ in requests])
+    firsts = np.array([(check_in - start).days for _, check_in, _ in requests])
+    lasts = np.array([(check_out - start).days for _, _, check_out in requests])
+    cents = totals[request_rows, lasts] - totals[request_rows, firsts]
+    return [from_cents(total) for total in cents]
@@ -0,0 +1,159 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+
+# Keyword results are ranked first, then fall back to the listing page key
+KEYWORD_ORDERING = ("-rank", "-created_at", "-id")
+
+FTS_TABLE = "stay_listing_fts"
+
+SQLITE_FTS_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, city, description, content='stay_listing', content_rowid='rowid'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON stay_listing BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, city, description)
+        VALUES (new.rowid, new.title, new.city, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON stay_listing BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, city, description)
+        VALUES ('delete', old.rowid, old.title, old.city, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON stay_listing BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, city, description)
+        VALUES ('delete', old.rowid, old.title, old.city, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, city, description)
+        VALUES (new.rowid, new.title, new.city, new.description);
+    END
+    """,
+]
+
+POSTGRES_FTS_SQL = [
+    "ALTER TABLE stay_listing ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """
+    CREATE OR REPLACE FUNCTION stay_listing_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.city, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS stay_listing_search_vector_trigger ON stay_listing",
+    """
+    CREATE TRIGGER stay_listing_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, city, description ON stay_listing
+    FOR EACH ROW EXECUTE FUNCTION stay_listing_search_vector_update()
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS stay_listing_search_vector_gin
+    ON stay_listing USING gin (search_vector)
+    """,
+]
+
+
+def install_fulltext(schema_connection=None):
+    """
+    Create (or repair) the full-text index for the current database
+
+    Idempotent. On SQLite, Django rebuilds a table when a migration alters
+    it, which drops its triggers, so this also runs after every migrate
+    and reindexes when the triggers had to be recreated.
+    """
+    schema_connection = schema_connection or connection
+    vendor = schema_connection.vendor
+
+    with schema_connection.cursor() as cursor:
+        if vendor == "sqlite":
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name = %s",
+                [f"{FTS_TABLE}_ai"],
+            )
+            installed = cursor.fetchone()[0] == 1
+            for statement in SQLITE_FTS_SQL:
+                cursor.execute(statement)
+            if not installed:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+        elif vendor == "postgresql":
+            for statement in POSTGRES_FTS_SQL:
+                cursor.execute(statement)
+            # Backfill rows written before the trigger existed
+            cursor.execute(
+                "UPDATE stay_listing SET title = title WHERE search_vector IS NULL"
+            )
+
+
+def search_terms(query):
+    """Split user input into plain word terms"""
+    return re.findall(r"\w+", query.lower())
+
+
+def keyword_filter(query):
+    """
+    Build the filter and rank expression for a keyword search
+
+    All terms must match. Ranking uses ts_rank on PostgreSQL and bm25 on
+    SQLite; other databases fall back to icontains with a constant rank.
+
+    Returns:
+        Tuple of (Q object, rank expression)
+    """
+    terms = search_terms(query)
+    vendor = connection.vendor
+
+    if vendor == "postgresql":
+        text = " ".join(terms)
+        return (
+            Q(
+                id__in=RawSQL(
+                    "SELECT id FROM stay_listing "
+                    "WHERE search_vector @@ plainto_tsquery('english', %s)",
+                    (text,),
+                )
+            ),
+            RawSQL(
+                "ts_rank(stay_listing.search_vector, plainto_tsquery('english', %s))",
+                (text,),
+                output_field=FloatField(),
+            ),
+        )
+
+    if vendor == "sqlite":
+        match = " ".join(f'"{term}"' for term in terms)
+        return (
+            Q(
+                id__in=RawSQL(
+                    "SELECT id FROM stay_listing WHERE rowid IN "
+                    f"(SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)",
+                    (match,),
+                )
+            ),
+            RawSQL(
+                f"(SELECT -bm25({FTS_TABLE}, 10.0, 5.0, 1.0) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = stay_listing.rowid)",
+                (match,),
+                output_field=FloatField(),
+            ),
+        )
+
+    condition = Q()
+    for term in terms:
+        condition &= (
+            Q(title__icontains=term)
+            | Q(city__icontains=term)
+            | Q(description__icontains=term)
+        )
+    return condition, Value(0.0, output_field=FloatField())
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import caches
+
+from stay.models import Listing
+from stay.stats import month_start, next_month
+
+
+KEY_PREFIX = "stay:search"
+ALL_CITIES = "*"
+
+
+class SearchCache:
+    """
+    Result cache for listing searches, keyed on the normalized request.
+
+    Every key also carries the current generation numbers of the data the
+    search depends on: one per city (or ALL_CITIES for unscoped searches)
+    and, for dated searches, one per city and month the window touches.
+    A write never deletes entries; it bumps the generations it affects,
+    and entries under older numbers are never read again and age out.
+    A booking bumps the months of its nights in its city and in
+    ALL_CITIES; a listing change bumps the whole city. Works with any
+    Django cache backend; configure it with settings.STAY_SEARCH_CACHE.
+    """
+
+    @property
+    def config(self):
+        return getattr(settings, "STAY_SEARCH_CACHE", {})
+
+    @property
+    def enabled(self):
+        return self.config.get("ENABLED", True)
+
+    @property
+    def cache(self):
+        return caches[self.config.get("ALIAS", "default")]
+
+    @property
+    def timeout(self):
+        return self.config.get("TIMEOUT", 300)
+
+    # ---------- keys ----------
+
+    @staticmethod
+    def normalize_city(city):
+        return Listing.normalize_city(city) if city else ALL_CITIES
+
+    @staticmethod
+    def _generation_key(scope, month=None):
+        key = f"{KEY_PREFIX}:generation:{quote(scope)}"
+        return f"{key}:{month:%Y-%m}" if month else key
+
+    def _month_keys(self, scope, check_in, check_out):
+        """Generation keys of every month with a night in [check_in, check_out)"""
+        keys = []
+        month = month_start(check_in)
+        while month < check_out:
+            keys.append(self._generation_key(scope, month))
+            month = next_month(month)
+        return keys
+
+    def _generations(self, keys):
+        """
+        Current values of the given generation counters
+
+        A missing counter (never bumped, or evicted) starts from the
+        clock, so it never returns to a value an older entry was keyed on.
+        """
+        found = self.cache.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            start = time.time_ns()
+            for key in missing:
+                self.cache.add(key, start, None)
+            found.update(self.cache.get_many(missing))
+        return [found.get(key) for key in keys]
+
+    def make_key(self, endpoint, payload):
+        """Key for a validated request payload at the current generations"""
+        payload = dict(payload)
+        scope = self.normalize_city(payload.get("city"))
+        if payload.get("city"):
+            payload["city"] = scope
+        if isinstance(payload.get("q"), str):
+            payload["q"] = " ".join(payload["q"].lower().split())
+
+        generations = []
+        if self.enabled:
+            keys = [self._generation_key(scope)]
+            if payload.get("check_in") and payload.get("check_out"):
+                keys += self._month_keys(scope, payload["check_in"], payload["check_out"])
+            generations = self._generations(keys)
+
+        normalized = json.dumps([payload, generations], sort_keys=True, default=str)
+        digest = hashlib.sha1(normalized.encode()).hexdigest()
+        return f"{KEY_PREFIX}:{endpoint}:{digest}"
+
+    # ---------- reads and writes ----------
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        data = self.cache.get(key)
+        self._count("hits" if data is not None else "misses")
+        return data
+
+    def set(self, key, data):
+        """Store a result under a key from make_key"""
+        if not self.enabled:
+            return
+        self.cache.set(key, data, self.timeout)
+
+    # ---------- invalidation ----------
+
+    def _bump(self, keys):
+        for key in keys:
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.add(key, time.time_ns(), None)
+
+    def invalidate_city(self, city):
+        """A listing in `city` changed: retire every result that may include it"""
+        if not self.enabled:
+            return
+        self._bump(
+            self._generation_key(scope) for scope in {self.normalize_city(city), ALL_CITIES}
+        )
+
+    def invalidate_dates(self, city, check_in, check_out):
+        """A booking in `city` changed: retire results for the months it touches"""
+        if not self.enabled:
+            return
+        for scope in {self.normalize_city(city), ALL_CITIES}:
+            self._bump(self._month_keys(scope, check_in, check_out))
+
+    # ---------- counters ----------
+
+    def _count(self, name):
+        key = f"{KEY_PREFIX}:stats:{name}"
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key, 0, None)
+            self.cache.incr(key)
+
+    def stats(self):
+        """Hit and miss counters shared by every worker using the backend"""
+        counters = self.cache.get_many(
+            [f"{KEY_PREFIX}:stats:hits", f"{KEY_PREFIX}:stats:misses"]
+        )
+        hits = counters.get(f"{KEY_PREFIX}:stats:hits", 0)
+        misses = counters.get(f"{KEY_PREFIX}:stats:misses", 0)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else None,
+        }
+
+
+search_cache = SearchCache()
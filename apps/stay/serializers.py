@@ -1,6 +1,9 @@
 from rest_framework import serializers
-from datetime import date
+from datetime import date, timedelta
+from commons.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, decode_cursor
 from stay.models import Listing, Booking
+from stay import exports, occupancy, stats
+from stay.search import KEYWORD_ORDERING, search_terms
 
 
 # ==================== Listing Serializers ====================
@@ -38,14 +41,48 @@ class ListingFilterSerializer(serializers.Serializer):
     )
 
 
-class FetchListingsSerializer(serializers.Serializer):
+class CursorPageSerializer(serializers.Serializer):
+    """Keyset pagination fields shared by listing and booking queries"""
+
+    count = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=MAX_PAGE_SIZE,
+        default=DEFAULT_PAGE_SIZE,
+        help_text=f"Page size (max {MAX_PAGE_SIZE}).",
+    )
+    cursor = serializers.CharField(
+        required=False,
+        help_text="next_cursor from the previous page; omit for the first page.",
+    )
+
+    model = Listing
+
+    def get_ordering(self, data):
+        """Sort key the cursor was issued for"""
+        return Listing.PAGE_ORDERING
+
+    def validate(self, data):
+        """Reject cursors that were not issued by this endpoint"""
+        cursor = data.get("cursor")
+        if cursor:
+            try:
+                decode_cursor(cursor, self.get_ordering(data), self.model)
+            except InvalidCursor:
+                raise serializers.ValidationError({"cursor": "Invalid cursor"})
+        return data
+
+
+class FetchListingsSerializer(CursorPageSerializer):
     """Request serializer for fetching listings with filters"""
 
     filters = ListingFilterSerializer(
         required=False, help_text="Optional filters for listing queries."
     )
-    count = serializers.IntegerField(
-        required=False, help_text="Limit the number of listings returned."
+    facets = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Include listing counts per city, price bucket and guest capacity.",
     )
 
 
@@ -72,6 +109,24 @@ class ListingSerializer(serializers.Serializer):
         required=False,
         help_text="List of photo URLs for the property.",
     )
+    latitude = serializers.FloatField(
+        read_only=True, allow_null=True, help_text="Latitude of the property."
+    )
+    longitude = serializers.FloatField(
+        read_only=True, allow_null=True, help_text="Longitude of the property."
+    )
+    distance_km = serializers.FloatField(
+        read_only=True,
+        required=False,
+        help_text="Distance from the search centre (radius searches only).",
+    )
+    total_price = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        read_only=True,
+        required=False,
+        help_text="Price of the whole stay from the rate calendar (searches with dates only).",
+    )
     host_name = serializers.CharField(
         read_only=True, help_text="Full name of the property host."
     )
@@ -86,6 +141,23 @@ class ListingSerializer(serializers.Serializer):
     )
 
 
+class FacetCountSerializer(serializers.Serializer):
+    """Number of matching listings for one facet value"""
+
+    value = serializers.CharField(
+        help_text="Facet value: normalized city, price bucket such as 100-200, or guest capacity."
+    )
+    count = serializers.IntegerField(help_text="Number of matching listings.")
+
+
+class FacetsSerializer(serializers.Serializer):
+    """Facet counts returned alongside listing results"""
+
+    city = FacetCountSerializer(many=True, help_text="Listings per city.")
+    price = FacetCountSerializer(many=True, help_text="Listings per nightly price bucket.")
+    guests = FacetCountSerializer(many=True, help_text="Listings per guest capacity.")
+
+
 class ListingDetailRequestSerializer(serializers.Serializer):
     """Request serializer for fetching detailed listing information"""
 
@@ -124,6 +196,10 @@ class ListingDetailSerializer(serializers.Serializer):
     total_bookings = serializers.IntegerField(
         read_only=True, help_text="Total number of bookings for this listing."
     )
+    active_bookings = serializers.IntegerField(
+        read_only=True,
+        help_text="Number of pending and confirmed bookings for this listing.",
+    )
     created_at = serializers.DateTimeField(
         read_only=True, help_text="Date and time the listing was created."
     )
@@ -154,18 +230,20 @@ class BookingFilterSerializer(serializers.Serializer):
     end_date = serializers.DateField(
         required=False, help_text="Filter bookings up to this date (YYYY-MM-DD)."
     )
-    count = serializers.IntegerField(
-        required=False, help_text="Limit the number of results returned."
-    )
 
 
-class FetchBookingsSerializer(serializers.Serializer):
+class FetchBookingsSerializer(CursorPageSerializer):
     """Request serializer for fetching bookings with filters"""
 
     filters = BookingFilterSerializer(
         required=False, help_text="Optional filters for booking queries."
     )
 
+    model = Booking
+
+    def get_ordering(self, data):
+        return Booking.PAGE_ORDERING
+
 
 class CreateBookingSerializer(serializers.Serializer):
     """Request serializer for creating a new booking"""
@@ -185,6 +263,25 @@ class CreateBookingSerializer(serializers.Serializer):
     user = serializers.UUIDField(
         required=True, help_text="The user making the booking."
     )
+    status = serializers.ChoiceField(
+        choices=[Booking.STATUS_PENDING, Booking.STATUS_CONFIRMED],
+        default=Booking.STATUS_PENDING,
+        help_text=(
+            "pending places a hold that expires unless confirmed; confirmed "
+            "(staff only, e.g. channel-manager imports) books without a hold."
+        ),
+    )
+
+    def validate_status(self, value):
+        """Only staff may skip the hold"""
+        request = self.context.get("request")
+        if value == Booking.STATUS_CONFIRMED and not (
+            request and request.user.is_staff
+        ):
+            raise serializers.ValidationError(
+                "Only staff can create confirmed bookings"
+            )
+        return value
 
     def validate_check_in(self, value):
         """Validate check-in date is not in the past"""
@@ -201,6 +298,66 @@ class CreateBookingSerializer(serializers.Serializer):
         return data
 
 
+class ConfirmBookingSerializer(serializers.Serializer):
+    """Request serializer for confirming a pending booking"""
+
+    id = serializers.UUIDField(
+        required=True, help_text="The unique identifier of the booking to confirm."
+    )
+
+
+class CreatedBookingSerializer(serializers.Serializer):
+    """Response serializer for a newly created booking"""
+
+    id = serializers.UUIDField(
+        read_only=True, help_text="Unique identifier for the booking."
+    )
+    status = serializers.CharField(
+        read_only=True, help_text="Booking status: pending or confirmed."
+    )
+    expires_at = serializers.DateTimeField(
+        read_only=True,
+        allow_null=True,
+        help_text="When the hold lapses unless the booking is confirmed.",
+    )
+    total_price = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        read_only=True,
+        help_text="Total price for the booking.",
+    )
+
+
+class BulkCreateBookingSerializer(serializers.Serializer):
+    """Request serializer for creating many bookings at once"""
+
+    MAX_BOOKINGS = 500
+
+    bookings = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=MAX_BOOKINGS,
+        help_text=(
+            f"Up to {MAX_BOOKINGS} bookings, each shaped like a single booking "
+            "request. Items are validated and accepted independently."
+        ),
+    )
+
+
+class BulkBookingResultSerializer(serializers.Serializer):
+    """Outcome of one item of a bulk booking request"""
+
+    index = serializers.IntegerField(help_text="Position of the item in the request.")
+    status = serializers.BooleanField(help_text="Whether the booking was created.")
+    message = serializers.CharField(help_text="Outcome of the item.")
+    id = serializers.UUIDField(
+        required=False, help_text="Identifier of the created booking."
+    )
+    errors = serializers.DictField(
+        required=False, help_text="Validation errors of a rejected item."
+    )
+
+
 class BookingSerializer(serializers.Serializer):
     """Response serializer for booking data"""
 
@@ -222,6 +379,14 @@ class BookingSerializer(serializers.Serializer):
     user_email = serializers.CharField(
         read_only=True, help_text="Email of the user who made the booking."
     )
+    status = serializers.CharField(
+        read_only=True, help_text="Booking status: pending, confirmed or cancelled."
+    )
+    expires_at = serializers.DateTimeField(
+        read_only=True,
+        allow_null=True,
+        help_text="When a pending booking's hold on its dates lapses.",
+    )
     check_in = serializers.DateField(help_text="Check-in date.")
     check_out = serializers.DateField(help_text="Check-out date.")
     number_of_guests = serializers.IntegerField(help_text="Number of guests.")
@@ -233,14 +398,71 @@ class BookingSerializer(serializers.Serializer):
     )
 
 
+# ==================== Availability Serializers ====================
+
+
+class AvailabilityCalendarSerializer(serializers.Serializer):
+    """Request serializer for the booked-nights calendar of several listings"""
+
+    MAX_LISTINGS = 50
+    MAX_DAYS = 366
+
+    listing_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=MAX_LISTINGS,
+        help_text=f"Listings to report on (max {MAX_LISTINGS}).",
+    )
+    start = serializers.DateField(
+        required=False, help_text="First night of the calendar; defaults to today."
+    )
+    days = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=MAX_DAYS,
+        default=365,
+        help_text=f"Number of nights to cover (max {MAX_DAYS}).",
+    )
+    encoding = serializers.ChoiceField(
+        choices=occupancy.ENCODINGS,
+        required=False,
+        default=occupancy.ENCODING_RANGES,
+        help_text=(
+            "ranges: list of [offset, nights] runs of booked nights, offsets "
+            "counted from start. bitset: base64 string where bit i (byte i // 8, "
+            "bit i % 8, least significant first) is set when night start + i "
+            "is booked."
+        ),
+    )
+
+    def validate(self, data):
+        data.setdefault("start", date.today())
+        data["listing_ids"] = list(dict.fromkeys(data["listing_ids"]))
+        return data
+
+
 # ==================== Search Serializers ====================
 
 
-class SearchListingsSerializer(serializers.Serializer):
+class BoundsSerializer(serializers.Serializer):
+    """Map viewport; west > east means the box crosses the antimeridian"""
+
+    south = serializers.FloatField(min_value=-90, max_value=90)
+    west = serializers.FloatField(min_value=-180, max_value=180)
+    north = serializers.FloatField(min_value=-90, max_value=90)
+    east = serializers.FloatField(min_value=-180, max_value=180)
+
+    def validate(self, data):
+        if data["south"] > data["north"]:
+            raise serializers.ValidationError("south cannot be greater than north")
+        return data
+
+
+class SearchListingsSerializer(CursorPageSerializer):
     """Request serializer for searching listings"""
 
     city = serializers.CharField(
-        required=True, help_text="City to search for listings (required)."
+        required=False, help_text="City to search for listings (case-insensitive)."
     )
     check_in = serializers.DateField(
         required=False, help_text="Check-in date for availability check (YYYY-MM-DD)."
@@ -251,25 +473,194 @@ class SearchListingsSerializer(serializers.Serializer):
     min_price = serializers.DecimalField(
         max_digits=10,
         decimal_places=2,
+        min_value=0,
         required=False,
         help_text="Minimum price per night.",
     )
     max_price = serializers.DecimalField(
         max_digits=10,
         decimal_places=2,
+        min_value=0,
         required=False,
         help_text="Maximum price per night.",
     )
+    guests = serializers.IntegerField(
+        min_value=1,
+        required=False,
+        help_text="Only listings whose max_guests is at least this number.",
+    )
+    q = serializers.CharField(
+        required=False,
+        max_length=200,
+        help_text="Keywords matched against title, city and description; results are ranked by relevance.",
+    )
+    facets = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Include listing counts per city, price bucket and guest capacity.",
+    )
+
+    bounds = BoundsSerializer(
+        required=False, help_text="Only listings inside this map viewport."
+    )
+    latitude = serializers.FloatField(
+        min_value=-90,
+        max_value=90,
+        required=False,
+        help_text="Centre latitude for a radius search.",
+    )
+    longitude = serializers.FloatField(
+        min_value=-180,
+        max_value=180,
+        required=False,
+        help_text="Centre longitude for a radius search.",
+    )
+    radius_km = serializers.FloatField(
+        min_value=0.1,
+        max_value=500,
+        required=False,
+        help_text="Radius in kilometres around latitude/longitude.",
+    )
+
+    def validate_q(self, value):
+        """Require at least one searchable word"""
+        if not search_terms(value):
+            raise serializers.ValidationError("Enter at least one keyword")
+        return value
+
+    def get_ordering(self, data):
+        return KEYWORD_ORDERING if data.get("q") else Listing.PAGE_ORDERING
 
     def validate(self, data):
-        """Validate date ranges if provided"""
+        """Validate date and price ranges if provided"""
+        data = super().validate(data)
         check_in = data.get("check_in")
         check_out = data.get("check_out")
 
+        if bool(check_in) != bool(check_out):
+            raise serializers.ValidationError(
+                "check_in and check_out must be provided together"
+            )
+
         if check_in and check_out:
             if check_out <= check_in:
                 raise serializers.ValidationError(
                     "Check-out date must be after check-in date"
                 )
 
+        min_price = data.get("min_price")
+        max_price = data.get("max_price")
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise serializers.ValidationError(
+                "min_price cannot be greater than max_price"
+            )
+
+        radius = [data.get(field) for field in ("latitude", "longitude", "radius_km")]
+        if any(value is not None for value in radius) and None in radius:
+            raise serializers.ValidationError(
+                "latitude, longitude and radius_km must be provided together"
+            )
+
+        return data
+
+
+# ==================== Export Serializers ====================
+
+
+class ExportSerializer(serializers.Serializer):
+    """Request serializer shared by the export endpoints"""
+
+    format = serializers.ChoiceField(
+        choices=exports.FORMATS,
+        default=exports.FORMAT_CSV,
+        help_text="csv (with a header row) or ndjson (one JSON object per line).",
+    )
+
+
+class ListingExportSerializer(ExportSerializer):
+    """Request serializer for exporting listings"""
+
+    city = serializers.CharField(
+        required=False, help_text="Only export listings in this city."
+    )
+
+
+class BookingExportSerializer(ExportSerializer):
+    """Request serializer for exporting bookings"""
+
+    filters = BookingFilterSerializer(
+        required=False, help_text="Optional filters for booking queries."
+    )
+
+
+# ==================== Dashboard Serializers ====================
+
+
+class HostDashboardSerializer(serializers.Serializer):
+    """Request serializer for the host performance dashboard"""
+
+    MAX_MONTHS = 36
+
+    start_month = serializers.DateField(
+        required=False,
+        help_text="First month to report on (any day in it); defaults to 11 months before end_month.",
+    )
+    end_month = serializers.DateField(
+        required=False,
+        help_text="Last month to report on, inclusive (any day in it); defaults to the current month.",
+    )
+    listing_id = serializers.UUIDField(
+        required=False, help_text="Only report on this listing."
+    )
+
+    def validate(self, data):
+        end = stats.month_start(data.get("end_month") or date.today())
+        start = data.get("start_month")
+        if start is None:
+            start = end
+            for _ in range(11):
+                start = stats.month_start(start - timedelta(days=1))
+        start = stats.month_start(start)
+        if start > end:
+            raise serializers.ValidationError("start_month must not be after end_month")
+        months = (end.year - start.year) * 12 + end.month - start.month + 1
+        if months > self.MAX_MONTHS:
+            raise serializers.ValidationError(
+                f"Report on at most {self.MAX_MONTHS} months at a time"
+            )
+        data["start_month"] = start
+        data["end_month"] = end
         return data
+
+
+class ListingStatsSerializer(serializers.Serializer):
+    """Performance of one listing over the requested months"""
+
+    id = serializers.UUIDField(read_only=True)
+    title = serializers.CharField(read_only=True)
+    city = serializers.CharField(read_only=True)
+    booked_nights = serializers.IntegerField(read_only=True)
+    occupancy_rate = serializers.FloatField(
+        read_only=True, help_text="Booked nights over nights in the period (0-1)."
+    )
+    revenue = serializers.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        read_only=True,
+        help_text="Revenue of the booked nights in the period.",
+    )
+    average_nightly_rate = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        read_only=True,
+        allow_null=True,
+        help_text="Revenue per booked night.",
+    )
+    arrivals = serializers.IntegerField(
+        read_only=True, help_text="Bookings checking in during the period."
+    )
+    average_lead_days = serializers.FloatField(
+        read_only=True,
+        allow_null=True,
+        help_text="Average days between booking and check-in over those arrivals.",
+    )
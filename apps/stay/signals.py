@@ -0,0 +1,205 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from stay.availability import availability_engine
+from stay.models import (
+    Listing,
+    Booking,
+    BookedNight,
+    ListingFacet,
+    ListingRate,
+    ListingMonthlyStats,
+)
+from stay.search_cache import search_cache
+
+
+def _booking_city(booking):
+    """City of the booked listing, without a query when the listing is loaded"""
+    if Booking.listing.is_cached(booking):
+        return booking.listing.city
+    return (
+        Listing.objects.filter(pk=booking.listing_id)
+        .values_list("city", flat=True)
+        .first()
+    )
+
+
+def _invalidate_searches(windows):
+    """
+    Retire cached searches for (city, check_in, check_out) windows once
+    the write commits, so no other request re-caches the old rows after
+    the generations moved on.
+    """
+
+    def invalidate():
+        for city, check_in, check_out in windows:
+            search_cache.invalidate_dates(city, check_in, check_out)
+
+    transaction.on_commit(invalidate)
+
+
+def _invalidate_booking_searches(booking):
+    city = _booking_city(booking)
+    windows = [(city, booking.check_in, booking.check_out)]
+
+    # An edited booking also frees its previous dates
+    loaded = getattr(booking, "_loaded_values", {})
+    if loaded.get("check_in") and (
+        loaded["check_in"] != booking.check_in or loaded["check_out"] != booking.check_out
+    ):
+        windows.append((city, loaded["check_in"], loaded["check_out"]))
+    _invalidate_searches(windows)
+
+
+@receiver(post_save, sender=Booking)
+def sync_booked_nights(sender, instance, created, raw=False, **kwargs):
+    """
+    Keep the occupancy calendar, availability engine, cached searches,
+    listing booking counters and monthly stats in step with booking writes
+    and status changes.
+    """
+    if raw:
+        return
+    BookedNight.sync_bookings([instance], replace=not created)
+    ListingMonthlyStats.apply_booking(instance, created)
+    # The engine is shared by the whole process, so it only sees committed writes
+    transaction.on_commit(partial(availability_engine.apply_booking, instance))
+    _invalidate_booking_searches(instance)
+
+    if created:
+        Listing.adjust_booking_counters(
+            instance.listing_id, total=1, active=int(instance.is_active)
+        )
+    else:
+        loaded_status = getattr(instance, "_loaded_values", {}).get("status")
+        was_active = loaded_status in Booking.ACTIVE_STATUSES
+        Listing.adjust_booking_counters(
+            instance.listing_id, active=int(instance.is_active) - int(was_active)
+        )
+
+
+def sync_created_bookings(bookings):
+    """
+    Set-based equivalent of sync_booked_nights for bookings inserted with
+    bulk_create, which sends no post_save signals.
+    """
+    if not bookings:
+        return
+    BookedNight.sync_bookings(bookings, replace=False)
+    ListingMonthlyStats.apply_bookings(bookings)
+
+    counters = {}
+    windows = {}
+    transaction.on_commit(partial(availability_engine.apply_bookings, bookings))
+    for booking in bookings:
+        total, active = counters.get(booking.listing_id, (0, 0))
+        counters[booking.listing_id] = (total + 1, active + int(booking.is_active))
+        # One eviction per city covering all of its new bookings
+        city = _booking_city(booking)
+        start, end = windows.get(city, (booking.check_in, booking.check_out))
+        windows[city] = (min(start, booking.check_in), max(end, booking.check_out))
+
+    Listing.adjust_booking_counters_many(counters)
+    _invalidate_searches([(city, start, end) for city, (start, end) in windows.items()])
+
+
+def sync_cancelled_bookings(rows):
+    """
+    Release the dates of bookings cancelled with a queryset update, which
+    sends no post_save signals.
+
+    Args:
+        rows: List of (id, listing_id, city, check_in, check_out,
+            total_price, created_at) of bookings that were active before
+            the update
+    """
+    if not rows:
+        return
+    booking_ids = [booking_id for booking_id, *_ in rows]
+    BookedNight.objects.filter(booking_id__in=booking_ids).delete()
+    transaction.on_commit(partial(availability_engine.discard_bookings, booking_ids))
+    ListingMonthlyStats.adjust(
+        ListingMonthlyStats.booking_changes(
+            [
+                (listing_id, check_in, check_out, total_price, created_at)
+                for _, listing_id, _, check_in, check_out, total_price, created_at in rows
+            ],
+            sign=-1,
+        )
+    )
+
+    released = {}
+    windows = {}
+    for _, listing_id, city, check_in, check_out, *_ in rows:
+        released[listing_id] = released.get(listing_id, 0) + 1
+        start, end = windows.get(city, (check_in, check_out))
+        windows[city] = (min(start, check_in), max(end, check_out))
+
+    Listing.adjust_booking_counters_many(
+        {listing_id: (0, -count) for listing_id, count in released.items()}
+    )
+    _invalidate_searches([(city, start, end) for city, (start, end) in windows.items()])
+
+
+@receiver(post_delete, sender=Booking)
+def discard_booking_availability(sender, instance, **kwargs):
+    """
+    Drop a deleted booking from the availability engine, cached searches,
+    listing booking counters and monthly stats.
+    """
+    # Deleting clears instance.pk before the commit hooks run
+    transaction.on_commit(partial(availability_engine.discard_bookings, [instance.pk]))
+    ListingMonthlyStats.discard_booking(instance)
+    _invalidate_booking_searches(instance)
+    Listing.adjust_booking_counters(
+        instance.listing_id, total=-1, active=-int(instance.is_active)
+    )
+
+
+@receiver(post_save, sender=Listing)
+def sync_listing_availability(sender, instance, created, raw=False, **kwargs):
+    """
+    Track new listings, and listings moving city, in the availability engine
+    and facet rollup, and evict cached searches for the affected cities.
+    """
+    if raw:
+        return
+    transaction.on_commit(partial(availability_engine.apply_listing, instance))
+    ListingFacet.apply_listing(instance, created)
+    Listing.invalidate_detail(instance.pk)
+    transaction.on_commit(partial(search_cache.invalidate_city, instance.city))
+    loaded_city = getattr(instance, "_loaded_values", {}).get("city")
+    if loaded_city and loaded_city != instance.city:
+        transaction.on_commit(partial(search_cache.invalidate_city, loaded_city))
+
+
+@receiver(post_delete, sender=Listing)
+def discard_listing_availability(sender, instance, **kwargs):
+    """
+    Drop a deleted listing from the availability engine, facet rollup and
+    cached searches.
+    """
+    transaction.on_commit(partial(availability_engine.discard_listing, instance.pk))
+    ListingFacet.discard_listing(instance)
+    Listing.invalidate_detail(instance.pk)
+    transaction.on_commit(partial(search_cache.invalidate_city, instance.city))
+
+
+@receiver(post_save, sender=ListingRate)
+@receiver(post_delete, sender=ListingRate)
+def invalidate_rate_searches(sender, instance, raw=False, **kwargs):
+    """
+    Evict cached searches for the listing's city, whose totals were priced
+    with the old rates.
+    """
+    if raw:
+        return
+    city = (
+        Listing.objects.filter(pk=instance.listing_id)
+        .values_list("city", flat=True)
+        .first()
+    )
+    if city:
+        transaction.on_commit(partial(search_cache.invalidate_city, city))
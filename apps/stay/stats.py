@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from stay.pricing import to_cents
+
+
+# Order of the counters in a contribution tuple
+NIGHTS, REVENUE_CENTS, ARRIVALS, LEAD_DAYS = range(4)
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def lead_days(created_at, check_in):
+    """Days between booking and arrival, by the local date of created_at"""
+    return max((check_in - timezone.localdate(created_at)).days, 0)
+
+
+def booking_months(check_in, check_out, total_price, created_at):
+    """
+    Split one booking into per-month rollup contributions
+
+    Nights and revenue go to the month each night falls in; revenue is
+    shared pro rata by nights in whole cents, the last month taking the
+    rounding remainder so the parts add up to total_price. The arrival
+    and its lead time count towards the check-in month.
+
+    Returns:
+        Dict of {month start: [nights, revenue_cents, arrivals, lead_days]}
+    """
+    total_nights = (check_out - check_in).days
+    if total_nights <= 0:
+        return {}
+    total_cents = to_cents(total_price or 0)
+
+    months = {}
+    allotted = 0
+    night = check_in
+    while night < check_out:
+        month = month_start(night)
+        end = min(next_month(month), check_out)
+        nights = (end - night).days
+        share = total_cents * nights // total_nights
+        months[month] = [nights, share, 0, 0]
+        allotted += share
+        night = end
+    months[month][REVENUE_CENTS] += total_cents - allotted
+
+    arrival = months[month_start(check_in)]
+    arrival[ARRIVALS] = 1
+    arrival[LEAD_DAYS] = lead_days(created_at, check_in)
+    return months
+
+
+def occupancy_rate(booked_nights, start, end):
+    """Share of nights from start to end (exclusive) that were booked"""
+    nights = (end - start).days
+    if nights <= 0:
+        return 0.0
+    return round(booked_nights / nights, 4)
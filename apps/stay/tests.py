@@ -1,3 +1,1362 @@
-from django.test import TestCase
+import base64
+import csv
+import io
+import json
+import threading
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock, skipIf, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Q
+from django.test import (
+    AsyncClient,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from commons.pagination import encode_cursor
+from stay import exports, stats
+from stay.availability import (
+    CHANGE_CACHE_KEY,
+    GENERATION_CACHE_KEY,
+    AvailabilityEngine,
+    ListingIntervals,
+    availability_engine,
+    bump_generation,
+)
+from stay.models import (
+    Listing,
+    Booking,
+    BookedNight,
+    ListingFacet,
+    ListingMonthlyStats,
+    ListingRate,
+)
+
+
+class StayTestCase(APITestCase):
+    """Shared fixtures: one host, listings on demand, bookings from today"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = get_user_model().objects.create_user(
+            email="host@example.com",
+            password="pw12345!",
+            first_name="Host",
+            last_name="Example",
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def make_listings(self, count, city="Miami", price=100, **kwargs):
+        return [
+            Listing.objects.create(
+                title=f"{city} listing {index}",
+                description="Cabin near the beach",
+                price_per_night=Decimal(price + index),
+                city=city,
+                host=self.host,
+                **kwargs,
+            )
+            for index in range(count)
+        ]
+
+    @staticmethod
+    def day(offset):
+        return date.today() + timedelta(days=offset)
+
+    def book(self, listing, check_in, nights=2, **kwargs):
+        kwargs.setdefault("user", self.host)
+        return Booking.objects.create(
+            listing=listing,
+            check_in=self.day(check_in),
+            check_out=self.day(check_in + nights),
+            **kwargs,
+        )
+
+
+class ListingPaginationTests(StayTestCase):
+    url = "/api/stay/listings/"
+
+    def test_pages_cover_every_listing_once(self):
+        self.make_listings(25)
+
+        seen = []
+        body = {"count": 10}
+        while True:
+            response = self.client.post(self.url, body, format="json")
+            self.assertEqual(response.status_code, 200)
+            seen += [row["id"] for row in response.data["data"]]
+            if not response.data["next_cursor"]:
+                break
+            body["cursor"] = response.data["next_cursor"]
+
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+    def test_malformed_cursor_is_rejected(self):
+        response = self.client.post(self.url, {"cursor": "garbage"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_values_of_the_wrong_type_are_rejected(self):
+        for values in (
+            ["2024-01-01T00:00:00+00:00", "not-a-uuid"],
+            ["not-a-date", "0e7a6c1c-1111-4111-8111-111111111111"],
+            [5, "0e7a6c1c-1111-4111-8111-111111111111"],
+        ):
+            with self.subTest(values=values):
+                response = self.client.post(
+                    self.url, {"cursor": encode_cursor(values)}, format="json"
+                )
+                self.assertEqual(response.status_code, 400)
+
+
+class BookedNightTests(StayTestCase):
+    def nights(self, booking):
+        return sorted(
+            BookedNight.objects.filter(booking=booking).values_list("night", flat=True)
+        )
+
+    def test_nights_follow_booking_writes(self):
+        listing = self.make_listings(1)[0]
+        booking = self.book(listing, 5, nights=3)
+        self.assertEqual(self.nights(booking), [self.day(5), self.day(6), self.day(7)])
+
+        booking.check_in, booking.check_out = self.day(10), self.day(11)
+        booking.save()
+        self.assertEqual(self.nights(booking), [self.day(10)])
+
+        booking.status = Booking.STATUS_CANCELLED
+        booking.save()
+        self.assertEqual(self.nights(booking), [])
+
+    def test_date_filter_excludes_booked_listings(self):
+        booked, free = self.make_listings(2)
+        self.book(booked, 5, nights=3)
+
+        response = self.client.post(
+            "/api/stay/listings/",
+            {"filters": {"check_in": str(self.day(6)), "check_out": str(self.day(7))}},
+            format="json",
+        )
+        self.assertEqual([row["id"] for row in response.data["data"]], [free.pk])
+
+        # Check-out day is free again
+        response = self.client.post(
+            "/api/stay/listings/",
+            {"filters": {"check_in": str(self.day(8)), "check_out": str(self.day(9))}},
+            format="json",
+        )
+        self.assertEqual(response.data["count"], 2)
+
+    def test_rebuild_matches_incremental_writes(self):
+        listings = self.make_listings(2)
+        self.book(listings[0], 5)
+        self.book(listings[1], 3, nights=4)
+        incremental = sorted(BookedNight.objects.values_list("booking_id", "night"))
+
+        self.assertEqual(BookedNight.rebuild(), 6)
+        self.assertEqual(
+            sorted(BookedNight.objects.values_list("booking_id", "night")), incremental
+        )
+
+
+class ListingIntervalsTests(SimpleTestCase):
+    def test_overlaps_after_adds_and_removes(self):
+        intervals = ListingIntervals()
+        start = date(2030, 1, 1)
+        spans = {"a": (0, 10), "b": (2, 3), "c": (20, 25)}
+        for booking_id, (check_in, check_out) in spans.items():
+            intervals.add(
+                booking_id,
+                start + timedelta(days=check_in),
+                start + timedelta(days=check_out),
+            )
+
+        def overlaps(check_in, check_out):
+            return intervals.overlaps(
+                start + timedelta(days=check_in), start + timedelta(days=check_out)
+            )
+
+        self.assertTrue(overlaps(5, 6))
+        self.assertFalse(overlaps(10, 20))
+        self.assertTrue(overlaps(24, 30))
+
+        intervals.remove("a")
+        self.assertFalse(overlaps(5, 6))
+        self.assertTrue(overlaps(2, 3))
+
+        bulk = ListingIntervals()
+        bulk.load(
+            (booking_id, start + timedelta(days=check_in), start + timedelta(days=check_out))
+            for booking_id, (check_in, check_out) in spans.items()
+            if booking_id != "a"
+        )
+        self.assertEqual(bulk.intervals, intervals.intervals)
+        self.assertEqual(bulk.max_ends, intervals.max_ends)
+
+
+@override_settings(
+    STAY_AVAILABILITY_ENGINE={"ENABLED": True, "CITIES": ["Miami"], "CHECK_INTERVAL": 60}
+)
+class AvailabilityEngineTests(StayTestCase):
+    def setUp(self):
+        super().setUp()
+        self.listings = self.make_listings(3)
+        availability_engine.rebuild()
+        self.addCleanup(availability_engine._reset)
+        self.addCleanup(setattr, availability_engine, "_built", False)
+
+    def free(self, check_in, check_out):
+        return set(
+            availability_engine.free_listings(
+                "miami", self.day(check_in), self.day(check_out)
+            )
+        )
+
+    def test_follows_committed_bookings_only(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.book(self.listings[0], 5)
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+        self.assertEqual(len(self.free(5, 6)), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = self.book(self.listings[0], 5)
+        self.assertNotIn(self.listings[0].pk, self.free(5, 6))
+        self.assertTrue(availability_engine.check()["consistent"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.delete()
+        self.assertEqual(len(self.free(5, 6)), 3)
+
+    def test_foreign_write_is_detected(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(self.listings[0], 5)
+        self.assertTrue(availability_engine.check()["consistent"])
+
+        # Another worker's write only shows up as a generation bump
+        bump_generation()
+        self.assertFalse(availability_engine.check()["consistent"])
+
+    def test_other_workers_writes_are_replayed_without_a_rebuild(self):
+        other = AvailabilityEngine()
+        other.rebuild()
+
+        with mock.patch.object(other, "rebuild", side_effect=AssertionError):
+            with self.captureOnCommitCallbacks(execute=True):
+                booking = self.book(self.listings[0], 5)
+            other._checked_at -= 60
+            self.assertFalse(
+                other.is_available(self.listings[0].pk, self.day(5), self.day(6))
+            )
+
+            with self.captureOnCommitCallbacks(execute=True):
+                booking.delete()
+            other._checked_at -= 60
+            self.assertTrue(
+                other.is_available(self.listings[0].pk, self.day(5), self.day(6))
+            )
+
+        self.assertTrue(other.check()["consistent"])
+
+    def test_a_write_that_cannot_be_replayed_forces_a_rebuild(self):
+        other = AvailabilityEngine()
+        other.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(self.listings[0], 5)
+        cache.delete(CHANGE_CACHE_KEY.format(cache.get(GENERATION_CACHE_KEY)))
+        other._checked_at -= 60
+
+        with mock.patch.object(other, "rebuild", wraps=other.rebuild) as rebuild:
+            self.assertFalse(
+                other.is_available(self.listings[0].pk, self.day(5), self.day(6))
+            )
+
+        rebuild.assert_called_once()
+        self.assertTrue(other.check()["consistent"])
+
+    def test_stale_engine_does_not_reject_bookings(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = self.book(self.listings[0], 5)
+        # Cancelled elsewhere, without this worker's engine hearing of it
+        Booking.objects.filter(pk=booking.pk).update(status=Booking.STATUS_CANCELLED)
+        self.assertFalse(
+            availability_engine.is_available(self.listings[0].pk, self.day(5), self.day(7))
+        )
+
+        result = Booking.create_booking(
+            listing_id=self.listings[0].pk,
+            user_id=self.host.pk,
+            check_in=self.day(5),
+            check_out=self.day(7),
+            number_of_guests=1,
+        )
+        self.assertTrue(result["status"], result)
+
+
+class ListingSearchTests(StayTestCase):
+    url = "/api/stay/listings/search/"
+
+    def search(self, **body):
+        response = self.client.post(self.url, body, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        return {row["id"] for row in response.data["data"]}
+
+    def test_filters_combine(self):
+        cheap, mid, dear = self.make_listings(3, price=100)
+        Listing.objects.filter(pk=mid.pk).update(max_guests=4)
+        other_city = self.make_listings(1, city="Denver")[0]
+        self.book(cheap, 5)
+
+        self.assertEqual(self.search(city="MIAMI"), {cheap.pk, mid.pk, dear.pk})
+        self.assertEqual(self.search(min_price="101", max_price="101"), {mid.pk})
+        self.assertEqual(self.search(guests=3), {mid.pk})
+        self.assertEqual(
+            self.search(
+                city="miami",
+                max_price="101",
+                check_in=str(self.day(5)),
+                check_out=str(self.day(6)),
+            ),
+            {mid.pk},
+        )
+        self.assertIn(other_city.pk, self.search())
+
+    def test_invalid_ranges_are_rejected(self):
+        for body in (
+            {"min_price": "200", "max_price": "100"},
+            {"check_in": str(self.day(5))},
+            {"check_in": str(self.day(5)), "check_out": str(self.day(5))},
+        ):
+            with self.subTest(body=body):
+                response = self.client.post(self.url, body, format="json")
+                self.assertEqual(response.status_code, 400)
+
+
+class KeywordSearchTests(StayTestCase):
+    url = "/api/stay/listings/search/"
+
+    def setUp(self):
+        super().setUp()
+        self.pool, self.cabin, self.loft = self.make_listings(3)
+        Listing.objects.filter(pk=self.pool.pk).update(title="Pool villa with garden")
+        Listing.objects.filter(pk=self.loft.pk).update(
+            title="City loft", description="Quiet loft with a small garden"
+        )
+
+    def search(self, query, **body):
+        response = self.client.post(self.url, {"q": query, **body}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_every_term_must_match(self):
+        self.assertEqual(
+            [row["id"] for row in self.search("POOL garden")["data"]], [self.pool.pk]
+        )
+        self.assertEqual(self.search("pool submarine")["count"], 0)
+
+    def test_title_matches_rank_first(self):
+        ids = [row["id"] for row in self.search("garden")["data"]]
+        self.assertEqual(ids, [self.pool.pk, self.loft.pk])
+
+    def test_ranked_results_page_with_cursor(self):
+        first = self.search("garden", count=1)
+        second = self.search("garden", count=1, cursor=first["next_cursor"])
+        self.assertEqual(
+            [row["id"] for row in first["data"] + second["data"]],
+            [self.pool.pk, self.loft.pk],
+        )
+        self.assertIsNone(second["next_cursor"])
+
+    def test_query_without_words_is_rejected(self):
+        response = self.client.post(self.url, {"q": "!!"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class GeoSearchTests(StayTestCase):
+    url = "/api/stay/listings/search/"
+
+    def setUp(self):
+        super().setUp()
+        places = {
+            "beach": (25.79, -80.13),
+            "downtown": (25.77, -80.19),
+            "orlando": (28.54, -81.38),
+            "suva": (-18.14, 178.44),
+            "savusavu": (-16.78, -179.33),
+        }
+        self.listings = {}
+        for name, (latitude, longitude) in places.items():
+            self.listings[name] = Listing.objects.create(
+                title=name,
+                description="Stay",
+                price_per_night=Decimal("100"),
+                city=name,
+                latitude=latitude,
+                longitude=longitude,
+                host=self.host,
+            )
+
+    def search(self, **body):
+        response = self.client.post(self.url, body, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        return {row["title"] for row in response.data["data"]}
+
+    def test_radius(self):
+        self.assertEqual(
+            self.search(latitude=25.78, longitude=-80.16, radius_km=10),
+            {"beach", "downtown"},
+        )
+        self.assertEqual(
+            self.search(latitude=25.78, longitude=-80.16, radius_km=400),
+            {"beach", "downtown", "orlando"},
+        )
+
+    def test_bounds(self):
+        self.assertEqual(
+            self.search(bounds={"south": 25, "west": -81, "north": 26, "east": -80}),
+            {"beach", "downtown"},
+        )
+
+    def test_bounds_across_the_antimeridian(self):
+        self.assertEqual(
+            self.search(bounds={"south": -20, "west": 178, "north": -15, "east": -179}),
+            {"suva", "savusavu"},
+        )
+
+    def test_radius_needs_a_centre(self):
+        response = self.client.post(self.url, {"radius_km": 5}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class SearchCacheTests(StayTestCase):
+    url = "/api/stay/listings/"
+
+    def setUp(self):
+        super().setUp()
+        self.miami = self.make_listings(3)
+        self.denver = self.make_listings(2, city="Denver")
+
+    def count(self, city=None, check_in=None, check_out=None):
+        filters = {"city": city} if city else {}
+        if check_in is not None:
+            filters["check_in"] = str(self.day(check_in))
+            filters["check_out"] = str(self.day(check_out))
+        response = self.client.post(self.url, {"filters": filters}, format="json")
+        return response.data["count"]
+
+    def test_repeated_search_is_served_from_cache(self):
+        self.count("Miami", 5, 7)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.count(" miami ", 5, 7), 3)
+
+    def test_booking_retires_overlapping_searches_after_commit(self):
+        self.assertEqual(self.count("Miami", 5, 7), 3)
+        self.assertEqual(self.count(None, 5, 7), 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(self.miami[0], 6)
+            # Still the pre-commit answer until the commit hooks run
+            self.assertEqual(self.count("Miami", 5, 7), 3)
+
+        self.assertEqual(self.count("Miami", 5, 7), 2)
+        self.assertEqual(self.count(None, 5, 7), 4)
+
+    def test_booking_keeps_unrelated_searches(self):
+        self.count("Miami", 5, 7)
+        self.count("Miami", 200, 202)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(self.denver[0], 6)
+            self.book(self.miami[0], 6)
+
+        with self.assertNumQueries(0):
+            self.count("Miami", 200, 202)
+
+    def test_listing_change_retires_its_city(self):
+        self.assertEqual(self.count("Miami"), 3)
+        self.count("Denver")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_listings(1)
+
+        self.assertEqual(self.count("Miami"), 4)
+        with self.assertNumQueries(0):
+            self.count("Denver")
+
+
+class BookingCounterTests(StayTestCase):
+    def counters(self, listing):
+        listing.refresh_from_db()
+        return listing.total_bookings, listing.active_bookings
+
+    def test_counters_follow_booking_writes(self):
+        listing = self.make_listings(1)[0]
+        booking = self.book(listing, 5)
+        self.book(listing, 10)
+        self.assertEqual(self.counters(listing), (2, 2))
+
+        booking.status = Booking.STATUS_CANCELLED
+        booking.save()
+        self.assertEqual(self.counters(listing), (2, 1))
+
+        booking.delete()
+        self.assertEqual(self.counters(listing), (1, 1))
+
+        Booking.create_bookings(
+            [
+                dict(
+                    listing_id=listing.pk,
+                    user_id=self.host.pk,
+                    check_in=self.day(20),
+                    check_out=self.day(22),
+                    number_of_guests=1,
+                )
+            ]
+        )
+        self.assertEqual(self.counters(listing), (2, 2))
+
+    def test_detail_is_cached_and_dropped_after_commit(self):
+        listing = self.make_listings(1)[0]
+        self.assertEqual(Listing.get_listing_detail(listing.pk)["total_bookings"], 0)
+        with self.assertNumQueries(0):
+            Listing.get_listing_detail(listing.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(listing, 5)
+            self.assertEqual(Listing.get_listing_detail(listing.pk)["total_bookings"], 0)
+
+        self.assertEqual(Listing.get_listing_detail(listing.pk)["total_bookings"], 1)
+
+    def test_per_process_caches_keep_details_briefly(self):
+        self.assertEqual(
+            Listing.detail_cache_timeout(), Listing.DETAIL_CACHE_LOCAL_TIMEOUT
+        )
+        shared = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(
+                Listing.detail_cache_timeout(), Listing.DETAIL_CACHE_TIMEOUT
+            )
+
+
+class CityKeyTests(StayTestCase):
+    def test_city_key_is_normalized_on_save(self):
+        listing = self.make_listings(1, city="  New   York ")[0]
+        self.assertEqual(listing.city_key, "new york")
+
+        listing.city = "Boston"
+        listing.save(update_fields=["city"])
+        listing.refresh_from_db()
+        self.assertEqual(listing.city_key, "boston")
+
+    def test_city_filter_is_case_insensitive(self):
+        listing = self.make_listings(1, city="New York")[0]
+        response = self.client.post(
+            "/api/stay/listings/", {"filters": {"city": "NEW york"}}, format="json"
+        )
+        self.assertEqual([row["id"] for row in response.data["data"]], [listing.pk])
+
+    def test_city_filter_uses_an_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("Query plan format is SQLite specific")
+        queryset = Listing.objects.filter(Listing.search_conditions(city="Miami"))
+        sql, params = queryset.values("id").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("city_key=?", plan)
+
+
+class FacetTests(StayTestCase):
+    def assertRollupMatchesLive(self, city=None):
+        live = Listing.fetch_facets(conditions=Listing.search_conditions(city=city))
+        self.assertEqual(Listing.fetch_facets(city=city), live)
+
+    def test_rollup_follows_listing_writes(self):
+        listings = self.make_listings(3, price=90)
+        self.make_listings(2, city="Denver", price=300)
+        self.assertRollupMatchesLive()
+        self.assertRollupMatchesLive(city="miami")
+
+        listings[0].price_per_night = Decimal("600")
+        listings[0].city = "Denver"
+        listings[0].save()
+        listings[1].delete()
+        self.assertRollupMatchesLive()
+        self.assertRollupMatchesLive(city="Denver")
+
+    def test_rebuild_matches_incremental_writes(self):
+        self.make_listings(4, price=45)
+        incremental = Listing.fetch_facets()
+        ListingFacet.rebuild()
+        self.assertEqual(Listing.fetch_facets(), incremental)
+
+    def test_facets_are_returned_on_request(self):
+        self.make_listings(2, price=120)
+        response = self.client.post("/api/stay/listings/", {"facets": True}, format="json")
+        self.assertEqual(
+            response.data["facets"]["price"], [{"value": "100-200", "count": 2}]
+        )
+
+
+class CreateBookingTests(StayTestCase):
+    def create(self, listing_id, check_in, nights=2):
+        return Booking.create_booking(
+            listing_id=listing_id,
+            user_id=self.host.pk,
+            check_in=self.day(check_in),
+            check_out=self.day(check_in + nights),
+            number_of_guests=1,
+        )
+
+    def test_overlaps_are_rejected_and_adjacent_stays_accepted(self):
+        listing = self.make_listings(1)[0]
+        self.assertTrue(self.create(listing.pk, 5)["status"])
+        self.assertFalse(self.create(listing.pk, 6)["status"])
+        self.assertTrue(self.create(listing.pk, 7)["status"])
+        self.assertTrue(self.create(listing.pk, 3)["status"])
+        self.assertEqual(Booking.objects.count(), 3)
+
+    def test_unknown_listing(self):
+        result = self.create(uuid.uuid4(), 5)
+        self.assertEqual(result, {"status": False, "message": "Listing not found"})
+
+    def test_endpoint_reports_conflicts(self):
+        listing = self.make_listings(1)[0]
+        body = {
+            "listing_id": str(listing.pk),
+            "user": str(self.host.pk),
+            "check_in": str(self.day(5)),
+            "check_out": str(self.day(7)),
+            "number_of_guests": 1,
+        }
+        first = self.client.post("/api/stay/bookings/", body, format="json")
+        self.assertEqual(first.status_code, 201)
+        second = self.client.post("/api/stay/bookings/", body, format="json")
+        self.assertEqual(second.status_code, 400)
+        self.assertEqual(second.data["message"], "Listing is not available for the given dates")
+
+
+@skipIf(connection.vendor == "sqlite", "SQLite serializes writers on its own")
+class ConcurrentBookingTests(TransactionTestCase):
+    def test_one_of_many_concurrent_bookings_wins(self):
+        host = get_user_model().objects.create_user(
+            email="race@example.com", password="pw12345!", first_name="R", last_name="C"
+        )
+        listing = Listing.objects.create(
+            title="Race", description="d", price_per_night=100, city="Miami", host=host
+        )
+        check_in = date.today() + timedelta(days=5)
+        results = []
+
+        def book():
+            try:
+                results.append(
+                    Booking.create_booking(
+                        listing_id=listing.pk,
+                        user_id=host.pk,
+                        check_in=check_in,
+                        check_out=check_in + timedelta(days=2),
+                        number_of_guests=1,
+                    )["status"]
+                )
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(Booking.objects.count(), 1)
+
+
+class BulkBookingTests(StayTestCase):
+    url = "/api/stay/bookings/bulk/"
+
+    def setUp(self):
+        super().setUp()
+        self.staff = get_user_model().objects.create_user(
+            email="staff@example.com",
+            password="pw12345!",
+            first_name="Staff",
+            last_name="Example",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.staff)
+
+    def item(self, listing_id, check_in, nights=2, **overrides):
+        item = {
+            "listing_id": str(listing_id),
+            "user": str(self.host.pk),
+            "check_in": str(self.day(check_in)),
+            "check_out": str(self.day(check_in + nights)),
+            "number_of_guests": 1,
+        }
+        item.update(overrides)
+        return item
+
+    def test_items_are_checked_against_each_other_and_existing_bookings(self):
+        first, second = self.make_listings(2)
+        self.book(second, 10)
+        items = [
+            self.item(first.pk, 5),
+            self.item(first.pk, 6),
+            self.item(first.pk, 7),
+            self.item(second.pk, 11),
+            self.item(uuid.uuid4(), 5),
+            self.item(first.pk, 20, user=str(uuid.uuid4())),
+            self.item(first.pk, 30, check_out="not a date"),
+        ]
+
+        response = self.client.post(self.url, {"bookings": items}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data["data"]
+        self.assertEqual([result["index"] for result in results], list(range(7)))
+        self.assertEqual(
+            [result["status"] for result in results],
+            [True, False, True, False, False, False, False],
+        )
+        self.assertEqual(results[4]["message"], "Listing not found")
+        self.assertEqual(results[5]["message"], "User not found")
+        self.assertIn("check_out", results[6]["errors"])
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(Booking.objects.filter(listing=first).count(), 2)
+
+    def test_only_staff_may_import(self):
+        listing = self.make_listings(1)[0]
+        body = {"bookings": [self.item(listing.pk, 5)]}
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.post(self.url, body, format="json").status_code, 401)
+        self.client.force_authenticate(self.host)
+        self.assertEqual(self.client.post(self.url, body, format="json").status_code, 403)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_accepted_items_are_priced_and_held(self):
+        listing = self.make_listings(1, price=80)[0]
+
+        self.client.post(
+            self.url, {"bookings": [self.item(listing.pk, 5, nights=3)]}, format="json"
+        )
+
+        booking = Booking.objects.get()
+        self.assertEqual(booking.total_price, Decimal("240.00"))
+        self.assertIsNotNone(booking.expires_at)
+        self.assertEqual(BookedNight.objects.filter(listing=listing).count(), 3)
+
+
+class RateCalendarTests(StayTestCase):
+    # A Monday, so the stay below covers one Friday and one Saturday night
+    monday = date(2030, 1, 7)
+
+    def setUp(self):
+        super().setUp()
+        self.listing = self.make_listings(1, price=100)[0]
+        for kind, start, end, price in (
+            ("season", 2, 13, 150),
+            ("weekend", None, None, 200),
+            ("override", 5, 6, 300),
+        ):
+            ListingRate.objects.create(
+                listing=self.listing,
+                kind=kind,
+                start_date=start and self.monday + timedelta(days=start),
+                end_date=end and self.monday + timedelta(days=end),
+                price_per_night=price,
+            )
+
+    def test_overrides_beat_weekends_beat_seasons(self):
+        # Mon, Tue at base; Wed, Thu, Sun seasonal; Fri weekend; Sat override
+        totals = ListingRate.quote(
+            [
+                (self.listing.pk, self.monday, self.monday + timedelta(days=7)),
+                (self.listing.pk, self.monday, self.monday + timedelta(days=2)),
+                (
+                    self.listing.pk,
+                    self.monday + timedelta(days=5),
+                    self.monday + timedelta(days=6),
+                ),
+            ]
+        )
+        self.assertEqual(
+            totals, [Decimal("1150.00"), Decimal("200.00"), Decimal("300.00")]
+        )
+
+    def test_booking_total_follows_the_calendar(self):
+        result = Booking.create_booking(
+            listing_id=self.listing.pk,
+            user_id=self.host.pk,
+            check_in=self.monday + timedelta(days=4),
+            check_out=self.monday + timedelta(days=6),
+            number_of_guests=1,
+        )
+        self.assertTrue(result["status"])
+        self.assertEqual(Booking.objects.get().total_price, Decimal("500.00"))
+
+    def test_search_annotates_stay_totals(self):
+        response = self.client.post(
+            "/api/stay/listings/",
+            {
+                "filters": {
+                    "check_in": str(self.monday),
+                    "check_out": str(self.monday + timedelta(days=7)),
+                }
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"][0]["total_price"], Decimal("1150.00"))
+
+
+class AvailabilityCalendarTests(StayTestCase):
+    url = "/api/stay/listings/availability/"
+
+    def setUp(self):
+        super().setUp()
+        self.listing, self.empty = self.make_listings(2)
+        self.book(self.listing, 2)
+        self.book(self.listing, 4)
+        self.book(self.listing, 10, nights=1)
+        self.book(self.listing, 12, status=Booking.STATUS_CANCELLED)
+
+    def calendar(self, **body):
+        body.setdefault("listing_ids", [str(self.listing.pk), str(self.empty.pk)])
+        response = self.client.post(self.url, body, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.data["data"]["listings"]
+
+    def test_ranges_merge_adjacent_stays_and_clip_to_the_window(self):
+        calendars = self.calendar(start=str(self.day(0)), days=14)
+        self.assertEqual(calendars[str(self.listing.pk)], [[2, 4], [10, 1]])
+        self.assertEqual(calendars[str(self.empty.pk)], [])
+
+        calendars = self.calendar(start=str(self.day(3)), days=8)
+        self.assertEqual(calendars[str(self.listing.pk)], [[0, 3], [7, 1]])
+
+    def test_bitset(self):
+        calendars = self.calendar(start=str(self.day(0)), days=14, encoding="bitset")
+        booked = base64.b64decode(calendars[str(self.listing.pk)])
+        self.assertEqual(booked, bytes([0b00111100, 0b00000100]))
+        self.assertEqual(base64.b64decode(calendars[str(self.empty.pk)]), bytes(2))
+
+    def test_limits(self):
+        response = self.client.post(
+            self.url, {"listing_ids": [str(self.listing.pk)], "days": 400}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class UserBookingsTests(StayTestCase):
+    url = "/api/stay/bookings/my-bookings/"
+
+    def setUp(self):
+        super().setUp()
+        self.guest = get_user_model().objects.create_user(
+            email="guest@example.com",
+            password="pw12345!",
+            first_name="Guest",
+            last_name="Example",
+        )
+        self.first, self.second = self.make_listings(2)
+        for offset in range(0, 30, 2):
+            self.book(self.first, offset, user=self.guest)
+        for offset in range(0, 10, 2):
+            self.book(self.second, offset, user=self.guest)
+        self.book(self.second, 20)
+
+    def test_requires_authentication(self):
+        response = self.client.post(self.url, {}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+    def test_pages_walk_the_users_bookings_newest_first(self):
+        self.client.force_authenticate(self.guest)
+
+        rows = []
+        body = {"count": 7}
+        while True:
+            response = self.client.post(self.url, body, format="json")
+            self.assertEqual(response.status_code, 200)
+            rows += response.data["data"]
+            if not response.data["next_cursor"]:
+                break
+            body["cursor"] = response.data["next_cursor"]
+
+        self.assertEqual(len(rows), 20)
+        self.assertEqual(len({row["id"] for row in rows}), 20)
+        self.assertTrue(all(row["user_id"] == self.guest.pk for row in rows))
+        keys = [(row["created_at"], row["id"]) for row in rows]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_filters_apply_within_the_user(self):
+        self.client.force_authenticate(self.guest)
+
+        response = self.client.post(
+            self.url,
+            {"filters": {"listing_id": str(self.second.pk)}},
+            format="json",
+        )
+
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual(
+            {row["listing_id"] for row in response.data["data"]}, {self.second.pk}
+        )
+
+
+class ActiveBookingIndexTests(StayTestCase):
+    def test_index_condition_matches_active_statuses(self):
+        index = next(
+            index
+            for index in Booking._meta.indexes
+            if index.name == "stay_booking_active_idx"
+        )
+        self.assertEqual(index.condition, Q(status__in=list(Booking.ACTIVE_STATUSES)))
+
+    @skipUnless(
+        connection.vendor == "sqlite", "Plans of other backends vary with table size"
+    )
+    def test_availability_checks_use_the_partial_index(self):
+        plan = (
+            Booking.active_bookings()
+            .filter(
+                listing_id=uuid.uuid4(),
+                check_in__lt=self.day(5),
+                check_out__gt=self.day(1),
+            )
+            .explain()
+        )
+        self.assertIn("stay_booking_active_idx", plan)
+
+    def test_cancelled_bookings_do_not_hold_dates(self):
+        listing = self.make_listings(1)[0]
+        self.book(listing, 5, status=Booking.STATUS_CANCELLED)
+        self.book(listing, 8)
+
+        self.assertEqual(Booking.unreleased_bookings().count(), 1)
+        self.assertEqual(Booking.active_bookings().get().check_in, self.day(8))
+
+
+class AsyncViewTests(StayTestCase):
+    def setUp(self):
+        super().setUp()
+        self.listing = self.make_listings(3)[0]
+        self.book(self.listing, 5)
+
+    async def post(self, url, body):
+        return await AsyncClient().post(url, body, content_type="application/json")
+
+    def sync_post(self, url, body):
+        cache.clear()
+        return self.client.post(url, body, format="json")
+
+    async def test_listing_pages_match_the_sync_view(self):
+        body = {"count": 2, "filters": {"city": "miami"}}
+        expected = await sync_to_async(self.sync_post)("/api/stay/listings/", body)
+        await sync_to_async(cache.clear)()
+
+        response = await self.post("/api/stay/async/listings/", body)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), json.loads(expected.content))
+
+    async def test_listing_detail_matches_the_sync_view(self):
+        body = {"id": str(self.listing.pk)}
+        expected = await sync_to_async(self.sync_post)("/api/stay/get_listing/", body)
+
+        response = await self.post("/api/stay/async/get_listing/", body)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), json.loads(expected.content))
+
+        response = await self.post(
+            "/api/stay/async/get_listing/", {"id": str(uuid.uuid4())}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_booking_create_rejects_overlaps(self):
+        body = {
+            "listing_id": str(self.listing.pk),
+            "user": str(self.host.pk),
+            "check_in": str(self.day(6)),
+            "check_out": str(self.day(8)),
+            "number_of_guests": 1,
+        }
+        response = await self.post("/api/stay/async/bookings/", body)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["message"], "Listing is not available for the given dates"
+        )
+
+        body.update(check_in=str(self.day(7)), check_out=str(self.day(9)))
+        response = await self.post("/api/stay/async/bookings/", body)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(await Booking.objects.acount(), 2)
+
+    async def test_staff_create_confirmed_bookings_as_on_the_sync_view(self):
+        body = {
+            "listing_id": str(self.listing.pk),
+            "user": str(self.host.pk),
+            "check_in": str(self.day(10)),
+            "check_out": str(self.day(12)),
+            "number_of_guests": 1,
+            "status": "confirmed",
+        }
+        response = await self.post("/api/stay/async/bookings/", body)
+        self.assertEqual(response.status_code, 400)
+
+        staff = await get_user_model().objects.acreate(
+            email="staff@example.com",
+            first_name="Staff",
+            last_name="Example",
+            is_staff=True,
+        )
+        token = await sync_to_async(AccessToken.for_user)(staff)
+        response = await AsyncClient().post(
+            "/api/stay/async/bookings/",
+            body,
+            content_type="application/json",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["data"]["status"], Booking.STATUS_CONFIRMED)
+        self.assertIsNone(response.json()["data"]["expires_at"])
+
+    async def test_invalid_bodies(self):
+        response = await self.post("/api/stay/async/bookings/", {"listing_id": "x"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["status"], "error")
+
+
+class BookingHoldTests(StayTestCase):
+    def setUp(self):
+        super().setUp()
+        self.listing = self.make_listings(1)[0]
+
+    def lapse(self, *bookings):
+        Booking.objects.filter(pk__in=[booking.pk for booking in bookings]).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+    def test_only_pending_bookings_hold_with_an_expiry(self):
+        pending = self.book(self.listing, 5)
+        confirmed = self.book(self.listing, 8, status=Booking.STATUS_CONFIRMED)
+        self.assertIsNotNone(pending.expires_at)
+        self.assertIsNone(confirmed.expires_at)
+
+        pending.status = Booking.STATUS_CONFIRMED
+        pending.save(update_fields=["status"])
+        pending.refresh_from_db()
+        self.assertIsNone(pending.expires_at)
+
+    def test_sweeper_cancels_lapsed_holds_in_batches(self):
+        lapsed = [self.book(self.listing, offset) for offset in (2, 4, 6)]
+        open_hold = self.book(self.listing, 8)
+        self.lapse(*lapsed)
+        self.assertEqual(Booking.active_bookings().get(), open_hold)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(Booking.expire_holds(batch_size=2), 3)
+
+        self.assertEqual(
+            Booking.objects.filter(status=Booking.STATUS_CANCELLED).count(), 3
+        )
+        self.assertEqual(Booking.objects.get(status=Booking.STATUS_PENDING), open_hold)
+        self.assertEqual(BookedNight.objects.filter(listing=self.listing).count(), 2)
+
+    def test_lapsed_holds_free_their_dates_for_new_bookings(self):
+        hold = self.book(self.listing, 5)
+        self.lapse(hold)
+
+        result = Booking.create_booking(
+            listing_id=self.listing.pk,
+            user_id=self.host.pk,
+            check_in=self.day(6),
+            check_out=self.day(8),
+            number_of_guests=1,
+        )
+
+        self.assertTrue(result["status"])
+        hold.refresh_from_db()
+        self.assertEqual(hold.status, Booking.STATUS_CANCELLED)
+
+    def test_only_staff_book_without_a_hold(self):
+        body = {
+            "listing_id": str(self.listing.pk),
+            "user": str(self.host.pk),
+            "check_in": str(self.day(5)),
+            "check_out": str(self.day(7)),
+            "number_of_guests": 1,
+            "status": "confirmed",
+        }
+        response = self.client.post("/api/stay/bookings/", body, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        staff = get_user_model().objects.create_user(
+            email="staff@example.com",
+            password="pw12345!",
+            first_name="Staff",
+            last_name="Example",
+            is_staff=True,
+        )
+        self.client.force_authenticate(staff)
+        response = self.client.post("/api/stay/bookings/", body, format="json")
+        self.assertEqual(response.status_code, 201)
+        booking = Booking.objects.get()
+        self.assertEqual(booking.status, Booking.STATUS_CONFIRMED)
+        self.assertIsNone(booking.expires_at)
+
+
+class BookingConfirmTests(StayTestCase):
+    url = "/api/stay/bookings/confirm/"
+
+    def setUp(self):
+        super().setUp()
+        self.listing = self.make_listings(1)[0]
+
+    def test_guests_confirm_their_hold_at_checkout(self):
+        self.client.force_authenticate(self.host)
+        response = self.client.post(
+            "/api/stay/bookings/",
+            {
+                "listing_id": str(self.listing.pk),
+                "user": str(self.host.pk),
+                "check_in": str(self.day(5)),
+                "check_out": str(self.day(7)),
+                "number_of_guests": 1,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["data"]["status"], Booking.STATUS_PENDING)
+        self.assertIsNotNone(response.data["data"]["expires_at"])
+
+        response = self.client.post(
+            self.url, {"id": str(response.data["data"]["id"])}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        booking = Booking.objects.get()
+        self.assertEqual(booking.status, Booking.STATUS_CONFIRMED)
+        self.assertIsNone(booking.expires_at)
+        self.assertEqual(Booking.expire_holds(), 0)
+
+    def test_only_the_guest_or_staff_can_confirm(self):
+        booking = self.book(self.listing, 5)
+        other = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="pw12345!",
+            first_name="Other",
+            last_name="Guest",
+        )
+
+        response = self.client.post(self.url, {"id": str(booking.pk)}, format="json")
+        self.assertEqual(response.status_code, 401)
+        self.client.force_authenticate(other)
+        response = self.client.post(self.url, {"id": str(booking.pk)}, format="json")
+        self.assertEqual(response.status_code, 404)
+
+        other.is_staff = True
+        other.save()
+        response = self.client.post(self.url, {"id": str(booking.pk)}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+    def test_lapsed_holds_cannot_be_confirmed(self):
+        booking = self.book(self.listing, 5)
+        Booking.objects.filter(pk=booking.pk).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        self.client.force_authenticate(self.host)
+
+        response = self.client.post(self.url, {"id": str(booking.pk)}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["message"], "Booking hold has expired")
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, Booking.STATUS_PENDING)
+
+
+class ExportTests(StayTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="pw12345!",
+            first_name="Other",
+            last_name="Host",
+        )
+        self.mine = self.make_listings(3)
+        self.theirs = Listing.objects.create(
+            title="Elsewhere",
+            description="Loft",
+            price_per_night=90,
+            city="Miami",
+            host=self.other,
+        )
+        self.book(self.mine[0], 5)
+        self.book(self.theirs, 5)
+
+    def export(self, url, **body):
+        self.client.force_authenticate(self.host)
+        response = self.client.post(url, body, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_listing_csv_covers_only_the_hosts_listings(self):
+        content = self.export("/api/stay/listings/export/")
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(list(rows[0]), Listing.get_export_fields())
+        self.assertEqual(
+            {row["id"] for row in rows}, {str(listing.pk) for listing in self.mine}
+        )
+
+    def test_booking_ndjson_covers_bookings_on_the_hosts_listings(self):
+        content = self.export("/api/stay/bookings/export/", format="ndjson")
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["listing__id"], str(self.mine[0].pk))
+
+    def test_requires_authentication(self):
+        response = self.client.post("/api/stay/listings/export/", {}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+    async def test_asgi_requests_stream_an_async_iterator(self):
+        token = await sync_to_async(AccessToken.for_user)(self.host)
+        response = await AsyncClient().post(
+            "/api/stay/listings/export/",
+            {"format": "ndjson"},
+            content_type="application/json",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b"".join([block async for block in response.streaming_content])
+        self.assertEqual(len(content.decode().splitlines()), 3)
+
+
+class ExportRenderingTests(SimpleTestCase):
+    def test_lines_are_joined_into_blocks(self):
+        lines = [f"{index:09d}\n" for index in range(100)]
+        blocks = list(exports.blocks(lines, size=250))
+        self.assertEqual("".join(blocks), "".join(lines))
+        self.assertTrue(all(len(block) == 250 for block in blocks[:-1]))
+
+
+class BookingMonthsTests(SimpleTestCase):
+    def test_revenue_is_split_by_nights_and_adds_up(self):
+        created_at = timezone.make_aware(datetime(2030, 1, 20, 12))
+        months = stats.booking_months(
+            date(2030, 1, 30), date(2030, 2, 2), Decimal("100.00"), created_at
+        )
+        self.assertEqual(
+            months,
+            {
+                date(2030, 1, 1): [2, 6666, 1, 10],
+                date(2030, 2, 1): [1, 3334, 0, 0],
+            },
+        )
+
+
+class MonthlyStatsTests(StayTestCase):
+    def setUp(self):
+        super().setUp()
+        self.first, self.second = self.make_listings(2)
+
+    def snapshot(self):
+        return sorted(
+            row
+            for row in ListingMonthlyStats.objects.values_list(
+                "listing_id", "month", "booked_nights", "revenue", "arrivals", "lead_days"
+            )
+            if any(row[2:])
+        )
+
+    def test_incremental_updates_match_a_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(self.first, 3, nights=40, status=Booking.STATUS_CONFIRMED)
+            moved = self.book(self.second, 5)
+            moved.check_in, moved.check_out = self.day(50), self.day(53)
+            moved.save()
+            cancelled = self.book(self.second, 10)
+            cancelled.status = Booking.STATUS_CANCELLED
+            cancelled.save()
+            self.book(self.second, 20).delete()
+            Booking.create_bookings(
+                [
+                    dict(
+                        listing_id=self.second.pk,
+                        user_id=self.host.pk,
+                        check_in=self.day(offset),
+                        check_out=self.day(offset + 2),
+                        number_of_guests=1,
+                    )
+                    for offset in (30, 60)
+                ]
+            )
+            lapsed = self.book(self.second, 70)
+            Booking.objects.filter(pk=lapsed.pk).update(
+                expires_at=timezone.now() - timedelta(minutes=1)
+            )
+            Booking.expire_holds()
+
+        incremental = self.snapshot()
+        self.assertTrue(incremental)
+        ListingMonthlyStats.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_dashboard_reports_the_hosts_listings(self):
+        other = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="pw12345!",
+            first_name="Other",
+            last_name="Host",
+        )
+        Listing.objects.create(
+            title="Elsewhere", description="Loft", price_per_night=90, host=other
+        )
+        check_in = date(2030, 3, 10)
+        Booking.objects.create(
+            listing=self.first,
+            user=self.host,
+            check_in=check_in,
+            check_out=check_in + timedelta(days=3),
+            status=Booking.STATUS_CONFIRMED,
+        )
+
+        self.client.force_authenticate(self.host)
+        response = self.client.post(
+            "/api/stay/listings/dashboard/",
+            {"start_month": "2030-03-01", "end_month": "2030-03-31"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        first, second = response.data["data"]
+        self.assertEqual(first["id"], self.first.pk)
+        self.assertEqual(first["booked_nights"], 3)
+        self.assertEqual(first["occupancy_rate"], round(3 / 31, 4))
+        self.assertEqual(first["revenue"], Decimal("300.00"))
+        self.assertEqual(first["average_nightly_rate"], Decimal("100.00"))
+        self.assertEqual(first["arrivals"], 1)
+        self.assertEqual(first["average_lead_days"], (check_in - date.today()).days)
+        self.assertEqual(second["booked_nights"], 0)
+        self.assertIsNone(second["average_nightly_rate"])
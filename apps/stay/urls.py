@@ -2,9 +2,20 @@ from django.urls import path
 from stay.views import (
     ListingListAPIView,
     ListingDetailAPIView,
-    # SearchListingsAPIView,
+    SearchListingsAPIView,
+    AvailabilityCalendarAPIView,
     BookingCreateAPIView,
-    # UserBookingsAPIView
+    BulkBookingCreateAPIView,
+    BookingConfirmAPIView,
+    UserBookingsAPIView,
+    ListingExportAPIView,
+    BookingExportAPIView,
+    HostDashboardAPIView,
+)
+from stay.async_views import (
+    AsyncListingListAPIView,
+    AsyncListingDetailAPIView,
+    AsyncBookingCreateAPIView,
 )
 
 app_name = "stay"
@@ -12,9 +23,27 @@ app_name = "stay"
 urlpatterns = [
     # Listing endpoints
     path("listings/", ListingListAPIView.as_view(), name="listing-list"),
-    # path('listings/search/', SearchListingsAPIView.as_view(), name='listing-search'),
+    path("listings/search/", SearchListingsAPIView.as_view(), name="listing-search"),
     path("get_listing/", ListingDetailAPIView.as_view(), name="listing-detail"),
+    path(
+        "listings/availability/",
+        AvailabilityCalendarAPIView.as_view(),
+        name="listing-availability",
+    ),
+    path("listings/export/", ListingExportAPIView.as_view(), name="listing-export"),
+    path("listings/dashboard/", HostDashboardAPIView.as_view(), name="host-dashboard"),
     # Booking endpoints
     path("bookings/", BookingCreateAPIView.as_view(), name="booking-create"),
-    # path('bookings/my-bookings/', UserBookingsAPIView.as_view(), name='user-bookings'),
+    path("bookings/confirm/", BookingConfirmAPIView.as_view(), name="booking-confirm"),
+    path("bookings/bulk/", BulkBookingCreateAPIView.as_view(), name="booking-bulk-create"),
+    path("bookings/my-bookings/", UserBookingsAPIView.as_view(), name="user-bookings"),
+    path("bookings/export/", BookingExportAPIView.as_view(), name="booking-export"),
+    # Async variants; serve them from an ASGI server
+    path("async/listings/", AsyncListingListAPIView.as_view(), name="async-listing-list"),
+    path(
+        "async/get_listing/",
+        AsyncListingDetailAPIView.as_view(),
+        name="async-listing-detail",
+    ),
+    path("async/bookings/", AsyncBookingCreateAPIView.as_view(), name="async-booking-create"),
 ]
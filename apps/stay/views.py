@@ -1,23 +1,135 @@
+from datetime import datetime, time, timedelta
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, serializers
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from django.db.models import Q
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, inline_serializer
 
-from stay.models import Listing, Booking
+from stay import exports, geo, occupancy
+from stay.models import Listing, Booking, ListingRate, ListingMonthlyStats
+from stay.search import KEYWORD_ORDERING, keyword_filter
+from stay.search_cache import search_cache
 from stay.serializers import (
     ListingDetailRequestSerializer,
+    AvailabilityCalendarSerializer,
     ListingSerializer,
     ListingDetailSerializer,
     BookingSerializer,
     FetchListingsSerializer,
+    FacetsSerializer,
     SearchListingsSerializer,
     CreateBookingSerializer,
+    CreatedBookingSerializer,
+    ConfirmBookingSerializer,
+    BulkCreateBookingSerializer,
+    BulkBookingResultSerializer,
     FetchBookingsSerializer,
+    ListingExportSerializer,
+    BookingExportSerializer,
+    HostDashboardSerializer,
+    ListingStatsSerializer,
 )
 
 
+def booking_conditions(filters, conditions):
+    """
+    Add BookingFilterSerializer filters to a Q object
+
+    Args:
+        filters: Validated filters
+        conditions: Q object to extend, e.g. the caller's access scope
+
+    Returns:
+        The extended Q object
+    """
+    listing_id = filters.get("listing_id")
+    if listing_id:
+        conditions.add(Q(listing_id=listing_id), Q.AND)
+
+    check_in = filters.get("check_in")
+    if check_in:
+        conditions.add(Q(check_in=check_in), Q.AND)
+
+    check_out = filters.get("check_out")
+    if check_out:
+        conditions.add(Q(check_out=check_out), Q.AND)
+
+    # Compare created_at with midnights rather than its date, so the
+    # filter stays a range on the (user, created_at) index
+    start_date = filters.get("start_date")
+    if start_date:
+        start = timezone.make_aware(datetime.combine(start_date, time.min))
+        conditions.add(Q(created_at__gte=start), Q.AND)
+
+    end_date = filters.get("end_date")
+    if end_date:
+        end = timezone.make_aware(
+            datetime.combine(end_date + timedelta(days=1), time.min)
+        )
+        conditions.add(Q(created_at__lt=end), Q.AND)
+
+    return conditions
+
+
+def listing_list_cache_key(validated_data):
+    """Search cache key of a validated FetchListingsSerializer request"""
+    return search_cache.make_key(
+        "list",
+        {
+            **validated_data.get("filters", {}),
+            "count": validated_data.get("count"),
+            "cursor": validated_data.get("cursor"),
+            "facets": validated_data.get("facets"),
+        },
+    )
+
+
+def listing_list_conditions(filters):
+    """Listing conditions for validated ListingFilterSerializer filters"""
+    return Listing.search_conditions(
+        city=filters.get("city"),
+        check_in=filters.get("check_in"),
+        check_out=filters.get("check_out"),
+    )
+
+
+def listing_list_payload(validated_data, listings, next_cursor, conditions):
+    """
+    Response payload of a listing page: stay totals for the requested
+    dates and, if asked for, facet counts
+
+    Args:
+        validated_data: Validated FetchListingsSerializer data
+        listings: Rows of the page
+        next_cursor: Cursor of the next page, or None
+        conditions: Conditions the page was fetched with
+    """
+    filters = validated_data.get("filters", {})
+    check_in = filters.get("check_in")
+    check_out = filters.get("check_out")
+    if check_in and check_out and check_out > check_in:
+        ListingRate.annotate_totals(listings, check_in, check_out)
+
+    data = {
+        "status": True,
+        "message": "Listings fetched successfully",
+        "data": listings,
+        "count": len(listings),
+        "next_cursor": next_cursor,
+    }
+    if validated_data.get("facets"):
+        # The rollup answers city-only requests; dates need the live query
+        if check_in:
+            data["facets"] = Listing.fetch_facets(conditions=conditions)
+        else:
+            data["facets"] = Listing.fetch_facets(city=filters.get("city"))
+    return data
+
+
 class ListingListAPIView(APIView):
     """Fetch all rental listings with optional filters"""
 
@@ -35,6 +147,8 @@ class ListingListAPIView(APIView):
                     message=serializers.CharField(),
                     data=ListingSerializer(many=True),
                     count=serializers.IntegerField(),
+                    next_cursor=serializers.CharField(allow_null=True),
+                    facets=FacetsSerializer(required=False),
                 ),
             ),
         },
@@ -42,35 +156,23 @@ class ListingListAPIView(APIView):
     def post(self, request):
         serializer = FetchListingsSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-
-        validated = serializer.validated_data.get("filters", {})
-        condition = Q()
-
-        if "city" in validated:
-            condition &= Q(city__iexact=validated["city"])
-
-        # Availability filter using date exclusion
-        if "check_in" in validated and "check_out" in validated:
-            check_in = validated["check_in"]
-            check_out = validated["check_out"]
-
-            # remove listings with overlapping bookings
-            condition &= ~Q(
-                bookings__check_in__lt=check_out,
-                bookings__check_out__gt=check_in,
-                bookings__status__in=["pending", "confirmed"],
-            )
-
-        listings = Listing.fetch_listings(conditions=condition)
-
-        return Response(
-            {
-                "status": True,
-                "message": "Listings fetched successfully",
-                "data": listings,
-            },
-            status=status.HTTP_200_OK,
+        validated = serializer.validated_data
+
+        cache_key = listing_list_cache_key(validated)
+        cached = search_cache.get(cache_key)
+        if cached is not None:
+            return Response(cached, status=status.HTTP_200_OK)
+
+        conditions = listing_list_conditions(validated.get("filters", {}))
+        listings, next_cursor = Listing.fetch_listings_page(
+            conditions=conditions,
+            cursor=validated.get("cursor"),
+            count=validated.get("count"),
         )
+        data = listing_list_payload(validated, listings, next_cursor, conditions)
+        search_cache.set(cache_key, data)
+
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class ListingDetailAPIView(APIView):
@@ -107,7 +209,8 @@ class ListingDetailAPIView(APIView):
 
         listing_id = serializers.validated_data.get("id")
 
-        listing_data = Listing.get_listing(id=listing_id)
+        # Cached payload with denormalized booking counters
+        listing_data = Listing.get_listing_detail(listing_id)
 
         if not listing_data:
             return Response(
@@ -115,10 +218,6 @@ class ListingDetailAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Get booking count
-        total_bookings = Booking.objects.filter(listing_id=listing_id).count()
-        listing_data["total_bookings"] = total_bookings
-
         return Response(
             data=dict(
                 status=True,
@@ -129,73 +228,183 @@ class ListingDetailAPIView(APIView):
         )
 
 
-# class SearchListingsAPIView(APIView):
-#     """Search listings by city with optional availability and price filters"""
-
-#     permission_classes = [AllowAny]
-
-#     @extend_schema(
-#         tags=["Listings"],
-#         description="Search rental listings by city with optional filters for availability dates and price range",
-#         request=SearchListingsSerializer,
-#         responses={
-#             200: inline_serializer(
-#                 name="SearchListingsResponse",
-#                 fields=dict(
-#                     status=serializers.BooleanField(),
-#                     message=serializers.CharField(),
-#                     data=ListingSerializer(many=True),
-#                     count=serializers.IntegerField(),
-#                 ),
-#             ),
-#         },
-#     )
-#     def post(self, request):
-#         """Search listings by city and availability"""
-#         serializer = SearchListingsSerializer(data=request.data)
-#         serializer.is_valid(raise_exception=True)
-
-#         city = serializer.validated_data.get("city")
-#         check_in = serializer.validated_data.get("check_in")
-#         check_out = serializer.validated_data.get("check_out")
-#         min_price = serializer.validated_data.get("min_price")
-#         max_price = serializer.validated_data.get("max_price")
-
-#         # Build Q object for conditions
-#         conditions = Q(city__icontains=city)
-
-#         # Apply price filters
-#         if min_price:
-#             conditions.add(Q(price_per_night__gte=min_price), Q.AND)
-
-#         if max_price:
-#             conditions.add(Q(price_per_night__lte=max_price), Q.AND)
-
-#         # If dates provided, exclude listings with overlapping bookings
-#         if check_in and check_out:
-#             # Get listings with overlapping bookings
-#             booked_listing_ids = Booking.objects.filter(
-#                 check_in__lt=check_out, check_out__gt=check_in
-#             ).values_list("listing_id", flat=True)
-
-#             # Exclude booked listings
-#             if booked_listing_ids:
-#                 conditions.add(~Q(id__in=booked_listing_ids), Q.AND)
-
-#         # Fetch listings using class method
-#         listings_data = Listing.fetch_listings(
-#             values=True, conditions=conditions, count=100
-#         )
-
-#         return Response(
-#             data=dict(
-#                 status=True,
-#                 message="Listings search completed successfully",
-#                 data=listings_data,
-#                 count=len(listings_data),
-#             ),
-#             status=status.HTTP_200_OK,
-#         )
+class AvailabilityCalendarAPIView(APIView):
+    """Booked nights of one or more listings in a compact encoding"""
+
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        tags=["Listings"],
+        description="Booked nights of up to 50 listings over up to 366 days, encoded per listing as run-length ranges or a base64 bitset",
+        request=AvailabilityCalendarSerializer,
+        responses={
+            200: inline_serializer(
+                name="AvailabilityCalendarResponse",
+                fields=dict(
+                    status=serializers.BooleanField(),
+                    message=serializers.CharField(),
+                    data=inline_serializer(
+                        name="AvailabilityCalendar",
+                        fields=dict(
+                            start=serializers.DateField(),
+                            days=serializers.IntegerField(),
+                            encoding=serializers.CharField(),
+                            listings=serializers.DictField(
+                                help_text="Encoded booked nights keyed by listing id."
+                            ),
+                        ),
+                    ),
+                ),
+            ),
+        },
+    )
+    def post(self, request):
+        """Get the booked-nights calendar"""
+        serializer = AvailabilityCalendarSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        validated = serializer.validated_data
+        start = validated["start"]
+        days = validated["days"]
+
+        intervals = Booking.booked_intervals(
+            validated["listing_ids"], start, start + timedelta(days=days)
+        )
+        calendars = {
+            str(listing_id): occupancy.encode(
+                listing_intervals, start, days, validated["encoding"]
+            )
+            for listing_id, listing_intervals in intervals.items()
+        }
+
+        return Response(
+            data=dict(
+                status=True,
+                message="Availability calendar retrieved successfully",
+                data=dict(
+                    start=start,
+                    days=days,
+                    encoding=validated["encoding"],
+                    listings=calendars,
+                ),
+            ),
+            status=status.HTTP_200_OK,
+        )
+
+
+class SearchListingsAPIView(APIView):
+    """Search listings by city, availability, price range and guest capacity"""
+
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        tags=["Listings"],
+        description="Search rental listings with optional keywords and filters for city, availability dates, price range, guest capacity, map viewport and radius",
+        request=SearchListingsSerializer,
+        responses={
+            200: inline_serializer(
+                name="SearchListingsResponse",
+                fields=dict(
+                    status=serializers.BooleanField(),
+                    message=serializers.CharField(),
+                    data=ListingSerializer(many=True),
+                    count=serializers.IntegerField(),
+                    next_cursor=serializers.CharField(allow_null=True),
+                    facets=FacetsSerializer(required=False),
+                ),
+            ),
+        },
+    )
+    def post(self, request):
+        """Search listings by city, availability, price and capacity"""
+        serializer = SearchListingsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        validated = serializer.validated_data
+
+        cache_key = search_cache.make_key("search", validated)
+        cached = search_cache.get(cache_key)
+        if cached is not None:
+            return Response(data=cached, status=status.HTTP_200_OK)
+
+        bounds = None
+        if validated.get("bounds"):
+            viewport = validated["bounds"]
+            bounds = (viewport["south"], viewport["west"], viewport["north"], viewport["east"])
+        elif validated.get("radius_km"):
+            bounds = geo.radius_bounds(
+                validated["latitude"], validated["longitude"], validated["radius_km"]
+            )
+
+        conditions = Listing.search_conditions(
+            city=validated.get("city"),
+            check_in=validated.get("check_in"),
+            check_out=validated.get("check_out"),
+            min_price=validated.get("min_price"),
+            max_price=validated.get("max_price"),
+            guests=validated.get("guests"),
+            bounds=bounds,
+        )
+
+        annotations = {}
+        ordering = None
+        if validated.get("radius_km"):
+            # The bounding box above narrows the scan; the exact distance
+            # is only computed for listings inside it
+            annotations["distance_km"] = geo.distance_expression(
+                validated["latitude"], validated["longitude"]
+            )
+            conditions &= Q(distance_km__lte=validated["radius_km"])
+
+        if validated.get("q"):
+            keyword_condition, rank = keyword_filter(validated["q"])
+            conditions &= keyword_condition
+            annotations["rank"] = rank
+            ordering = KEYWORD_ORDERING
+
+        listings_data, next_cursor = Listing.fetch_listings_page(
+            conditions=conditions,
+            cursor=validated.get("cursor"),
+            count=validated.get("count"),
+            annotations=annotations,
+            ordering=ordering,
+        )
+        if validated.get("check_in"):
+            ListingRate.annotate_totals(
+                listings_data, validated["check_in"], validated["check_out"]
+            )
+
+        data = dict(
+            status=True,
+            message="Listings search completed successfully",
+            data=listings_data,
+            count=len(listings_data),
+            next_cursor=next_cursor,
+        )
+        if validated.get("facets"):
+            # The rollup answers city-only searches; any other filter needs
+            # the single grouped query over the matching listings
+            narrowed = any(
+                validated.get(field) is not None
+                for field in (
+                    "check_in",
+                    "min_price",
+                    "max_price",
+                    "guests",
+                    "q",
+                    "bounds",
+                    "radius_km",
+                )
+            )
+            if narrowed:
+                data["facets"] = Listing.fetch_facets(
+                    conditions=conditions, annotations=annotations
+                )
+            else:
+                data["facets"] = Listing.fetch_facets(city=validated.get("city"))
+        search_cache.set(cache_key, data)
+
+        return Response(data=data, status=status.HTTP_200_OK)
 
 
 class BookingCreateAPIView(APIView):
@@ -205,7 +414,7 @@ class BookingCreateAPIView(APIView):
 
     @extend_schema(
         tags=["Bookings"],
-        description="Create a new booking for a rental listing. Validates availability and prevents double bookings.",
+        description="Create a new booking for a rental listing. Validates availability and prevents double bookings. A pending booking holds its dates until expires_at; confirm it with /bookings/confirm/ to keep them.",
         request=CreateBookingSerializer,
         responses={
             201: inline_serializer(
@@ -213,7 +422,7 @@ class BookingCreateAPIView(APIView):
                 fields=dict(
                     status=serializers.BooleanField(),
                     message=serializers.CharField(),
-                    data=BookingSerializer(),
+                    data=CreatedBookingSerializer(),
                 ),
             ),
         },
@@ -221,7 +430,9 @@ class BookingCreateAPIView(APIView):
     def post(self, request):
         """Create a new booking"""
         print("Request Data:", request.data)
-        serializer = CreateBookingSerializer(data=request.data)
+        serializer = CreateBookingSerializer(
+            data=request.data, context={"request": request}
+        )
         serializer.is_valid(raise_exception=True)
 
         listing_id = serializer.validated_data.get("listing_id")
@@ -236,6 +447,7 @@ class BookingCreateAPIView(APIView):
             check_in=check_in,
             check_out=check_out,
             number_of_guests=number_of_guests,
+            status=serializer.validated_data["status"],
         )
         if not booking_result["status"]:
             return Response(
@@ -251,78 +463,287 @@ class BookingCreateAPIView(APIView):
             data=dict(
                 status=True,
                 message=booking_result["message"],
-                # data=booking_result["booking"],
+                data=CreatedBookingSerializer(booking_result["booking"]).data,
             ),
             status=status.HTTP_201_CREATED,
         )
 
 
-# class UserBookingsAPIView(APIView):
-#     """Fetch bookings for the authenticated user with optional filters"""
-
-#     permission_classes = [IsAuthenticated]
-
-#     @extend_schema(
-#         tags=["Bookings"],
-#         description="Fetch all bookings for the authenticated user with optional filters",
-#         request=FetchBookingsSerializer,
-#         responses={
-#             200: inline_serializer(
-#                 name="UserBookingsResponse",
-#                 fields=dict(
-#                     status=serializers.BooleanField(),
-#                     message=serializers.CharField(),
-#                     data=BookingSerializer(many=True),
-#                     count=serializers.IntegerField(),
-#                 ),
-#             ),
-#         },
-#     )
-#     def post(self, request):
-#         """Fetch user's bookings with filters"""
-#         serializer = FetchBookingsSerializer(data=request.data)
-#         serializer.is_valid(raise_exception=True)
-
-#         filters = serializer.validated_data.get("filters", {})
-
-#         # Build Q object for conditions
-#         conditions = Q(user=request.user)
-
-#         # Apply filters
-#         listing_id = filters.get("listing_id")
-#         if listing_id:
-#             conditions.add(Q(listing_id=listing_id), Q.AND)
-
-#         check_in = filters.get("check_in")
-#         if check_in:
-#             conditions.add(Q(check_in=check_in), Q.AND)
-
-#         check_out = filters.get("check_out")
-#         if check_out:
-#             conditions.add(Q(check_out=check_out), Q.AND)
-
-#         start_date = filters.get("start_date")
-#         if start_date:
-#             conditions.add(Q(created_at__gte=start_date), Q.AND)
-
-#         end_date = filters.get("end_date")
-#         if end_date:
-#             conditions.add(Q(created_at__lte=end_date), Q.AND)
-
-#         # Apply count limit
-#         count = filters.get("count", 100)
-
-#         # Fetch bookings using class method
-#         bookings_data = Booking.fetch_bookings(
-#             values=True, conditions=conditions, count=count
-#         )
-
-#         return Response(
-#             data=dict(
-#                 status=True,
-#                 message="Bookings retrieved successfully",
-#                 data=bookings_data,
-#                 count=len(bookings_data),
-#             ),
-#             status=status.HTTP_200_OK,
-#         )
+class BookingConfirmAPIView(APIView):
+    """Confirm a pending booking, ending its hold"""
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Bookings"],
+        description="Confirm one of the authenticated user's pending bookings (any booking for staff), typically once checkout succeeds. Confirmed bookings keep their dates; pending ones are released when their hold expires.",
+        request=ConfirmBookingSerializer,
+        responses={
+            200: inline_serializer(
+                name="ConfirmBookingResponse",
+                fields=dict(
+                    status=serializers.BooleanField(),
+                    message=serializers.CharField(),
+                ),
+            ),
+        },
+    )
+    def post(self, request):
+        """Confirm a booking"""
+        serializer = ConfirmBookingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = Booking.confirm_booking(serializer.validated_data["id"], request.user)
+        if not result["status"]:
+            return Response(
+                data=dict(status=False, message=result["message"]),
+                status=(
+                    status.HTTP_404_NOT_FOUND
+                    if result["message"] == "Booking not found"
+                    else status.HTTP_400_BAD_REQUEST
+                ),
+            )
+
+        return Response(
+            data=dict(status=True, message=result["message"]),
+            status=status.HTTP_200_OK,
+        )
+
+
+class BulkBookingCreateAPIView(APIView):
+    """Create many bookings in one request, for channel-manager imports"""
+
+    # Items may book for any user and hold up to MAX_BOOKINGS stays at once
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        tags=["Bookings"],
+        description="Create many bookings in one request (staff only, for channel-manager imports). Items are checked for overlaps against existing bookings and against each other, and each item reports its own outcome. Confirmed items hold no expiry.",
+        request=BulkCreateBookingSerializer,
+        responses={
+            200: inline_serializer(
+                name="BulkCreateBookingResponse",
+                fields=dict(
+                    status=serializers.BooleanField(),
+                    message=serializers.CharField(),
+                    data=BulkBookingResultSerializer(many=True),
+                    count=serializers.IntegerField(),
+                ),
+            ),
+        },
+    )
+    def post(self, request):
+        """Create bookings in bulk"""
+        serializer = BulkCreateBookingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        items = serializer.validated_data["bookings"]
+        results = [None] * len(items)
+        valid_indexes = []
+        valid_items = []
+        for index, item in enumerate(items):
+            item_serializer = CreateBookingSerializer(
+                data=item, context={"request": request}
+            )
+            if not item_serializer.is_valid():
+                results[index] = dict(
+                    index=index,
+                    status=False,
+                    message="Invalid booking",
+                    errors=item_serializer.errors,
+                )
+                continue
+            validated = item_serializer.validated_data
+            valid_indexes.append(index)
+            valid_items.append(
+                dict(
+                    listing_id=validated["listing_id"],
+                    user_id=validated["user"],
+                    check_in=validated["check_in"],
+                    check_out=validated["check_out"],
+                    number_of_guests=validated["number_of_guests"],
+                    status=validated["status"],
+                )
+            )
+
+        if valid_items:
+            for index, result in zip(valid_indexes, Booking.create_bookings(valid_items)):
+                results[index] = dict(index=index, **result)
+
+        created = sum(1 for result in results if result["status"])
+        return Response(
+            data=dict(
+                status=created > 0,
+                message=f"{created} of {len(items)} bookings created",
+                data=results,
+                count=created,
+            ),
+            status=status.HTTP_200_OK,
+        )
+
+
+class UserBookingsAPIView(APIView):
+    """Fetch bookings for the authenticated user with optional filters"""
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Bookings"],
+        description="Fetch the authenticated user's bookings, newest first, with optional filters and cursor pagination",
+        request=FetchBookingsSerializer,
+        responses={
+            200: inline_serializer(
+                name="UserBookingsResponse",
+                fields=dict(
+                    status=serializers.BooleanField(),
+                    message=serializers.CharField(),
+                    data=BookingSerializer(many=True),
+                    count=serializers.IntegerField(),
+                    next_cursor=serializers.CharField(allow_null=True),
+                ),
+            ),
+        },
+    )
+    def post(self, request):
+        """Fetch user's bookings with filters"""
+        serializer = FetchBookingsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        filters = serializer.validated_data.get("filters", {})
+
+        # User leads the (user, created_at) index
+        conditions = booking_conditions(filters, Q(user=request.user))
+
+        bookings_data, next_cursor = Booking.fetch_bookings_page(
+            conditions=conditions,
+            cursor=serializer.validated_data.get("cursor"),
+            count=serializer.validated_data.get("count"),
+        )
+
+        return Response(
+            data=dict(
+                status=True,
+                message="Bookings retrieved successfully",
+                data=bookings_data,
+                count=len(bookings_data),
+                next_cursor=next_cursor,
+            ),
+            status=status.HTTP_200_OK,
+        )
+
+
+EXPORT_RESPONSES = {
+    (200, exports.CONTENT_TYPES[exports.FORMAT_CSV]): OpenApiTypes.STR,
+    (200, exports.CONTENT_TYPES[exports.FORMAT_NDJSON]): OpenApiTypes.STR,
+}
+
+
+class ListingExportAPIView(APIView):
+    """Stream the authenticated host's listings as CSV or NDJSON"""
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Listings"],
+        description="Export the authenticated host's listings (every listing for staff) as a streamed CSV or NDJSON download",
+        request=ListingExportSerializer,
+        responses=EXPORT_RESPONSES,
+    )
+    def post(self, request):
+        serializer = ListingExportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        conditions = Q()
+        if not request.user.is_staff:
+            conditions &= Q(host=request.user)
+        city = serializer.validated_data.get("city")
+        if city:
+            conditions &= Q(city_key=Listing.normalize_city(city))
+
+        return exports.streaming_response(
+            Listing.export_rows(conditions=conditions),
+            Listing.get_export_fields(),
+            serializer.validated_data["format"],
+            filename="listings",
+            asynchronous=exports.is_asgi(request),
+        )
+
+
+class BookingExportAPIView(APIView):
+    """Stream bookings on the authenticated host's listings as CSV or NDJSON"""
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Bookings"],
+        description="Export bookings on the authenticated host's listings (every booking for staff) as a streamed CSV or NDJSON download",
+        request=BookingExportSerializer,
+        responses=EXPORT_RESPONSES,
+    )
+    def post(self, request):
+        serializer = BookingExportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        filters = serializer.validated_data.get("filters", {})
+        conditions = Q()
+        if not request.user.is_staff:
+            conditions &= Q(listing__host=request.user)
+        user_id = filters.get("user_id")
+        if user_id:
+            conditions &= Q(user_id=user_id)
+        conditions = booking_conditions(filters, conditions)
+
+        return exports.streaming_response(
+            Booking.export_rows(conditions=conditions),
+            Booking.get_export_fields(),
+            serializer.validated_data["format"],
+            filename="bookings",
+            asynchronous=exports.is_asgi(request),
+        )
+
+
+class HostDashboardAPIView(APIView):
+    """Occupancy, revenue and lead time of the authenticated host's listings"""
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Listings"],
+        description="Per listing occupancy rate, revenue, nightly rate and booking lead time over whole months, read from the monthly stats rollup",
+        request=HostDashboardSerializer,
+        responses={
+            200: inline_serializer(
+                name="HostDashboardResponse",
+                fields=dict(
+                    status=serializers.BooleanField(),
+                    message=serializers.CharField(),
+                    data=ListingStatsSerializer(many=True),
+                    count=serializers.IntegerField(),
+                ),
+            ),
+        },
+    )
+    def post(self, request):
+        serializer = HostDashboardSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        conditions = Q(host=request.user)
+        listing_id = serializer.validated_data.get("listing_id")
+        if listing_id:
+            conditions &= Q(pk=listing_id)
+
+        listings = ListingMonthlyStats.dashboard(
+            conditions,
+            serializer.validated_data["start_month"],
+            serializer.validated_data["end_month"],
+        )
+
+        return Response(
+            data=dict(
+                status=True,
+                message="Listing stats retrieved successfully",
+                data=listings,
+                count=len(listings),
+            ),
+            status=status.HTTP_200_OK,
+        )
@@ -6,6 +6,15 @@ from drf_standardized_errors.formatter import ExceptionFormatter
 from drf_standardized_errors.types import ErrorResponse
 
 
+def format_validation_errors(detail):
+    """Flatten serializer errors into "field: message" strings"""
+    formatted_errors = []
+    for field, errors in detail.items():
+        for error in errors:
+            formatted_errors.append(f"{field}: {error}")
+    return formatted_errors
+
+
 def custom_exception_handler(exc, context):
     """
     Custom exception handler that formats serializer validation errors globally.
@@ -15,13 +24,8 @@ def custom_exception_handler(exc, context):
 
     # Handle serializer validation errors specifically
     if isinstance(exc, ValidationError):
-        formatted_errors = []
-        for field, errors in exc.detail.items():
-            for error in errors:
-                formatted_errors.append(f"{field}: {error}")
-
         return Response(
-            {"status": "error", "message": formatted_errors},
+            {"status": "error", "message": format_validation_errors(exc.detail)},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
@@ -0,0 +1,209 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def _to_json(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def encode_cursor(values):
+    """
+    Encode the sort-key values of the last row of a page into an opaque cursor
+
+    Args:
+        values: Sequence of sort-key values, in ordering order
+
+    Returns:
+        URL-safe string
+    """
+    payload = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _parse_datetime(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+def _parse_date(value):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+def _parse_decimal(value):
+    parsed = Decimal(str(value))
+    if not parsed.is_finite():
+        raise ValueError(value)
+    return parsed
+
+
+def _parse_int(value):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(value)
+    return value
+
+
+def _parse_float(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(value)
+    return float(value)
+
+
+# How each model field type comes back out of a cursor; strings only
+# for the types _to_json writes as strings
+PARSERS = {
+    "DateTimeField": _parse_datetime,
+    "DateField": _parse_date,
+    "UUIDField": UUID,
+    "DecimalField": _parse_decimal,
+    "AutoField": _parse_int,
+    "BigAutoField": _parse_int,
+    "IntegerField": _parse_int,
+    "BigIntegerField": _parse_int,
+    "PositiveIntegerField": _parse_int,
+    "FloatField": _parse_float,
+}
+
+STRING_PARSERS = {_parse_datetime, _parse_date, UUID}
+
+
+def _parser(model, name):
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        # Annotations in a sort key (search rank, distance) are numbers
+        return _parse_float
+    return PARSERS.get(field.get_internal_type(), str)
+
+
+def decode_cursor(cursor, ordering, model):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Every value is converted back to the type of its sort field, so a
+    tampered cursor fails here instead of in the database query.
+
+    Args:
+        cursor: Opaque cursor string
+        ordering: Ordering the cursor was issued for
+        model: Model the ordering fields belong to
+
+    Returns:
+        List of sort-key values
+
+    Raises:
+        InvalidCursor: The cursor is malformed or a value has the wrong type
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor("Invalid cursor")
+
+    decoded = []
+    for field, value in zip(ordering, values):
+        parse = _parser(model, field.lstrip("-"))
+        if value is None or (parse in STRING_PARSERS and not isinstance(value, str)):
+            raise InvalidCursor("Invalid cursor")
+        try:
+            decoded.append(parse(value))
+        except (ValueError, TypeError, ArithmeticError) as e:
+            raise InvalidCursor("Invalid cursor") from e
+    return decoded
+
+
+def keyset_condition(ordering, values):
+    """
+    Build the "rows after this key" condition for a keyset page
+
+    For ordering ("-created_at", "-id") and values (c, i) this is
+    created_at < c OR (created_at = c AND id < i), which an index on
+    the ordering columns serves as a single range scan.
+    """
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def paginate_keyset(queryset, ordering, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one keyset page from a values() queryset
+
+    The queryset is ordered by `ordering`, which must end in a unique
+    column so the key is stable. One extra row is fetched to decide
+    whether a next page exists, so every page costs the same regardless
+    of how deep it is.
+
+    Args:
+        queryset: Queryset of dicts that includes the ordering fields
+        ordering: Tuple of order_by expressions, e.g. ("-created_at", "-id")
+        cursor: Cursor returned with the previous page, if any
+        page_size: Number of rows per page
+
+    Returns:
+        Tuple of (rows, next_cursor)
+    """
+    page_size = _page_size(page_size)
+    rows = list(_page_queryset(queryset, ordering, cursor, page_size))
+    return _split_page(rows, ordering, page_size)
+
+
+async def apaginate_keyset(
+    queryset, ordering, cursor=None, page_size=DEFAULT_PAGE_SIZE
+):
+    """Async variant of paginate_keyset, for use with the async ORM"""
+    page_size = _page_size(page_size)
+    rows = [row async for row in _page_queryset(queryset, ordering, cursor, page_size)]
+    return _split_page(rows, ordering, page_size)
+
+
+def _page_size(page_size):
+    return max(1, min(page_size or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+
+def _page_queryset(queryset, ordering, cursor, page_size):
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, ordering, queryset.model)
+        queryset = queryset.filter(keyset_condition(ordering, values))
+    return queryset[: page_size + 1]
+
+
+def _split_page(rows, ordering, page_size):
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor([last[field.lstrip("-")] for field in ordering])
+    return rows, next_cursor
@@ -0,0 +1,177 @@
+"""
+Closed-loop HTTP load generator for comparing WSGI and ASGI deployments.
+
+Opens --concurrency keep-alive connections, each sending POST requests
+back to back for --duration seconds, and reports throughput, latency
+percentiles and, with --pid, the resident memory of the server process
+tree. --slow-body trickles each request body over the given number of
+seconds to model slow mobile clients, which hold a sync worker for the
+whole upload but cost an async server almost nothing.
+
+Usage:
+    python scripts/loadtest.py http://127.0.0.1:8000/api/stay/async/listings/ \\
+        --body '{"filters": {"city": "Lagos"}}' --concurrency 200 --duration 30 \\
+        --slow-body 0.5 --pid $(pgrep -o -f gunicorn)
+
+Only the standard library is used, so it runs anywhere Python does.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+def rss_kb(pid):
+    """Resident memory of a process and all of its descendants, in KiB"""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+            with open(f"/proc/{current}/task/{current}/children") as children:
+                pending.extend(int(child) for child in children.read().split())
+        except FileNotFoundError:
+            continue
+    return total
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response; returns the status code"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    code = int(status_line.split()[1])
+    length = 0
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(length)
+    return code
+
+
+async def client(url, body, deadline, slow_body, latencies, errors):
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    headers = (
+        f"POST {path} HTTP/1.1\r\n"
+        f"Host: {parts.netloc}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: keep-alive\r\n\r\n"
+    ).encode()
+    reader = writer = None
+
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(
+                    parts.hostname, parts.port or 80
+                )
+            writer.write(headers)
+            if slow_body:
+                half = len(body) // 2
+                writer.write(body[:half])
+                await writer.drain()
+                await asyncio.sleep(slow_body)
+                writer.write(body[half:])
+            else:
+                writer.write(body)
+            await writer.drain()
+            code = await read_response(reader)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+            errors["connection"] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+            continue
+        if code >= 500:
+            errors["5xx"] += 1
+        latencies.append(time.monotonic() - started)
+
+    if writer is not None:
+        writer.close()
+
+
+async def run(args):
+    body = args.body.encode()
+    latencies = []
+    errors = {"connection": 0, "5xx": 0}
+    peak_rss = 0
+
+    deadline = time.monotonic() + args.duration
+    tasks = [
+        asyncio.create_task(
+            client(args.url, body, deadline, args.slow_body, latencies, errors)
+        )
+        for _ in range(args.concurrency)
+    ]
+    while any(not task.done() for task in tasks):
+        if args.pid:
+            peak_rss = max(peak_rss, rss_kb(args.pid))
+        await asyncio.sleep(0.5)
+    await asyncio.gather(*tasks)
+
+    print(f"url:          {args.url}")
+    print(f"concurrency:  {args.concurrency}")
+    print(f"requests:     {len(latencies)}")
+    print(f"throughput:   {len(latencies) / args.duration:,.1f} req/s")
+    if latencies:
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(
+            "latency ms:   "
+            f"p50={quantiles[49] * 1000:.1f} "
+            f"p95={quantiles[94] * 1000:.1f} "
+            f"p99={quantiles[98] * 1000:.1f}"
+        )
+    print(f"errors:       {errors}")
+    if args.pid:
+        print(f"peak rss:     {peak_rss / 1024:,.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("url", help="Endpoint to POST to")
+    parser.add_argument("--body", default="{}", help="JSON request body")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds")
+    parser.add_argument(
+        "--slow-body",
+        type=float,
+        default=0.0,
+        help="Seconds to pause halfway through each request body",
+    )
+    parser.add_argument(
+        "--pid", type=int, help="Server master pid, to report peak memory"
+    )
+    args = parser.parse_args()
+    if args.pid and not os.path.exists(f"/proc/{args.pid}"):
+        parser.error(f"no such process: {args.pid}")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
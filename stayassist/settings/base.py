@@ -105,6 +105,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "stayassist.wsgi.application"
+ASGI_APPLICATION = "stayassist.asgi.application"
 
 
 # Database
@@ -252,6 +253,103 @@ SPECTACULAR_SETTINGS = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory per process by default; set REDIS_URL to share across workers.
+
+if getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "stayassist",
+        }
+    }
+
+# Listing search result cache (see stay/search_cache.py)
+STAY_SEARCH_CACHE = {
+    "ENABLED": getenv("STAY_SEARCH_CACHE", "True") == "True",
+    "ALIAS": "default",
+    "TIMEOUT": int(getenv("STAY_SEARCH_CACHE_TIMEOUT", "300")),
+}
+
+
+# In-process interval index answering availability for the busiest cities
+# without a SQL round trip (see stay/availability.py)
+STAY_AVAILABILITY_ENGINE = {
+    "ENABLED": getenv("STAY_AVAILABILITY_ENGINE", "False") == "True",
+    "CITIES": [
+        city
+        for city in getenv("STAY_AVAILABILITY_ENGINE_CITIES", "").split(",")
+        if city.strip()
+    ],
+    # Seconds between consistency checks against the database
+    "CHECK_INTERVAL": int(getenv("STAY_AVAILABILITY_ENGINE_CHECK_INTERVAL", "5")),
+    # Seconds each write's changes stay in the shared cache for other
+    # workers to replay; a worker further behind rebuilds instead
+    "CHANGE_TIMEOUT": int(getenv("STAY_AVAILABILITY_ENGINE_CHANGE_TIMEOUT", "300")),
+    # Largest write (in changed rows) and the most writes a worker replays;
+    # beyond either it rebuilds
+    "MAX_CHANGES": int(getenv("STAY_AVAILABILITY_ENGINE_MAX_CHANGES", "5000")),
+    "MAX_REPLAY": int(getenv("STAY_AVAILABILITY_ENGINE_MAX_REPLAY", "1000")),
+}
+
+
+# Authenticated user cache (see accounts/user_cache.py). TIMEOUT bounds how
+# long another worker can keep serving a user changed elsewhere.
+ACCOUNTS_USER_CACHE = {
+    "ENABLED": getenv("ACCOUNTS_USER_CACHE", "True") == "True",
+    "MAX_SIZE": int(getenv("ACCOUNTS_USER_CACHE_MAX_SIZE", "10000")),
+    "TIMEOUT": int(getenv("ACCOUNTS_USER_CACHE_TIMEOUT", "30")),
+    # Optional shared tier, e.g. "default" to share users through Redis
+    "SHARED_ALIAS": getenv("ACCOUNTS_USER_CACHE_SHARED_ALIAS") or None,
+    "SHARED_TIMEOUT": int(getenv("ACCOUNTS_USER_CACHE_SHARED_TIMEOUT", "300")),
+}
+
+# Per-worker memo of validated JWTs (see accounts/token_memo.py); entries
+# expire with their token
+ACCOUNTS_TOKEN_MEMO = {
+    "ENABLED": getenv("ACCOUNTS_TOKEN_MEMO", "True") == "True",
+    "MAX_SIZE": int(getenv("ACCOUNTS_TOKEN_MEMO_MAX_SIZE", "10000")),
+}
+
+# Bounded pool for password hashing (see accounts/hashing.py). Logins and
+# registrations beyond MAX_WORKERS + MAX_QUEUE in flight per process, or
+# beyond SHARED_SLOTS in flight across every worker, get a 503.
+ACCOUNTS_HASH_POOL = {
+    "ENABLED": getenv("ACCOUNTS_HASH_POOL", "True") == "True",
+    "MAX_WORKERS": int(getenv("ACCOUNTS_HASH_POOL_WORKERS", "2")),
+    "MAX_QUEUE": int(getenv("ACCOUNTS_HASH_POOL_QUEUE", "8")),
+    # Cache holding the cross-worker slots; only shared with REDIS_URL set
+    "SHARED_ALIAS": getenv("ACCOUNTS_HASH_POOL_SHARED_ALIAS", "default") or None,
+    "SHARED_SLOTS": int(getenv("ACCOUNTS_HASH_POOL_SHARED_SLOTS", "4")),
+    # Seconds a slot lease lasts if its worker dies before releasing it
+    "SLOT_TIMEOUT": int(getenv("ACCOUNTS_HASH_POOL_SLOT_TIMEOUT", "30")),
+    # Seconds clients are told to wait (Retry-After) when refused
+    "RETRY_AFTER": int(getenv("ACCOUNTS_HASH_POOL_RETRY_AFTER", "1")),
+}
+
+# Revoked JWT ids, checked through a per-worker Bloom filter (see
+# accounts/revocation.py). SYNC_INTERVAL bounds how long a revocation takes
+# to reach every worker.
+ACCOUNTS_REVOCATION = {
+    "SYNC_INTERVAL": int(getenv("ACCOUNTS_REVOCATION_SYNC_INTERVAL", "5")),
+    "REBUILD_INTERVAL": int(getenv("ACCOUNTS_REVOCATION_REBUILD_INTERVAL", "3600")),
+    "CAPACITY": int(getenv("ACCOUNTS_REVOCATION_CAPACITY", "100000")),
+    "ERROR_RATE": float(getenv("ACCOUNTS_REVOCATION_ERROR_RATE", "0.001")),
+}
+
+
+# Minutes a pending booking holds its dates before `expire_holds` cancels it
+STAY_BOOKING_HOLD_MINUTES = int(getenv("STAY_BOOKING_HOLD_MINUTES", "15"))
+
+
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = getenv("EMAIL_HOST", "smtp.gmail.com")
 EMAIL_PORT = int(getenv("EMAIL_PORT", "587"))